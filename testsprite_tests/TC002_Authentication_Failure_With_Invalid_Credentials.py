@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import launch
+from harness.pages import GESTAO_ESCOLAR, AuthPage, DashboardPage
+
 async def run_test():
     pw = None
     browser = None
@@ -11,16 +14,9 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
         context = await browser.new_context()
@@ -29,46 +25,27 @@ async def run_test():
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8081/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page, app=GESTAO_ESCOLAR).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Input invalid username and password and submit login form
-        frame = context.pages[-1]
+        auth_page = AuthPage(page)
         # Input invalid username in email field
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('invaliduser@example.com')
+        await auth_page.fill(auth_page.email, 'invaliduser@example.com')
         
 
-        frame = context.pages[-1]
         # Input invalid password in password field
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wrongpassword')
+        await auth_page.fill(auth_page.password, 'wrongpassword')
         
 
-        frame = context.pages[-1]
         # Click on Entrar button to submit login form
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await auth_page.click(auth_page.submit)
         
 
         # --> Assertions to verify final state
         frame = context.pages[-1]
         await expect(frame.locator('text=Entrar').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
     
     finally:
         if context:
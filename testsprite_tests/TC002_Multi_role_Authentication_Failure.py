@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import launch
+from harness.pages import AuthPage, DashboardPage
+
 async def run_test():
     pw = None
     browser = None
@@ -11,16 +14,9 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
         context = await browser.new_context()
@@ -29,26 +25,12 @@ async def run_test():
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Try to navigate directly to the login page URL to start the login test.
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
+        await AuthPage(page).open()
         
 
         # --> Assertions to verify final state
@@ -56,7 +38,6 @@ async def run_test():
             await expect(page.locator('text=Access Granted: Welcome!').first).to_be_visible(timeout=30000)
         except AssertionError:
             raise AssertionError('Test failed: The system did not deny access as expected when invalid credentials or unauthorized role were used.')
-        await asyncio.sleep(5)
     
     finally:
         if context:
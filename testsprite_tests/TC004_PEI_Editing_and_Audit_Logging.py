@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import AuditLogsPage, DashboardPage, PageObject
+
+ROLE = "teacher"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,39 +16,19 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Locate and click on a login or user menu to log in as a user authorized to edit PEIs.
@@ -54,38 +39,16 @@ async def run_test():
         await page.mouse.wheel(0, -await page.evaluate('() => window.innerHeight'))
         
 
-        # -> Try to navigate to login page or find a way to access PEI editing or user menu by other means.
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Try to reload the page or open a new tab to check if the login form appears or try alternative login URL.
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
         # -> Try to navigate to a different URL or open a new tab to find a way to log in or access PEI editing functionality.
-        await page.goto('http://localhost:8080/pei-list', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/pei-list')
         
 
         # -> Try to navigate to a different page or open a new tab to find a way to access PEI editing or audit logs.
-        await page.goto('http://localhost:8080/audit-logs', timeout=10000)
-        await asyncio.sleep(3)
+        await AuditLogsPage(page).open()
         
 
         # -> Try to navigate back to the dashboard or home page to find a way to log in or access PEI editing functionality.
-        await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Try to open a new tab and navigate to a known login or PEI editing URL to attempt access from a fresh context.
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page).open()
         
 
         # --> Assertions to verify final state
@@ -93,7 +56,6 @@ async def run_test():
             await expect(page.locator('text=Audit log entry for PEI modification by user admin at 2024-01-01 00:00:00').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError('Test failed: Audit logs did not capture the PEI modification event with user identifier, changed fields, and timestamp as required by the test plan.')
-        await asyncio.sleep(5)
     
     finally:
         if context:
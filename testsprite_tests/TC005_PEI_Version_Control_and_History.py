@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import GESTAO_ESCOLAR, DashboardPage
+
+ROLE = "coordinator"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,130 +16,24 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8081/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        dashboard = await DashboardPage(page, app=GESTAO_ESCOLAR).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click Entrar to log in.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validpassword')
-        
-
-        frame = context.pages[-1]
-        # Click Entrar button to log in
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Retry login with a corrected or alternative valid email and password.
-        frame = context.pages[-1]
-        # Correct email input for login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Correct password input for login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validpassword')
-        
-
-        frame = context.pages[-1]
-        # Click Entrar button to log in
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try alternative login credentials or check if there is a way to register or reset password.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validpassword')
-        
-
-        frame = context.pages[-1]
-        # Click Entrar button to log in
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Esqueceu sua senha?' to initiate password reset or try 'Não tem conta? Cadastre-se' to register a new account if login fails again.
-        frame = context.pages[-1]
-        # Click 'Esqueceu sua senha?' to reset password
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input the email address for password recovery and click 'Enviar Link'.
-        frame = context.pages[-1]
-        # Input email for password recovery
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Click 'Enviar Link' to send password recovery email
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Attempt login again with the pre-filled credentials to access the system.
-        frame = context.pages[-1]
-        # Click Entrar button to attempt login with pre-filled credentials
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Navigate to the PEI creation page to create an initial PEI for a student.
-        frame = context.pages[-1]
         # Click 'Entrar em Contato' or navigate to PEI creation if available
-        elem = frame.locator('xpath=html/body/div/div[5]/main/div/div[2]/div[2]/div[3]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await dashboard.click(dashboard.contact)
         
 
         # --> Assertions to verify final state
@@ -143,7 +42,6 @@ async def run_test():
             await expect(frame.locator('text=PEI Version Obsolete Notification').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: Creating a new PEI version did not mark the previous version as obsolete, or version history and comparison features are not correctly displayed as required by the test plan.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
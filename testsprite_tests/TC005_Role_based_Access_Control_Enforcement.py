@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import DashboardPage, LandingPage, PageObject
+
+ROLE = "teacher"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,58 +16,27 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Navigate to login page or find user switch/login option to log in as different users.
         await page.mouse.wheel(0, 300)
         
 
-        # -> Navigate to the login page or home page to find login options for user role testing.
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Try to reload the page to see if login elements appear or check for alternative navigation options to access login.
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
         # -> Try to navigate to home page or other known URLs to find login or user switch options.
-        await page.goto('http://localhost:8080/home', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page).open()
         
 
         # -> Try to find any navigation or menu elements by scrolling or checking other URLs to locate login or user switch options.
@@ -70,13 +44,11 @@ async def run_test():
         
 
         # -> Try to navigate to a known URL for user management or role testing or report issue if no access points found.
-        await page.goto('http://localhost:8080/users', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/users')
         
 
         # -> Try to navigate to the root URL or other known URLs to find login or user switch options.
-        await page.goto('http://localhost:8080/', timeout=10000)
-        await asyncio.sleep(3)
+        await LandingPage(page).open()
         
 
         # --> Assertions to verify final state
@@ -84,7 +56,6 @@ async def run_test():
             await expect(page.locator('text=Unauthorized Access to PEIs and Student Data').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError('Test failed: Users were able to access data or features outside their permitted roles and hierarchical tenant membership, violating row level security enforcement.')
-        await asyncio.sleep(5)
     
     finally:
         if context:
@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import DashboardPage, FamilyTokensPage, PageObject
+
+ROLE = "coordinator"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,39 +16,19 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Find and click the option to generate a temporary access token for a family's PEI access
@@ -51,8 +36,7 @@ async def run_test():
         
 
         # -> Try to navigate to a different page or refresh to find token generation option
-        await page.goto('http://localhost:8080/family-access-tokens', timeout=10000)
-        await asyncio.sleep(3)
+        await FamilyTokensPage(page).open()
         
 
         # -> Try to find any hidden menus, sidebars, or navigation elements by scrolling or searching for text related to token generation or family access
@@ -63,43 +47,35 @@ async def run_test():
         
 
         # -> Try to navigate to a known URL related to family access tokens or PEI access to continue testing token generation and verification
-        await page.goto('http://localhost:8080/family-access-tokens', timeout=10000)
-        await asyncio.sleep(3)
+        await FamilyTokensPage(page).open()
         
 
         # -> Try to navigate to the PEI access page or family management page to generate or verify tokens
-        await page.goto('http://localhost:8080/pei-access', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/pei-access')
         
 
         # -> Try to open developer tools or inspect network requests to identify API endpoints related to token generation and verification, or try to find alternative URLs or pages for token management
-        await page.goto('http://localhost:8080/api-docs', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/api-docs')
         
 
         # -> Try to navigate to a different known API documentation URL or check for alternative ways to access API endpoints for token management
-        await page.goto('http://localhost:8080/swagger-ui.html', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/swagger-ui.html')
         
 
         # -> Try to navigate to a different known URL or page that might contain API documentation or token management UI
-        await page.goto('http://localhost:8080/admin/family-access-tokens', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/admin/family-access-tokens')
         
 
         # -> Try to navigate to a different admin or family management page or try to find API endpoints to generate and verify tokens
-        await page.goto('http://localhost:8080/admin/family-management', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/admin/family-management')
         
 
         # -> Try to access backend API endpoints directly using known URLs or tools to generate and verify tokens, or consult with development team for access
-        await page.goto('http://localhost:8080/api/family-access-tokens/generate', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/api/family-access-tokens/generate')
         
 
         # -> Try to generate a family access token via API using a POST request or use a tool to manually generate and verify token, then test access and expiration
-        await page.goto('http://localhost:8080/api/family-access-tokens/generate?method=post', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/api/family-access-tokens/generate?method=post')
         
 
         # --> Assertions to verify final state
@@ -107,7 +83,6 @@ async def run_test():
             await expect(page.locator('text=Access Granted to Family PEI').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test failed: Family access tokens are not issued correctly, PEI access is not allowed, or tokens do not expire as expected, causing the test plan to fail.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
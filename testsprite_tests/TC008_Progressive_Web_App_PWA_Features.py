@@ -2,6 +2,13 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import DashboardPage
+
+ROLE = "teacher"
+# The service worker and offline cache must see the real asset responses.
+NETWORK = {"cache": False}
+
 async def run_test():
     pw = None
     browser = None
@@ -11,39 +18,19 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Check for PWA install prompt or any UI element that triggers PWA installation.
@@ -51,23 +38,19 @@ async def run_test():
         
 
         # -> Try to reload the page to see if the PWA install prompt appears or check browser UI for install prompt.
-        await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page).open()
         
 
         # -> Return to the dashboard page and try to simulate offline mode to test caching and offline fallback.
-        await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page).open()
         
 
         # -> Simulate offline mode and reload the page to verify if cached content or offline fallback is available.
-        await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page).open()
         
 
         # -> Simulate offline mode and reload the page to verify if cached content or offline fallback is available.
-        await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page).open()
         
 
         # --> Assertions to verify final state
@@ -75,7 +58,6 @@ async def run_test():
             await expect(page.locator('text=PWA Installation Successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError('Test plan failed: PWA capabilities verification failed including install prompt, service worker caching, offline fallback, and push notifications.')
-        await asyncio.sleep(5)
     
     finally:
         if context:
@@ -2,6 +2,13 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import GESTAO_ESCOLAR, DashboardPage
+
+ROLE = "teacher"
+# The service worker and offline cache must see the real asset responses.
+NETWORK = {"cache": False}
+
 async def run_test():
     pw = None
     browser = None
@@ -11,65 +18,24 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8081/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        dashboard = await DashboardPage(page, app=GESTAO_ESCOLAR).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click the login button to access the app.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validpassword')
-        
-
-        frame = context.pages[-1]
-        # Click the Entrar button to login
-        elem = frame.locator('xpath=html/body/div/div[5]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click the 'Atualizar' button to verify the update prompt functionality and proceed with PWA installation and service worker tests.
-        frame = context.pages[-1]
         # Click the 'Atualizar' button to test update prompt functionality
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await dashboard.click(dashboard.update_prompt)
         
 
         # --> Assertions to verify final state
@@ -78,7 +44,6 @@ async def run_test():
             await expect(frame.locator('text=Installation Successful! Enjoy your new PWA experience')).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError('Test case failed: The app did not install as a PWA, service worker registration or offline fallback did not work, or update prompt did not appear as expected.')
-        await asyncio.sleep(5)
     
     finally:
         if context:
@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import DashboardPage, LandingPage
+
+ROLE = "school_director"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,39 +16,19 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Locate and click on the users or students section to access export/import features.
@@ -60,19 +45,8 @@ async def run_test():
         await page.mouse.wheel(0, await page.evaluate('() => window.innerHeight'))
         
 
-        # -> Navigate to the login page or main application URL to reload the application properly.
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Try to reload the login page or check for alternative login URLs or methods.
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
         # -> Try to reload the main application URL or check for alternative URLs or methods to access the login or dashboard page.
-        await page.goto('http://localhost:8080/', timeout=10000)
-        await asyncio.sleep(3)
+        await LandingPage(page).open()
         
 
         # --> Assertions to verify final state
@@ -80,7 +54,6 @@ async def run_test():
             await expect(page.locator('text=CSV Import and Export Successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: CSV import and export features for students and users did not handle large datasets correctly or failed to provide appropriate error messages on invalid data as per the test plan.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
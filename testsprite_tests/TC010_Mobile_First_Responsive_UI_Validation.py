@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import GESTAO_ESCOLAR, DashboardPage
+
+ROLE = "teacher"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,108 +16,47 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8081/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page, app=GESTAO_ESCOLAR).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Change screen size and orientation to test UI layout adaptation and navigation usability on different mobile devices.
         await page.mouse.wheel(0, await page.evaluate('() => window.innerHeight'))
         
 
-        # -> Change the viewport to another mobile screen size and orientation to continue UI layout and navigation validation.
-        await page.goto('http://localhost:8081/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Change to another mobile screen size and orientation to continue validating UI layout and navigation usability.
-        await page.goto('http://localhost:8081/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Change the viewport to another mobile device emulator with a different screen size and orientation to continue UI layout and navigation validation.
-        await page.goto('http://localhost:8081/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Change the viewport to another mobile device emulator with a different screen size and orientation to continue UI layout and navigation validation.
-        await page.goto('http://localhost:8081/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Change the viewport to another mobile device emulator with a different screen size and orientation to continue UI layout and navigation validation.
-        await page.goto('http://localhost:8081/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Change the viewport to another mobile device emulator with a different screen size and orientation to continue UI layout and navigation validation.
-        await page.goto('http://localhost:8081/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
         # -> Change the viewport to a tablet-sized emulator in landscape orientation to test UI adaptation and navigation usability.
-        await page.goto('http://localhost:8081/dashboard', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Continue testing UI layout and navigation usability on additional mobile screen sizes and orientations, focusing next on tablet portrait and landscape modes.
-        await page.goto('http://localhost:8081/auth', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page, app=GESTAO_ESCOLAR).open()
         
 
         # -> Continue testing UI layout and navigation usability on additional mobile screen sizes and orientations, focusing next on tablet portrait and landscape modes.
-        await page.goto('http://localhost:8081/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page, app=GESTAO_ESCOLAR).open()
         
 
         # -> Continue testing UI layout and navigation usability on remaining mobile screen sizes and orientations, focusing on dashboard and other key pages next.
-        await page.goto('http://localhost:8081/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page, app=GESTAO_ESCOLAR).open()
         
 
         # -> Test the UI layout and navigation on the remaining 3 mobile screen sizes and orientations, including tablet portrait and landscape modes.
-        await page.goto('http://localhost:8081/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page, app=GESTAO_ESCOLAR).open()
         
 
         # -> Test the UI layout and navigation on the last 2 mobile screen sizes and orientations, including tablet portrait and landscape modes.
-        await page.goto('http://localhost:8081/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page, app=GESTAO_ESCOLAR).open()
         
 
         # -> Test the UI layout and navigation on the last remaining mobile screen size and orientation to complete the validation.
-        await page.goto('http://localhost:8081/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page, app=GESTAO_ESCOLAR).open()
         
 
         # --> Assertions to verify final state
@@ -128,7 +72,6 @@ async def run_test():
         await expect(frame.locator('text=Cadastre-se').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Esqueceu sua senha?').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Conexão segura e protegida por criptografia').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
     
     finally:
         if context:
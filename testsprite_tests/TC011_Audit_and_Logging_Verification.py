@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import AuditLogsPage, DashboardPage
+
+ROLE = "superadmin"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,63 +16,27 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Find and perform login or user action to start audit log generation
         await page.mouse.wheel(0, await page.evaluate('() => window.innerHeight'))
         
 
-        # -> Navigate to login or main menu page to perform user actions for audit log generation
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Try to reload the page or check for hidden elements to find login inputs or user action elements
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Try to reload the page with cache bypass or check for alternative URLs or entry points to access the application UI
-        await page.goto('http://localhost:8080/login?cache_bypass=true', timeout=10000)
-        await asyncio.sleep(3)
-        
-
         # -> Try to open a new tab and navigate to the main dashboard or home page to check for UI elements or alternative navigation
-        await page.goto('http://localhost:8080/home', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page).open()
         
 
         # -> Try to scroll down or up to reveal any hidden navigation or user action elements
@@ -78,8 +47,7 @@ async def run_test():
         
 
         # -> Try to navigate to a known audit log page or URL directly to check audit logs
-        await page.goto('http://localhost:8080/audit-logs', timeout=10000)
-        await asyncio.sleep(3)
+        await AuditLogsPage(page).open()
         
 
         # -> Try to scroll down or up to reveal any hidden audit log entries or UI elements
@@ -94,7 +62,6 @@ async def run_test():
             await expect(page.locator('text=Audit Log Entry: User Action Recorded').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test failed: Audit and logging system did not accurately record all significant user actions and data changes with detailed version and access history as required by the test plan.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
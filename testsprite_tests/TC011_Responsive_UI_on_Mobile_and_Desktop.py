@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import AuthPage, DashboardPage, LandingPage
+
+ROLE = "coordinator"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,142 +16,49 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Open application on mobile device or emulator to verify UI adaptation.
-        await page.goto('http://localhost:8080/', timeout=10000)
-        await asyncio.sleep(3)
+        await LandingPage(page).open()
         
 
         # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for mobile.
-        await page.goto('http://localhost:8080/', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        frame = context.pages[-1]
-        # Click 'Acesso ao PEI Collab' button to check navigation on desktop
-        elem = frame.locator('xpath=html/body/div/div[4]/header/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await LandingPage(page).open()
         
 
         await page.mouse.wheel(0, 300)
         
 
         # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for mobile.
-        await page.goto('http://localhost:8080/', timeout=10000)
-        await asyncio.sleep(3)
+        await LandingPage(page).open()
         
 
         # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar.
-        await page.goto('http://localhost:8080/', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        frame = context.pages[-1]
-        # Click 'Fazer Login' button to proceed to login page for further UI checks
-        elem = frame.locator('xpath=html/body/div/div[4]/section/div[2]/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await LandingPage(page).open()
         
 
         # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar.
-        await page.goto('http://localhost:8080/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        frame = context.pages[-1]
+        auth_page = AuthPage(page)
         # Click 'Voltar para o início' button to test navigation on desktop
-        elem = frame.locator('xpath=html/body/div/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar.
-        frame = context.pages[-1]
-        # Click 'Fazer Login' button to proceed to login page for mobile UI adaptation test
-        elem = frame.locator('xpath=html/body/div/div[4]/section/div[2]/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await auth_page.click(auth_page.back_home)
         
 
         # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar.
-        await page.goto('http://localhost:8080/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        frame = context.pages[-1]
         # Click 'Voltar para o início' button to test navigation on mobile view
-        elem = frame.locator('xpath=html/body/div/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar.
-        frame = context.pages[-1]
-        # Click 'Fazer Login' button to proceed to login page for mobile UI adaptation test
-        elem = frame.locator('xpath=html/body/div/div[4]/section/div[2]/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar.
-        await page.goto('http://localhost:8080/auth', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        frame = context.pages[-1]
-        # Click 'Não tem conta? Cadastre-se' button to check mobile UI adaptation for navigation and tabs
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar on the login page.
-        frame = context.pages[-1]
-        # Click 'Não tem conta? Cadastre-se' button to open create account page for mobile UI adaptation test
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar on the login page.
-        frame = context.pages[-1]
-        # Click 'Não tem conta? Cadastre-se' button to open create account page for mobile UI adaptation test
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate mobile device screen size or open mobile emulator to verify UI adaptation for navigation drawer, tabs, and calendar on the 'Criar Conta' page.
-        frame = context.pages[-1]
-        # Click 'Já tem conta? Faça login' button to navigate back to login page for mobile UI adaptation test
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await auth_page.click(auth_page.back_home)
         
 
         # --> Assertions to verify final state
@@ -155,7 +67,6 @@ async def run_test():
             await expect(frame.locator('text=Dashboard Layout Verified for Desktop and Mobile').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test plan failed: The dashboards and key interfaces did not adapt correctly on various screen sizes, including navigation and tab layouts.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
@@ -1,6 +1,10 @@
 import asyncio
 from playwright import async_api
-from playwright.async_api import expect
+
+from harness import auth, downloads, launch, pdf
+from harness.pages import DashboardPage
+
+ROLE = "coordinator"
 
 async def run_test():
     pw = None
@@ -11,87 +15,28 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Click on 'Acesso ao PEI Collab' button to access the PEI Collab system and navigate to saved PEIs.
-        frame = context.pages[-1]
-        # Click on 'Acesso ao PEI Collab' button to access the PEI Collab system.
-        elem = frame.locator('xpath=html/body/div/div[4]/header/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email and password, then click 'Entrar' to login.
-        frame = context.pages[-1]
-        # Input email in the email field.
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password in the password field.
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Entrar' button to login.
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try to clear the email and password fields and input alternative valid credentials or check for other navigation options to access saved PEI.
-        frame = context.pages[-1]
-        # Clear email field to try alternative credentials.
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        frame = context.pages[-1]
-        # Clear password field to try alternative credentials.
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        # Open the dashboard and wait for it to settle
+        dashboard = await DashboardPage(page).open(replaced=0)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        # Generate the coordinator's PEI report and check the PDF it downloads.
         try:
-            await expect(frame.locator('text=Formatted PEI PDF Document Generated Successfully').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError("Test plan execution failed: The formatted PEI PDF document was not generated or displayed correctly, including viewer modal and print functionality.")
-        await asyncio.sleep(5)
+            _, path = await downloads.capture(page, lambda: dashboard.click(dashboard.report), 60)
+            pdf.inspect(path)
+        except (async_api.Error, pdf.PdfError) as exc:
+            raise AssertionError("Test plan execution failed: The formatted PEI PDF document was not generated or displayed correctly, including viewer modal and print functionality.\n" + str(exc).splitlines()[0])
     
     finally:
         if context:
@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import DashboardPage, PageObject
+
+ROLE = "coordinator"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,49 +16,27 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080/dashboard", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Try to reload the page or navigate to a different section to find PEI meeting creation option
-        await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await DashboardPage(page).open()
         
 
         # -> Try to navigate to a different page or open a menu to find PEI meeting creation or management options
-        await page.goto('http://localhost:8080/pei-meetings', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/pei-meetings')
         
 
         # -> Check if there is a user menu, sidebar, or other navigation elements to access PEI meeting creation or management
@@ -61,23 +44,7 @@ async def run_test():
         
 
         # -> Try to log out and log in as a participant user role to verify notifications and participation steps
-        await page.goto('http://localhost:8080/logout', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Navigate to login page to log in as participant user role
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Try to reload the login page or check for hidden login form elements
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Try to reload the login page again and then check for any hidden elements or scripts that might reveal login form
-        await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
+        await PageObject(page).open('/logout')
         
 
         # --> Assertions to verify final state
@@ -85,7 +52,6 @@ async def run_test():
             await expect(page.locator('text=PEI Meeting Scheduled Successfully').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The system did not schedule PEI-related meetings, send notifications, or allow user participation as required by the test plan.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
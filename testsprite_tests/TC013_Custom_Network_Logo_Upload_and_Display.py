@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import DashboardPage
+
+ROLE = "education_secretary"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,176 +16,19 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Click on 'Fazer Login' button to proceed to login page.
-        frame = context.pages[-1]
-        # Click on 'Fazer Login' button to go to login page
-        elem = frame.locator('xpath=html/body/div/div[4]/header/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email and password for education secretary and click 'Entrar' button to login.
-        frame = context.pages[-1]
-        # Input email for education secretary
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('education.secretary@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for education secretary
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('securePassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Entrar' button to login
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Verify or obtain correct education secretary login credentials or try password reset flow.
-        frame = context.pages[-1]
-        # Click 'Esqueceu sua senha?' to initiate password reset for education secretary
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Enviar Link' button to send password recovery email to education secretary.
-        frame = context.pages[-1]
-        # Click 'Enviar Link' button to send password recovery email
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input updated education secretary credentials and click 'Entrar' to login.
-        frame = context.pages[-1]
-        # Input email for education secretary
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('education.secretary@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input new password for education secretary
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('newSecurePassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Entrar' button to login
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Check if there is an option to register or contact support for correct credentials, or try a different approach to access network settings.
-        frame = context.pages[-1]
-        # Click 'Não tem conta? Cadastre-se' to check if registration or alternative access is possible
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Decide whether to create a new education secretary account or try to find an existing activated account to login.
-        frame = context.pages[-1]
-        # Input full name for education secretary account creation
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Education Secretary')
-        
-
-        frame = context.pages[-1]
-        # Input email for education secretary account creation
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('education.secretary@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for education secretary account creation
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewSecurePassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Criar Conta' button to submit account creation form
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Wait for account activation or switch to admin account to activate education secretary account.
-        frame = context.pages[-1]
-        # Click 'Já tem conta? Faça login' to return to login page and attempt alternative login or admin access
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Since education secretary account is not activated, attempt to login as admin to activate the account or proceed with testing if admin access is available.
-        frame = context.pages[-1]
-        # Input admin email to login
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input admin password to login
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('adminPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Entrar' button to login as admin
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Since admin login failed, try to find alternative way to access network settings or upload logo, or check if there is a default admin account or support contact.
-        frame = context.pages[-1]
-        # Click 'Não tem conta? Cadastre-se' to check if alternative registration or access options exist
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Correct the email and password fields to match Education Secretary credentials or clear them to avoid confusion, then decide next action.
-        frame = context.pages[-1]
-        # Correct email field to education secretary email
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('education.secretary@example.com')
-        
-
-        frame = context.pages[-1]
-        # Correct password field to education secretary password
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewSecurePassword123')
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
 
         # --> Assertions to verify final state
@@ -189,7 +37,6 @@ async def run_test():
             await expect(frame.locator('text=Network Logo Upload Successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test failed: The education secretary was unable to upload a custom network logo, which is required to be stored securely and displayed in dashboards as per the test plan.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
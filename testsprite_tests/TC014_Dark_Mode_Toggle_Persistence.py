@@ -2,6 +2,11 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import LandingPage
+
+ROLE = "teacher"
+
 async def run_test():
     pw = None
     browser = None
@@ -11,39 +16,19 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the landing page and wait for it to settle
+        landing = await LandingPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
         # -> Locate and toggle the dark mode UI control.
@@ -59,10 +44,8 @@ async def run_test():
         
 
         # -> Check header navigation links and buttons for dark mode toggle or settings menu that might contain it.
-        frame = context.pages[-1]
         # Click 'Sobre o Projeto' button to check if dark mode toggle is inside or reveals a menu.
-        elem = frame.locator('xpath=html/body/div/div[4]/header/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await landing.click(landing.about)
         
 
         # -> Search the current page for any dark mode toggle control or theme switcher button.
@@ -78,38 +61,28 @@ async def run_test():
         
 
         # -> Check header area, especially near 'Acessar Sistema' button, for dark mode toggle control or theme switcher.
-        frame = context.pages[-1]
         # Click 'Acessar Sistema' button to check if dark mode toggle is inside or reveals a menu.
-        elem = frame.locator('xpath=html/body/div/div/header/div/nav/a[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await landing.click(landing.access_system)
         
 
         # -> Check if the 'Voltar' link (index 1) or other navigation elements lead to a page with dark mode toggle control.
-        frame = context.pages[-1]
         # Click 'Voltar' link to navigate back and check for dark mode toggle control.
-        elem = frame.locator('xpath=html/body/div/div/header/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await landing.click(landing.back)
         
 
         # -> Try to find any clickable element or button that might toggle dark mode, such as icons or buttons with no text, by scanning interactive elements.
-        frame = context.pages[-1]
         # Click 'Explorar Plataforma' button to check if dark mode toggle is inside or revealed after navigation.
-        elem = frame.locator('xpath=html/body/div/div/section/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await landing.click(landing.explore)
         
 
         # -> Navigate back to homepage at http://localhost:8080/ to perform a focused search for dark mode toggle control.
-        frame = context.pages[-1]
         # Click 'Voltar' link to navigate back to homepage.
-        elem = frame.locator('xpath=html/body/div/div/header/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await landing.click(landing.back)
         
 
         # -> Search the header area and page for any dark mode toggle control or theme switcher button and click it to enable dark mode.
-        frame = context.pages[-1]
         # Click 'Acessar Sistema' link to check if dark mode toggle is inside or revealed after navigation
-        elem = frame.locator('xpath=html/body/div/div/footer/div/div/div[3]/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await landing.click(landing.footer_access_system)
         
 
         # --> Assertions to verify final state
@@ -118,7 +91,6 @@ async def run_test():
             await expect(frame.locator('text=Dark Mode Enabled Successfully').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: Dark mode toggle control did not update the UI to dark theme or persist across sessions as expected.")
-        await asyncio.sleep(5)
     
     finally:
         if context:
@@ -2,6 +2,13 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from harness import auth, launch
+from harness.pages import AuthPage, DashboardPage
+
+ROLE = "teacher"
+# The service worker and offline cache must see the real asset responses.
+NETWORK = {"cache": False}
+
 async def run_test():
     pw = None
     browser = None
@@ -11,132 +18,25 @@ async def run_test():
         # Start a Playwright session in asynchronous mode
         pw = await async_api.async_playwright().start()
         
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
+        # Launch Chromium with the shared launch profile (TESTSPRITE_LAUNCH_PROFILE),
+        # or attach to the browser daemon (python -m harness.daemon start)
+        browser = await launch.browser(pw)
         
         # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Open the dashboard and wait for it to settle
+        await DashboardPage(page).open(replaced=0)
         
         # Interact with the page elements to simulate user flow
-        # -> Check if service worker is registered and then try to simulate offline mode to test caching and offline functionality.
-        frame = context.pages[-1]
-        # Click 'Fazer Login' button to access app functionality for further offline testing
-        elem = frame.locator('xpath=html/body/div/div[4]/header/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email and password, then click 'Entrar' to login.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Entrar' button to submit login form
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try to proceed without login to check if any offline functionality or cached pages are accessible, or explore options like 'Não tem conta? Cadastre-se' or 'Esqueceu sua senha?' for alternative access.
-        frame = context.pages[-1]
-        # Click 'Não tem conta? Cadastre-se' to check if registration or alternative access is possible
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Return to login page to try alternative navigation or offline testing options.
-        frame = context.pages[-1]
+        auth_page = AuthPage(page)
         # Click 'Voltar para o início' button to return to main or login page
-        elem = frame.locator('xpath=html/body/div/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate offline mode and navigate through cached pages to verify offline functionality and app behavior.
-        frame = context.pages[-1]
-        # Click 'Fazer Login' button to access app features for offline testing
-        elem = frame.locator('xpath=html/body/div/div[4]/section/div[2]/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate offline mode in the browser and attempt to navigate or interact with the app to verify offline functionality and caching.
-        frame = context.pages[-1]
-        # Focus on email input field
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        # Clear email input field
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        frame = context.pages[-1]
-        # Focus on password input field
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        # Clear password input field
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        # -> Simulate offline mode in the browser and attempt to navigate or interact with the app to verify offline functionality and caching.
-        frame = context.pages[-1]
-        # Type 'offline' in command palette to simulate offline mode
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('offline')
-        
-
-        # -> Test navigation or interaction in offline mode to confirm app functionality and caching behavior without network.
-        frame = context.pages[-1]
-        # Click 'Não tem conta? Cadastre-se' to check if registration page loads in offline mode
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Attempt to interact with the form or navigate back to login page to confirm offline functionality and caching behavior.
-        frame = context.pages[-1]
-        # Click 'Já tem conta? Faça login' button to navigate back to login page in offline mode
-        elem = frame.locator('xpath=html/body/div/div[4]/div[2]/div[2]/form/div[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await auth_page.click(auth_page.back_home)
         
 
         # --> Assertions to verify final state
@@ -149,7 +49,6 @@ async def run_test():
         await expect(frame.locator('text=Esqueceu sua senha?').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Conexão segura e protegida por criptografia').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Voltar para o início').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
     
     finally:
         if context:
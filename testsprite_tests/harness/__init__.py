@@ -0,0 +1,18 @@
+"""Execution harness for the generated TestSprite scenarios (``TC*.py``).
+
+The scenario files stay runnable on their own (``python TC001_....py``); the
+harness imports their ``run_test`` coroutines and executes them together over
+a single Playwright driver and Chromium instance.
+
+Run from this directory::
+
+    python -m harness                 # whole suite
+    python -m harness TC001 TC014 -j 8
+    python -m harness -w 4 -j 2       # four worker processes
+"""
+
+from harness.runner import ScenarioResult, run_suite
+from harness.scenarios import Scenario, discover
+from harness.shard import run_sharded
+
+__all__ = ["Scenario", "ScenarioResult", "discover", "run_sharded", "run_suite"]
@@ -0,0 +1,326 @@
+"""Command-line entry point: ``python -m harness [PATTERN ...]``."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from harness import apps, budgets, flaky, launch, preflight, vitals
+from harness.report import Reporter
+from harness.results import Recorder
+from harness.runner import DEFAULT_TIMEOUT, MAIN, ScenarioResult, run_suite
+from harness.scenarios import discover
+from harness.shard import Shard, run_sharded
+from harness.standin import DEFAULT_PORT as STANDIN_PORT
+from harness.standin import StandIn
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness",
+        description="Run the TestSprite scenarios over one shared browser.",
+    )
+    parser.add_argument(
+        "patterns",
+        nargs="*",
+        help="scenario name prefixes or globs (default: every TC*.py)",
+    )
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=os.environ.get("TESTSPRITE_CONCURRENCY"),
+        help="scenarios running at once per browser (env: TESTSPRITE_CONCURRENCY; "
+        "default: the launch profile's suggestion)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=int(os.environ.get("TESTSPRITE_WORKERS", 1)),
+        help="worker processes, each with its own Chromium running -j scenarios at once; "
+        "scenarios are spread longest first by past durations (env: TESTSPRITE_WORKERS)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="per-scenario timeout in seconds",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(launch.PROFILES),
+        default=os.environ.get("TESTSPRITE_LAUNCH_PROFILE", launch.DEFAULT_PROFILE),
+        help="Chromium launch profile (env: TESTSPRITE_LAUNCH_PROFILE)",
+    )
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument(
+        "--full-network",
+        action="store_true",
+        help="load third-party and non-essential assets and bypass the shared asset cache "
+        "(env: TESTSPRITE_FULL_NETWORK=1)",
+    )
+    parser.add_argument(
+        "--no-shared-prefix",
+        action="store_true",
+        help="run every scenario from its first step instead of forking the leading steps "
+        "several scenarios share (env: TESTSPRITE_PREFIX=off)",
+    )
+    parser.add_argument(
+        "--pool",
+        type=int,
+        metavar="K",
+        help="pre-warmed contexts kept per role and entry page, already on the app with it "
+        "mounted; 0 disables (env: TESTSPRITE_POOL; default: 2; recycled after "
+        "TESTSPRITE_POOL_USES leases, default 10)",
+    )
+    parser.add_argument(
+        "--budgets",
+        metavar="PATH",
+        help="performance budget file, or 'off' (env: TESTSPRITE_BUDGETS; "
+        "default: perf_budgets.json)",
+    )
+    parser.add_argument(
+        "--results",
+        metavar="PATH",
+        help="SQLite result store each finished scenario is appended to, or 'off' "
+        "(env: TESTSPRITE_RESULTS; default: tmp/results.sqlite)",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="DIR",
+        help="directory the HTML and Markdown reports are written to as scenarios finish, "
+        "or 'off' (env: TESTSPRITE_REPORT; default: tmp/reports)",
+    )
+    parser.add_argument(
+        "--retry-budget",
+        type=float,
+        metavar="SECONDS",
+        default=float(os.environ.get("TESTSPRITE_RETRY_BUDGET", flaky.DEFAULT_RETRY_BUDGET)),
+        help="scenario time the run may spend retrying failed flaky scenarios; 0 disables "
+        "retries (env: TESTSPRITE_RETRY_BUDGET)",
+    )
+    parser.add_argument(
+        "--no-quarantine",
+        action="store_true",
+        help="run scenarios the result history marks as quarantined in the main lane",
+    )
+    parser.add_argument(
+        "--apps",
+        choices=list(apps.MODES),
+        help="how the app servers are provided: 'static' builds the apps once and serves the "
+        "builds, 'dev' starts vite dev servers, one origin pair per worker either way; "
+        "'external' uses TESTSPRITE_APP_ORIGINS as is (env: TESTSPRITE_APPS; default: static, "
+        "external when TESTSPRITE_APP_ORIGINS is set)",
+    )
+    parser.add_argument(
+        "--no-preflight",
+        action="store_true",
+        help="skip the checks of the app servers, login form and auth before the run",
+    )
+    parser.add_argument(
+        "--standin",
+        action="store_true",
+        help="serve Supabase from the local in-memory stand-in instead of the hosted project",
+    )
+    parser.add_argument(
+        "--standin-port",
+        type=int,
+        default=int(os.environ.get("TESTSPRITE_STANDIN_PORT", STANDIN_PORT)),
+        help="stand-in port; the apps must be started against it (env: TESTSPRITE_STANDIN_PORT)",
+    )
+    parser.add_argument(
+        "--shared-data",
+        action="store_true",
+        help="with --standin, let every scenario see the same data instead of its own clone",
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency is None:
+        args.concurrency = launch.profile(args.profile).concurrency
+    return args
+
+
+def report(result: ScenarioResult) -> None:
+    line = (
+        f"{result.status:<7} {result.duration:7.1f}s  "
+        f"idle -{result.waits.removed:6.1f}s  "
+        f"net -{result.network.saved_bytes / 1024:7.0f}KB/{result.network.saved_requests:4d}  "
+        f"{result.scenario.name}"
+    )
+    if result.attempt:
+        line += f" (retry {result.attempt})"
+    if not result.gating:
+        line += f" [{result.lane}]"
+    if result.error:
+        lines = result.error.splitlines()
+        # A budget diff is shown whole, any other error by its last line.
+        shown = lines[lines.index(budgets.HEADER) :] if budgets.HEADER in lines else lines[-1:]
+        line += "".join(f"\n        {text}" for text in shown)
+    print(line, flush=True)
+
+
+def report_plan(shards: list[Shard]) -> None:
+    for shard in shards:
+        print(
+            f"shard {shard.index}: {len(shard.scenarios):3d} scenarios, "
+            f"~{shard.expected:6.0f}s expected"
+            + ("" if shard.lane == MAIN else f" ({shard.lane} lane, one at a time)"),
+            flush=True,
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    scenarios = discover(args.patterns)
+    if not scenarios:
+        print("No scenarios matched.", file=sys.stderr)
+        return 2
+
+    if args.full_network:
+        os.environ["TESTSPRITE_FULL_NETWORK"] = "1"
+    if args.no_shared_prefix:
+        os.environ["TESTSPRITE_PREFIX"] = "off"
+    if args.pool is not None:
+        os.environ["TESTSPRITE_POOL"] = str(args.pool)
+    if args.budgets:
+        os.environ["TESTSPRITE_BUDGETS"] = args.budgets
+    if args.results:
+        os.environ["TESTSPRITE_RESULTS"] = args.results
+    if args.report:
+        os.environ["TESTSPRITE_REPORT"] = args.report
+    standin = StandIn(port=args.standin_port).start() if args.standin else None
+    if standin is not None:
+        os.environ.update(standin.environ())
+        os.environ["TESTSPRITE_ISOLATE"] = "0" if args.shared_data else "1"
+        print(f"Supabase stand-in on {standin.url}", flush=True)
+
+    scores = flaky.load()
+    quarantined = [
+        s
+        for s in scenarios
+        if not args.no_quarantine
+        and s.name in scores
+        and scores[s.name].verdict == flaky.QUARANTINED
+    ]
+    if quarantined:
+        print(f"Quarantined as flaky: {', '.join(s.name for s in quarantined)}", flush=True)
+        scenarios = [s for s in scenarios if s not in quarantined]
+    retry = flaky.RetryBudget(args.retry_budget, scores) if args.retry_budget > 0 else None
+    sharded = args.workers > 1 or bool(quarantined)
+
+    if args.apps:
+        os.environ["TESTSPRITE_APPS"] = args.apps
+    workers = max(1, min(args.workers, len(scenarios))) + bool(quarantined)
+    try:
+        fleet = apps.Fleet(apps.mode(), workers if sharded else 1).start()
+    except apps.AppError as exc:
+        print(f"App servers did not start; no scenario was run:\n{exc}", file=sys.stderr)
+        if standin is not None:
+            standin.stop()
+        return 3
+    os.environ.update(fleet.slot(0).environ())
+    print(fleet.describe(), flush=True)
+
+    def stop_servers() -> None:
+        fleet.stop()
+        if standin is not None:
+            standin.stop()
+
+    if not args.no_preflight:
+        role = next((s.role for s in scenarios + quarantined if s.role), preflight.DEFAULT_ROLE)
+        checked = asyncio.run(
+            preflight.run(role, headless=False if args.headed else None, profile=args.profile)
+        )
+        print(checked.describe(), flush=True)
+        if not checked.ok:
+            stop_servers()
+            return 3
+
+    started_at = time.time()
+    start = time.perf_counter()
+    recorder = Recorder.open(
+        profile=args.profile,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        patterns=args.patterns,
+        standin=standin is not None,
+        isolated=standin is not None and not args.shared_data,
+    )
+    reporter = Reporter.open(started_at, recorder.store)
+    if reporter.report is not None:
+        print(f"Report: {reporter.report.html_path}", flush=True)
+
+    def finished(result: ScenarioResult) -> None:
+        report(result)
+        recorder(result)
+        reporter(result)
+
+    try:
+        if sharded:
+            results = run_sharded(
+                scenarios,
+                workers=args.workers,
+                concurrency=args.concurrency,
+                headless=False if args.headed else None,
+                timeout=args.timeout,
+                on_result=finished,
+                profile=args.profile,
+                on_plan=report_plan,
+                retry=retry,
+                quarantine=quarantined,
+                environs=fleet.environs(),
+            )
+        else:
+            results = asyncio.run(
+                run_suite(
+                    scenarios,
+                    concurrency=args.concurrency,
+                    headless=False if args.headed else None,
+                    timeout=args.timeout,
+                    on_result=finished,
+                    profile=args.profile,
+                    retry=retry,
+                )
+            )
+    finally:
+        reporter.close()
+        recorder.close()
+        stop_servers()
+    vitals_file = vitals.write_run(
+        results,
+        started_at,
+        profile=args.profile,
+        workers=args.workers,
+        concurrency=args.concurrency,
+    )
+    failed = [r for r in results if r.gating and not r.passed]
+    lane = [r for r in results if not r.gating]
+    replaced = sum(r.waits.replaced for r in results)
+    removed = sum(r.waits.removed for r in results)
+    blocked = sum(sum(r.network.blocked.values()) for r in results)
+    hits = sum(r.network.cache_hits for r in results)
+    saved = sum(r.network.saved_bytes for r in results)
+    print(
+        f"\n{len(results) - len(lane) - len(failed)} passed, {len(failed)} failed "
+        f"in {time.perf_counter() - start:.1f}s; "
+        f"fixed waits {replaced:.0f}s replaced, {removed:.1f}s idle removed; "
+        f"{blocked} requests blocked, {hits} served from cache, {saved / 2**20:.1f} MB saved"
+    )
+    retried = sum(r.attempt for r in results)
+    if retried or lane:
+        print(
+            f"{retried} flaky retries; quarantine lane: "
+            f"{sum(r.passed for r in lane)} passed, {sum(not r.passed for r in lane)} failed "
+            "(not gating)"
+        )
+    print(f"Web Vitals per step: {vitals_file}")
+    if recorder.store is not None:
+        print(f"Results: {recorder.store.path} (run {recorder.run_id})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
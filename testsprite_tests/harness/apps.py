@@ -0,0 +1,489 @@
+"""App servers started, health-probed and reused by the runner.
+
+The scenarios used to run against whatever answered on ``localhost:8080``
+and ``:8081``: usually two ``vite`` dev servers shared by every worker, each
+request going through Vite's transform pipeline and every page holding an
+HMR socket.  :class:`Fleet` starts the servers itself, one origin pair per
+worker process (:class:`Slot`), in one of three modes:
+
+``static`` (default)
+    Each app is built once with ``vite build`` into ``tmp/apps/<app>`` and
+    served by a threaded static server in the runner process, with the SPA
+    fallback to ``index.html``, ``sendfile`` for bodies and immutable
+    caching of the hashed ``/assets``.  A build is reused while the app's
+    and ``packages/`` sources and the Supabase URL and key it was built
+    with (Vite inlines them) are unchanged.
+``dev``
+    One ``vite`` dev server per app and slot, on free ports.  Slot 0
+    reuses dev servers already answering on the default origins.
+``external``
+    Nothing is started; ``TESTSPRITE_APP_ORIGINS`` (or the defaults) is
+    used as before.  The default when ``TESTSPRITE_APP_ORIGINS`` is set.
+
+Each slot's origins reach its worker as ``TESTSPRITE_APP_ORIGINS``
+(:meth:`Slot.environ`), which the page objects read through
+:func:`harness.config.app_origins`.  ``python -m harness.apps`` builds the
+apps, or serves them until interrupted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Protocol
+from urllib.parse import urlsplit
+
+from harness import config
+from harness.scenarios import SUITE_DIR
+
+REPO_DIR = SUITE_DIR.parent
+PACKAGES_DIR = REPO_DIR / "packages"
+BUILD_DIR = SUITE_DIR / "tmp" / "apps"
+BUILD_INFO = ".testsprite-build.json"
+
+STATIC = "static"
+DEV = "dev"
+EXTERNAL = "external"
+MODES = (STATIC, DEV, EXTERNAL)
+
+HOST = "127.0.0.1"
+READY_TIMEOUT = 60.0
+BUILD_TIMEOUT = 600.0
+
+# Not part of any app's output; skipped when stamping the sources.
+_IGNORED_DIRS = {"node_modules", "dist", "dev-dist", "coverage", ".turbo", ".vite"}
+
+
+class AppError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class App:
+    name: str
+    directory: Path
+
+    @property
+    def output(self) -> Path:
+        return BUILD_DIR / self.name
+
+
+# In the order of :func:`harness.config.app_origins`.
+APPS = (
+    App("pei-collab", REPO_DIR / "apps" / "pei-collab"),
+    App("gestao-escolar", REPO_DIR / "apps" / "gestao-escolar"),
+)
+
+
+def mode() -> str:
+    """``TESTSPRITE_APPS``; ``external`` when the origins are set explicitly."""
+    default = EXTERNAL if os.environ.get("TESTSPRITE_APP_ORIGINS") else STATIC
+    value = os.environ.get("TESTSPRITE_APPS") or default
+    if value not in MODES:
+        raise AppError(f"TESTSPRITE_APPS must be one of {', '.join(MODES)}, not {value!r}")
+    return value
+
+
+def build_environ() -> dict[str, str]:
+    """Variables Vite inlines into the bundle."""
+    key = config.supabase_anon_key()
+    return {
+        "VITE_SUPABASE_URL": config.supabase_url(),
+        "VITE_SUPABASE_ANON_KEY": key,
+        "VITE_SUPABASE_PUBLISHABLE_KEY": key,
+    }
+
+
+def source_stamp(app: App) -> str:
+    """Hash of the path, size and mtime of every source the app's build reads."""
+    digest = hashlib.sha1()
+    for root in (app.directory, PACKAGES_DIR):
+        for directory, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d not in _IGNORED_DIRS)
+            for name in sorted(files):
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _tail(path: Path, lines: int = 15) -> str:
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return ""
+    return "\n".join(text.splitlines()[-lines:])
+
+
+def _vite(app: App, *args: str) -> list[str]:
+    """The workspace's ``vite`` binary, else ``npx``."""
+    for directory in (app.directory, REPO_DIR):
+        binary = directory / "node_modules" / ".bin" / "vite"
+        if binary.exists():
+            return [str(binary), *args]
+    npx = shutil.which("npx")
+    if npx is None:
+        raise AppError("neither node_modules/.bin/vite nor npx found; run npm install")
+    return [npx, "--no-install", "vite", *args]
+
+
+def build(app: App, force: bool = False) -> bool:
+    """Build ``app`` into :attr:`App.output` unless a current build is there.
+
+    Returns whether it built.
+    """
+    stamp = {"sources": source_stamp(app), **build_environ()}
+    info = app.output / BUILD_INFO
+    try:
+        current = json.loads(info.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        current = None
+    if not force and current == stamp and (app.output / "index.html").exists():
+        return False
+
+    log = BUILD_DIR / f"{app.name}-build.log"
+    log.parent.mkdir(parents=True, exist_ok=True)
+    command = _vite(app, "build", "--outDir", str(app.output), "--emptyOutDir")
+    with log.open("w", encoding="utf-8") as output:
+        try:
+            process = subprocess.run(
+                command,
+                cwd=app.directory,
+                env={**os.environ, **stamp, "NODE_ENV": "production"},
+                stdout=output,
+                stderr=subprocess.STDOUT,
+                timeout=BUILD_TIMEOUT,
+            )
+        except subprocess.TimeoutExpired:
+            raise AppError(f"{app.name}: vite build took over {BUILD_TIMEOUT:.0f}s") from None
+    if process.returncode != 0 or not (app.output / "index.html").exists():
+        raise AppError(
+            f"{app.name}: vite build exited with {process.returncode} (log: {log})\n" + _tail(log)
+        )
+    info.write_text(json.dumps(stamp), encoding="utf-8")
+    return True
+
+
+def probe(origin: str, timeout: float = 5.0) -> str:
+    """Fetch ``origin``'s ``/`` and check for the ``<div id="root">`` shell."""
+    try:
+        with urllib.request.urlopen(origin + "/", timeout=timeout) as response:
+            body = response.read()
+    except urllib.error.HTTPError as exc:
+        raise AppError(f"{origin}: HTTP {exc.code}") from None
+    except (urllib.error.URLError, OSError) as exc:
+        reason = exc.reason if isinstance(exc, urllib.error.URLError) else exc
+        raise AppError(f"{origin}: unreachable: {reason}") from None
+    if b'id="root"' not in body:
+        raise AppError(f'{origin}: HTTP 200 but no <div id="root"> in {len(body)} bytes')
+    return f"HTTP 200, {len(body) / 1024:.1f} KB"
+
+
+def wait_ready(
+    origin: str,
+    timeout: float = READY_TIMEOUT,
+    alive: Callable[[], bool] = lambda: True,
+) -> None:
+    """Probe ``origin`` until it serves the shell, ``alive()`` fails or time runs out."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            probe(origin, timeout=min(5.0, timeout))
+            return
+        except AppError as exc:
+            if not alive():
+                raise AppError(f"{origin}: server exited before answering") from None
+            if time.monotonic() > deadline:
+                raise AppError(f"{exc} (after {timeout:.0f}s)") from None
+        time.sleep(0.25)
+
+
+def _free_port(host: str = HOST) -> int:
+    with socket.socket() as probe_socket:
+        probe_socket.bind((host, 0))
+        return probe_socket.getsockname()[1]
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def translate_path(self, path: str) -> str:
+        resolved = super().translate_path(path)
+        if os.path.isfile(resolved) or Path(urlsplit(path).path).suffix:
+            return resolved
+        # Client-side route: let React Router resolve it.
+        return os.path.join(self.directory, "index.html")
+
+    def end_headers(self) -> None:
+        if self.path.startswith("/assets/"):
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        else:
+            self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+    def copyfile(self, source: Any, outputfile: Any) -> None:
+        self.request.sendfile(source)
+
+
+class _StaticHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class Server(Protocol):
+    origin: str
+
+    def start(self) -> "Server": ...
+
+    def stop(self) -> None: ...
+
+
+@dataclass
+class StaticServer:
+    """Serves a build directory on ``port`` (``0`` picks a free one)."""
+
+    root: Path
+    port: int = 0
+    host: str = HOST
+    _server: _StaticHTTPServer | None = field(default=None, repr=False)
+    _thread: threading.Thread | None = field(default=None, repr=False)
+
+    @property
+    def origin(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "StaticServer":
+        handler = functools.partial(_Handler, directory=str(self.root))
+        self._server = _StaticHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=f"app-{self.port}", daemon=True
+        )
+        self._thread.start()
+        wait_ready(self.origin, timeout=5.0)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+@dataclass
+class DevServer:
+    """A ``vite`` dev server for ``app`` on ``port``, logging to ``tmp/apps``."""
+
+    app: App
+    port: int
+    host: str = HOST
+    _process: subprocess.Popen | None = field(default=None, repr=False)
+
+    @property
+    def origin(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def log(self) -> Path:
+        return BUILD_DIR / f"{self.app.name}-dev-{self.port}.log"
+
+    def start(self) -> "DevServer":
+        self.log.parent.mkdir(parents=True, exist_ok=True)
+        command = _vite(self.app, "--host", self.host, "--port", str(self.port), "--strictPort")
+        with self.log.open("w", encoding="utf-8") as output:
+            self._process = subprocess.Popen(
+                command,
+                cwd=self.app.directory,
+                env={**os.environ, **build_environ()},
+                stdin=subprocess.DEVNULL,
+                stdout=output,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        try:
+            wait_ready(self.origin, alive=lambda: self._process.poll() is None)
+        except AppError as exc:
+            self.stop()
+            raise AppError(f"{self.app.name}: {exc} (log: {self.log})\n" + _tail(self.log))
+        return self
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            os.killpg(self._process.pid, signal.SIGTERM)
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(self._process.pid, signal.SIGKILL)
+                self._process.wait()
+        self._process = None
+
+
+@dataclass
+class ExternalServer:
+    """A server someone else runs; only probed."""
+
+    origin: str
+
+    def start(self) -> "ExternalServer":
+        return self
+
+    def stop(self) -> None:
+        pass
+
+
+@dataclass
+class Slot:
+    """One server per app, for one worker process."""
+
+    index: int
+    servers: list[Server] = field(default_factory=list)
+
+    @property
+    def origins(self) -> tuple[str, ...]:
+        return tuple(server.origin for server in self.servers)
+
+    def environ(self) -> dict[str, str]:
+        return {"TESTSPRITE_APP_ORIGINS": ",".join(self.origins)}
+
+
+@dataclass
+class Fleet:
+    """App servers for ``slots`` workers, started by :meth:`start`."""
+
+    mode: str = STATIC
+    slots: int = 1
+    built: list[str] = field(default_factory=list)
+    running: list[Slot] = field(default_factory=list)
+
+    def _reusable(self) -> bool:
+        try:
+            for origin in config.DEFAULT_APP_ORIGINS:
+                probe(origin, timeout=2.0)
+        except AppError:
+            return False
+        return True
+
+    def _slot(self, index: int) -> Slot:
+        if self.mode == EXTERNAL:
+            return Slot(index, [ExternalServer(origin) for origin in config.app_origins()])
+        if self.mode == DEV:
+            if index == 0 and self._reusable():
+                return Slot(index, [ExternalServer(o) for o in config.DEFAULT_APP_ORIGINS])
+            return Slot(index, [DevServer(app, _free_port()) for app in APPS])
+        return Slot(index, [StaticServer(app.output) for app in APPS])
+
+    def start(self) -> "Fleet":
+        """Build if needed, then start and health-probe every slot's servers.
+
+        In ``external`` mode the shared servers are only probed.
+        """
+        try:
+            if self.mode == STATIC:
+                self.built = [app.name for app in APPS if build(app)]
+            for index in range(self.slots if self.mode != EXTERNAL else 1):
+                slot = self._slot(index)
+                self.running.append(slot)
+                for server in slot.servers:
+                    server.start()
+                if self.mode == EXTERNAL:
+                    for origin in slot.origins:
+                        probe(origin)
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def slot(self, index: int) -> Slot:
+        """Slot of worker ``index``; the shared servers in ``external`` mode."""
+        return self.running[index % len(self.running)]
+
+    def environs(self) -> list[dict[str, str]]:
+        return [self.slot(index).environ() for index in range(self.slots)]
+
+    def describe(self) -> str:
+        if self.mode == EXTERNAL:
+            return f"Apps: external, {', '.join(self.slot(0).origins)}"
+        built = f"built {', '.join(self.built)}" if self.built else "builds reused"
+        pairs = "; ".join(", ".join(s.origins) for s in self.running)
+        return f"Apps: {self.mode} ({built if self.mode == STATIC else 'vite'}), {pairs}"
+
+    def stop(self) -> None:
+        for slot in self.running:
+            for server in slot.servers:
+                server.stop()
+        self.running = []
+
+    def __enter__(self) -> "Fleet":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.apps",
+        description="Build the apps for the harness, or serve them until interrupted.",
+    )
+    parser.add_argument("command", choices=("build", "serve"))
+    parser.add_argument("--mode", choices=(STATIC, DEV), default=STATIC, help="with serve")
+    parser.add_argument("--slots", type=int, default=1, help="origin pairs to serve")
+    parser.add_argument("--force", action="store_true", help="rebuild even if current")
+    parser.add_argument("--standin", action="store_true", help="build against the local stand-in")
+    args = parser.parse_args(argv)
+
+    if args.standin:
+        # Built against the stand-in's fixed default port and key.
+        from harness.standin import StandIn
+
+        os.environ.update(StandIn().environ())
+    try:
+        if args.command == "build":
+            for app in APPS:
+                started = time.perf_counter()
+                done = build(app, force=args.force)
+                print(
+                    f"{app.name}: {'built' if done else 'current'} in "
+                    f"{time.perf_counter() - started:.1f}s -> {app.output}"
+                )
+            return 0
+        with Fleet(args.mode, args.slots) as fleet:
+            print(fleet.describe(), flush=True)
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+    except AppError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
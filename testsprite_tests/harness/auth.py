@@ -0,0 +1,214 @@
+"""Per-role authenticated ``storage_state`` cache.
+
+Each role signs in once through GoTrue's password grant; the resulting
+session is written as a Playwright storage state holding the supabase-js
+``sb-<ref>-auth-token`` localStorage entry for every app origin.  States are
+kept under ``tmp/auth/`` and reused, across scenarios and across runs, until
+the access token is about to expire; an expiring state is renewed with its
+refresh token before falling back to a new password sign-in.
+
+Scenarios open their context with::
+
+    context = await browser.new_context(storage_state=await auth.storage_state(ROLE))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+from urllib.parse import urlparse
+
+from harness import config
+from harness.scenarios import SUITE_DIR
+
+STATE_DIR = SUITE_DIR / "tmp" / "auth"
+
+# States expiring sooner than this are renewed before use, in seconds.
+EXPIRY_MARGIN = 300
+
+DEFAULT_PASSWORD = "Teste123"
+
+
+@dataclass(frozen=True)
+class Credentials:
+    email: str
+    password: str = DEFAULT_PASSWORD
+
+
+# Test users from CREDENCIAIS_TESTE.md; override with
+# TESTSPRITE_<ROLE>_EMAIL / TESTSPRITE_<ROLE>_PASSWORD.
+ROLES: dict[str, Credentials] = {
+    "superadmin": Credentials("superadmin@teste.com", "Teste123!"),
+    "education_secretary": Credentials("secretario.educacao@teste.com"),
+    "school_director": Credentials("diretor.escola@teste.com"),
+    "coordinator": Credentials("coordenador@teste.com"),
+    "teacher": Credentials("professor@teste.com"),
+    "family": Credentials("familia@teste.com"),
+    "specialist": Credentials("especialista@teste.com"),
+    "aee_teacher": Credentials("professor.aee@teste.com"),
+}
+
+
+class AuthError(RuntimeError):
+    pass
+
+
+def credentials(role: str) -> Credentials:
+    try:
+        default = ROLES[role]
+    except KeyError:
+        raise AuthError(f"Unknown role {role!r}; expected one of {', '.join(ROLES)}") from None
+    prefix = f"TESTSPRITE_{role.upper()}_"
+    return Credentials(
+        email=os.environ.get(prefix + "EMAIL", default.email),
+        password=os.environ.get(prefix + "PASSWORD", default.password),
+    )
+
+
+def _token_request(grant_type: str, payload: dict[str, str]) -> dict[str, Any]:
+    request = urllib.request.Request(
+        f"{config.supabase_url()}/auth/v1/token?grant_type={grant_type}",
+        data=json.dumps(payload).encode(),
+        headers={"apikey": config.supabase_anon_key(), "Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            session = json.load(response)
+    except urllib.error.HTTPError as exc:
+        detail = exc.read().decode(errors="replace")
+        raise AuthError(f"{grant_type} grant failed with {exc.code}: {detail}") from None
+    except urllib.error.URLError as exc:
+        raise AuthError(f"{grant_type} grant failed: {exc.reason}") from None
+    session.setdefault("expires_at", int(time.time()) + int(session.get("expires_in", 3600)))
+    return session
+
+
+def sign_in(role: str) -> dict[str, Any]:
+    """Password-grant session for ``role``, shaped as supabase-js stores it."""
+    creds = credentials(role)
+    try:
+        return _token_request("password", {"email": creds.email, "password": creds.password})
+    except AuthError as exc:
+        raise AuthError(f"Could not sign in as {role} ({creds.email}): {exc}") from None
+
+
+def refresh(session: dict[str, Any]) -> dict[str, Any]:
+    return _token_request("refresh_token", {"refresh_token": session["refresh_token"]})
+
+
+def to_storage_state(
+    session: dict[str, Any], origins: Iterable[str] | None = None
+) -> dict[str, Any]:
+    """Storage state holding ``session`` on ``origins`` (default: the app origins)."""
+    entry = {"name": config.auth_storage_key(), "value": json.dumps(session)}
+    origins = config.app_origins() if origins is None else origins
+    return {
+        "cookies": [],
+        "origins": [{"origin": origin, "localStorage": [entry]} for origin in origins],
+    }
+
+
+def session_of(state: dict[str, Any]) -> dict[str, Any] | None:
+    key = config.auth_storage_key()
+    for origin in state.get("origins", []):
+        for entry in origin.get("localStorage", []):
+            if entry.get("name") == key:
+                return json.loads(entry["value"])
+    return None
+
+
+def _origins(state: dict[str, Any]) -> set[str]:
+    return {origin.get("origin") for origin in state.get("origins", [])}
+
+
+def is_fresh(session: dict[str, Any] | None, margin: float = EXPIRY_MARGIN) -> bool:
+    return bool(session) and session.get("expires_at", 0) - margin > time.time()
+
+
+class StorageStateCache:
+    """On-disk storage states, one JSON file per role."""
+
+    def __init__(self, directory: Path = STATE_DIR, margin: float = EXPIRY_MARGIN) -> None:
+        self.directory = directory
+        self.margin = margin
+        self._locks: dict[tuple[int, str], asyncio.Lock] = {}
+
+    def path(self, role: str) -> Path:
+        # Scoped by Supabase host so a run against a local stand-in never
+        # picks up a session issued by the hosted project, and vice versa.
+        scope = re.sub(r"[^A-Za-z0-9]+", "_", urlparse(config.supabase_url()).netloc)
+        return self.directory / scope / f"{role}.json"
+
+    def _lock(self, role: str) -> asyncio.Lock:
+        key = (id(asyncio.get_running_loop()), role)
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def _read(self, role: str) -> dict[str, Any] | None:
+        try:
+            return json.loads(self.path(role).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, role: str, state: dict[str, Any]) -> None:
+        path = self.path(role)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{role}.", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+        os.replace(tmp, path)
+
+    def _renew(self, role: str, stale: dict[str, Any] | None) -> dict[str, Any]:
+        if stale and stale.get("refresh_token"):
+            try:
+                return refresh(stale)
+            except AuthError:
+                pass
+        return sign_in(role)
+
+    async def get(self, role: str) -> str:
+        """Path of a fresh storage state for ``role``, signing in if needed."""
+        credentials(role)  # fail fast on unknown roles
+        async with self._lock(role):
+            state = self._read(role)
+            session = session_of(state) if state else None
+            # Worker processes have origins of their own (harness.apps); the
+            # file covers all of them so no worker rewrites it under another.
+            known = _origins(state) if state else set()
+            wanted = set(config.app_origins())
+            if not is_fresh(session, self.margin):
+                session = await asyncio.to_thread(self._renew, role, session)
+                state = None
+            if state is None or not wanted <= known:
+                self._write(role, to_storage_state(session, sorted(known | wanted)))
+            return str(self.path(role))
+
+    async def warm(self, roles: Iterable[str]) -> None:
+        """Sign every role in concurrently ahead of the scenarios.
+
+        Failures are left for the scenarios needing that role to report.
+        """
+        await asyncio.gather(*(self.get(role) for role in set(roles)), return_exceptions=True)
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+
+cache = StorageStateCache()
+
+
+async def storage_state(role: str) -> str:
+    """Storage state path for ``role`` from the shared :data:`cache`."""
+    return await cache.get(role)
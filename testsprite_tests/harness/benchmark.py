@@ -0,0 +1,241 @@
+"""``python -m harness.benchmark``: compare launch profiles on the suite.
+
+Each profile runs the selected scenarios once per repetition, in this
+process and one after another, at the profile's suggested concurrency unless
+``-j`` is given.  Reported per profile: wall-clock time, scenarios per
+minute, passes, failures, browser crashes and the peak resident memory of
+the Playwright driver and Chromium process tree (sampled from ``/proc``).
+Results are also written to ``tmp/launch_benchmark.json``.
+
+As with ``python -m harness``, the app servers (:class:`harness.apps.Fleet`)
+are started and the preflight is run before the first profile.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from harness import apps, launch, preflight
+from harness.runner import DEFAULT_TIMEOUT, run_suite
+from harness.scenarios import SUITE_DIR, discover
+from harness.standin import StandIn
+
+OUTPUT_FILE = SUITE_DIR / "tmp" / "launch_benchmark.json"
+
+# Error fragments Playwright reports when a renderer or the browser dies.
+CRASH_MARKERS = ("Target crashed", "Target closed", "Browser closed", "has been closed")
+
+_SAMPLE_INTERVAL = 0.25
+
+
+@dataclass
+class ProfileRun:
+    profile: str
+    concurrency: int
+    scenarios: int
+    wall: float
+    passed: int
+    failed: int
+    crashed: int
+    peak_rss_mb: float | None
+
+    @property
+    def per_minute(self) -> float:
+        return self.scenarios / self.wall * 60 if self.wall else 0.0
+
+
+def _children() -> dict[int, list[int]]:
+    tree: dict[int, list[int]] = {}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat", encoding="ascii", errors="replace") as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        tree.setdefault(int(fields[1]), []).append(int(entry.name))
+    return tree
+
+
+def tree_rss(root: int) -> int | None:
+    """Resident bytes of ``root``'s descendants, or ``None`` without ``/proc``."""
+    if not os.path.isdir("/proc"):
+        return None
+    tree, total = _children(), 0
+    pending = list(tree.get(root, []))
+    while pending:
+        pid = pending.pop()
+        pending.extend(tree.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/statm", encoding="ascii") as handle:
+                total += int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+class _PeakSampler(threading.Thread):
+    def __init__(self) -> None:
+        super().__init__(name="rss-sampler", daemon=True)
+        self.peak: int | None = None
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(_SAMPLE_INTERVAL):
+            rss = tree_rss(os.getpid())
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+
+    def stop(self) -> int | None:
+        self._done.set()
+        self.join()
+        return self.peak
+
+
+def run_profile(
+    name: str,
+    patterns: list[str],
+    concurrency: int | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> ProfileRun:
+    profile = launch.profile(name)
+    scenarios = discover(patterns)
+    concurrency = concurrency or profile.concurrency
+    sampler = _PeakSampler()
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(
+            run_suite(scenarios, concurrency, timeout=timeout, profile=profile.name)
+        )
+    finally:
+        wall = time.perf_counter() - start
+        peak = sampler.stop()
+    return ProfileRun(
+        profile=profile.name,
+        concurrency=concurrency,
+        scenarios=len(results),
+        wall=wall,
+        passed=sum(r.passed for r in results),
+        failed=sum(not r.passed for r in results),
+        crashed=sum(any(m in (r.error or "") for m in CRASH_MARKERS) for r in results),
+        peak_rss_mb=None if peak is None else peak / 2**20,
+    )
+
+
+def summarise(runs: list[ProfileRun]) -> list[dict[str, object]]:
+    rows = []
+    for name in dict.fromkeys(r.profile for r in runs):
+        mine = [r for r in runs if r.profile == name]
+        peaks = [r.peak_rss_mb for r in mine if r.peak_rss_mb is not None]
+        rows.append(
+            {
+                "profile": name,
+                "concurrency": mine[0].concurrency,
+                "repeats": len(mine),
+                "scenarios": mine[0].scenarios,
+                "wall_median_s": statistics.median(r.wall for r in mine),
+                "per_minute": statistics.median(r.per_minute for r in mine),
+                "passed": statistics.median(r.passed for r in mine),
+                "failed": statistics.median(r.failed for r in mine),
+                "crashed": sum(r.crashed for r in mine),
+                "peak_rss_mb": max(peaks) if peaks else None,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.benchmark",
+        description="Run the suite under each Chromium launch profile and compare.",
+    )
+    parser.add_argument("patterns", nargs="*", help="scenario prefixes or globs")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=list(launch.PROFILES),
+        default=["throughput", "low-memory"],
+    )
+    parser.add_argument("-j", "--concurrency", type=int, help="override every profile's")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--standin", action="store_true", help="use the local Supabase stand-in")
+    parser.add_argument(
+        "--apps", choices=list(apps.MODES), help="as for python -m harness (env: TESTSPRITE_APPS)"
+    )
+    parser.add_argument(
+        "--no-preflight", action="store_true", help="skip the checks before the first profile"
+    )
+    args = parser.parse_args(argv)
+    scenarios = discover(args.patterns)
+    if not scenarios:
+        print("No scenarios matched.", file=sys.stderr)
+        return 2
+
+    # Each profile launches its own Chromium; a running daemon would be measured instead.
+    os.environ["TESTSPRITE_DAEMON"] = "off"
+    if args.apps:
+        os.environ["TESTSPRITE_APPS"] = args.apps
+    standin = StandIn().start() if args.standin else None
+    if standin is not None:
+        os.environ.update(standin.environ())
+    # Profiles run one after another in this process: one origin pair serves them all.
+    try:
+        fleet = apps.Fleet(apps.mode(), 1).start()
+    except apps.AppError as exc:
+        print(f"App servers did not start; no profile was run:\n{exc}", file=sys.stderr)
+        if standin is not None:
+            standin.stop()
+        return 3
+    os.environ.update(fleet.slot(0).environ())
+    print(fleet.describe(), flush=True)
+    try:
+        if not args.no_preflight:
+            role = next((s.role for s in scenarios if s.role), preflight.DEFAULT_ROLE)
+            checked = asyncio.run(preflight.run(role, profile=args.profiles[0]))
+            print(checked.describe(), flush=True)
+            if not checked.ok:
+                return 3
+        runs = [
+            run_profile(name, args.patterns, args.concurrency, args.timeout)
+            for _ in range(args.repeat)
+            for name in args.profiles
+        ]
+    finally:
+        fleet.stop()
+        if standin is not None:
+            standin.stop()
+    rows = summarise(runs)
+    print(
+        f"{'profile':<11} {'-j':>3} {'wall':>8} {'/min':>6} {'pass':>5} {'fail':>5} "
+        f"{'crash':>5} {'peak RSS':>9}"
+    )
+    for row in rows:
+        rss = "-" if row["peak_rss_mb"] is None else f"{row['peak_rss_mb']:.0f} MB"
+        print(
+            f"{row['profile']:<11} {row['concurrency']:>3} {row['wall_median_s']:>7.1f}s "
+            f"{row['per_minute']:>6.1f} {row['passed']:>5.0f} {row['failed']:>5.0f} "
+            f"{row['crashed']:>5} {rss:>9}"
+        )
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps({"runs": [asdict(r) for r in runs], "summary": rows}, indent=2),
+        encoding="utf-8",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
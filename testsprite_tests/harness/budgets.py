@@ -0,0 +1,137 @@
+"""Performance budgets per step and role.
+
+Budgets are declared in ``perf_budgets.json`` (``TESTSPRITE_BUDGETS`` points
+elsewhere, ``off`` disables them)::
+
+    {"budgets": [
+        {"step": "/dashboard", "role": "coordinator",
+         "max_load_ms": 4000, "max_rest_calls": 40,
+         "max_transfer_kb": 12000, "max_blocking_ms": 800}
+    ]}
+
+``step`` is matched (``fnmatch``) against the target of each step recorded
+by :mod:`harness.vitals`: the path given to ``PageObject.open`` or
+``PageObject.attribute`` for clicks, e.g. ``FamilyTokensPage.tokens_tab``.
+``role`` is optional.  The runner checks every step of a scenario once it
+has finished and fails the scenario with :func:`report` if a limit is
+exceeded.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from harness.scenarios import SUITE_DIR
+from harness.vitals import StepVitals
+
+BUDGETS_FILE = SUITE_DIR / "perf_budgets.json"
+
+HEADER = "Performance budget exceeded:"
+
+# Budget key -> (StepVitals field, unit the field is divided by).
+LIMITS: dict[str, tuple[str, float]] = {
+    "max_load_ms": ("duration", 1),
+    "max_rest_calls": ("rest_calls", 1),
+    "max_transfer_kb": ("transfer_bytes", 1024),
+    "max_blocking_ms": ("blocking_time", 1),
+}
+
+
+@dataclass(frozen=True)
+class Budget:
+    step: str
+    role: str | None
+    limits: dict[str, float]
+
+    @classmethod
+    def from_json(cls, entry: dict[str, Any]) -> "Budget":
+        if "step" not in entry:
+            raise ValueError(f"Invalid budget {entry!r}: missing required key 'step'")
+        unknown = set(entry) - {"step", "role", *LIMITS}
+        if unknown:
+            raise ValueError(f"Invalid budget {entry!r}: unknown keys {sorted(unknown)}")
+        return cls(
+            step=entry["step"],
+            role=entry.get("role"),
+            limits={k: float(v) for k, v in entry.items() if k in LIMITS},
+        )
+
+    def applies(self, step: StepVitals, role: str | None) -> bool:
+        return fnmatch.fnmatchcase(step.target, self.step) and self.role in (None, role)
+
+
+@dataclass(frozen=True)
+class Violation:
+    budget: Budget
+    step: StepVitals
+    index: int
+    limit: str
+    allowed: float
+    actual: float
+
+
+_cache: dict[Path, tuple[float, list[Budget]]] = {}
+
+
+def budgets_file() -> Path | None:
+    value = os.environ.get("TESTSPRITE_BUDGETS")
+    if value and value.lower() == "off":
+        return None
+    return Path(value) if value else BUDGETS_FILE
+
+
+def load(path: Path | None = None) -> list[Budget]:
+    """Budgets from ``path`` (default :func:`budgets_file`), reloaded on change."""
+    path = path or budgets_file()
+    if path is None or not path.exists():
+        return []
+    mtime = path.stat().st_mtime
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    entries = json.loads(path.read_text(encoding="utf-8")).get("budgets", [])
+    budgets = [Budget.from_json(entry) for entry in entries]
+    _cache[path] = (mtime, budgets)
+    return budgets
+
+
+def check(
+    steps: Iterable[StepVitals],
+    role: str | None,
+    budgets: list[Budget] | None = None,
+) -> list[Violation]:
+    budgets = load() if budgets is None else budgets
+    violations = []
+    for index, step in enumerate(steps, 1):
+        for budget in budgets:
+            if not budget.applies(step, role):
+                continue
+            for limit, allowed in budget.limits.items():
+                field, unit = LIMITS[limit]
+                value = getattr(step, field)
+                if value is not None and value / unit > allowed:
+                    violations.append(Violation(budget, step, index, limit, allowed, value / unit))
+    return violations
+
+
+def report(violations: list[Violation]) -> str:
+    """Human-readable diff of budget against actual, grouped by step."""
+    lines = [HEADER]
+    current = None
+    for v in violations:
+        if (v.index, v.budget) != current:
+            current = (v.index, v.budget)
+            who = f" as {v.budget.role}" if v.budget.role else ""
+            lines.append(f"  step {v.index} {v.step.kind} {v.step.target}{who} ({v.step.url})")
+        over = v.actual - v.allowed
+        percent = f", +{over / v.allowed:.0%}" if v.allowed else ""
+        lines.append(
+            f"    {v.limit:<16} budget {v.allowed:>10.0f}  actual {v.actual:>10.0f}"
+            f"  (+{over:.0f}{percent})"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,55 @@
+"""Environment-driven settings shared by the harness modules.
+
+Values are read on every call so the runner can repoint a run (for example
+at a local Supabase stand-in) by updating ``os.environ`` before scenarios
+start.
+"""
+
+from __future__ import annotations
+
+import os
+from urllib.parse import urlparse
+
+DEFAULT_SUPABASE_URL = "https://fximylewmvsllkdczovj.supabase.co"
+DEFAULT_SUPABASE_ANON_KEY = (
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJlZiI6ImZ4aW15bGV3bXZz"
+    "bGxrZGN6b3ZqIiwicm9sZSI6ImFub24iLCJpYXQiOjE3NjE2OTY0NzIsImV4cCI6MjA3NzI3MjQ3Mn0.3FqQqU"
+    "fVgD3hIh1daa3R1JjouGZ4D4ONR6SmcL9Qids"
+)
+
+# pei-collab and gestao-escolar dev servers, as hardcoded in the scenarios.
+DEFAULT_APP_ORIGINS = ("http://localhost:8080", "http://localhost:8081")
+
+
+def _env(*names: str, default: str) -> str:
+    for name in names:
+        value = os.environ.get(name)
+        if value:
+            return value
+    return default
+
+
+def supabase_url() -> str:
+    url = _env("TESTSPRITE_SUPABASE_URL", "VITE_SUPABASE_URL", default=DEFAULT_SUPABASE_URL)
+    return url.rstrip("/")
+
+
+def supabase_anon_key() -> str:
+    return _env(
+        "TESTSPRITE_SUPABASE_ANON_KEY",
+        "VITE_SUPABASE_ANON_KEY",
+        default=DEFAULT_SUPABASE_ANON_KEY,
+    )
+
+
+def auth_storage_key() -> str:
+    """localStorage key supabase-js uses for the session (``sb-<ref>-auth-token``)."""
+    ref = (urlparse(supabase_url()).hostname or "").split(".")[0]
+    return _env("TESTSPRITE_AUTH_STORAGE_KEY", default=f"sb-{ref}-auth-token")
+
+
+def app_origins() -> tuple[str, ...]:
+    value = os.environ.get("TESTSPRITE_APP_ORIGINS")
+    if not value:
+        return DEFAULT_APP_ORIGINS
+    return tuple(origin.strip().rstrip("/") for origin in value.split(",") if origin.strip())
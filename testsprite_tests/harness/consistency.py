@@ -0,0 +1,259 @@
+"""Row-level diff between the app's IndexedDB cache and the backend.
+
+:func:`check` reads every Dexie store of ``PEICollabOffline`` (plus the
+page's Supabase session) in a single ``page.evaluate``.  Each table is then
+fetched from PostgREST as one query scoped to the tenants found locally,
+keyset-paged by ``id``, and merge-joined against the local rows sorted the
+same way, so a page of remote rows is compared and dropped before the next
+is requested.  Rows are compared by a hash of the columns the local row
+carries; only rows whose hashes differ are compared column by column.
+
+Local rows still waiting to be uploaded (``is_synced: false``) are counted
+as pending rather than diffed.  Remote rows the cache never loaded are
+counted too, but are not inconsistencies::
+
+    report = await consistency.check(page)
+    assert report.consistent, report.describe()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator
+
+from playwright import async_api
+
+from harness import config, rest
+
+DATABASE = "PEICollabOffline"
+
+# Dexie store -> (PostgREST select, tenant filter column).  Goals and
+# barriers have no tenant of their own and are scoped through their PEI.
+TABLES: dict[str, tuple[str, str]] = {
+    "students": ("*", "tenant_id"),
+    "peis": ("*", "tenant_id"),
+    "pei_goals": ("*,peis!inner(tenant_id)", "peis.tenant_id"),
+    "pei_barriers": ("*,peis!inner(tenant_id)", "peis.tenant_id"),
+}
+
+# Bookkeeping columns of the Dexie layer, absent from the backend.
+LOCAL_ONLY = frozenset({"is_synced", "last_modified"})
+
+# Examples kept per table and kind in a report; counts are always complete.
+EXAMPLES = 20
+
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?$")
+
+_DUMP = """
+async ({database, stores, authKey}) => {
+  const names = (await indexedDB.databases()).map((d) => d.name);
+  let session = null;
+  try {
+    session = JSON.parse(localStorage.getItem(authKey));
+  } catch (error) {}
+  if (!names.includes(database)) return {session, stores: null};
+  const db = await new Promise((resolve, reject) => {
+    const request = indexedDB.open(database);
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+  const present = stores.filter((name) => db.objectStoreNames.contains(name));
+  const dump = {};
+  if (present.length) {
+    const tx = db.transaction(present, "readonly");
+    await Promise.all(present.map((name) => new Promise((resolve, reject) => {
+      const request = tx.objectStore(name).getAll();
+      request.onsuccess = () => resolve(dump[name] = request.result);
+      request.onerror = () => reject(request.error);
+    })));
+  }
+  db.close();
+  return {session, stores: dump};
+}
+"""
+
+
+class ConsistencyError(RuntimeError):
+    pass
+
+
+@dataclass
+class TableDiff:
+    table: str
+    local: int = 0
+    pending: int = 0
+    matched: int = 0
+    changed: int = 0
+    missing_remote: int = 0
+    remote_only: int = 0
+    # (id, differing columns) and ids, at most ``EXAMPLES`` of each.
+    changed_rows: list[tuple[str, list[str]]] = field(default_factory=list)
+    missing_rows: list[str] = field(default_factory=list)
+
+    @property
+    def consistent(self) -> bool:
+        return not (self.changed or self.missing_remote)
+
+
+@dataclass
+class Report:
+    tables: list[TableDiff]
+    seconds: float
+
+    @property
+    def consistent(self) -> bool:
+        return all(t.consistent for t in self.tables)
+
+    def describe(self) -> str:
+        lines = [f"IndexedDB vs backend ({self.seconds:.1f}s):"]
+        for t in self.tables:
+            lines.append(
+                f"  {t.table:<13} {t.local:6d} local  {t.matched:6d} equal  "
+                f"{t.changed:5d} changed  {t.missing_remote:5d} missing remotely  "
+                f"{t.pending:5d} pending  {t.remote_only:6d} remote only"
+            )
+            for row_id, columns in t.changed_rows:
+                lines.append(f"    ~ {row_id}: {', '.join(columns)}")
+            for row_id in t.missing_rows:
+                lines.append(f"    - {row_id}")
+        return "\n".join(lines)
+
+
+def normalise(value: Any) -> Any:
+    """Comparable form of a column value.
+
+    Timestamps are rewritten in UTC with millisecond precision, since the
+    app stores ``toISOString()`` values and Postgres returns microseconds
+    with an offset.
+    """
+    if isinstance(value, str) and _TIMESTAMP.match(value):
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds")
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: normalise(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalise(v) for v in value]
+    return value
+
+
+def _digest(row: dict[str, Any], columns: Iterable[str]) -> bytes:
+    canonical = json.dumps(
+        [normalise(row.get(c)) for c in columns],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+
+
+def diff_table(
+    table: str,
+    local: list[dict[str, Any]],
+    remote_pages: Iterable[list[dict[str, Any]]],
+) -> TableDiff:
+    """Merge-join ``local`` with ``remote_pages`` (ascending ``id``)."""
+    result = TableDiff(table, local=len(local))
+    synced = []
+    for row in local:
+        if row.get("is_synced") is False:
+            result.pending += 1
+        else:
+            synced.append(row)
+    synced.sort(key=lambda row: str(row["id"]))
+    pending_ids = {str(row["id"]) for row in local if row.get("is_synced") is False}
+
+    mine = iter(synced)
+    current = next(mine, None)
+
+    def remote_rows() -> Iterator[dict[str, Any]]:
+        for page in remote_pages:
+            yield from page
+
+    for theirs in remote_rows():
+        key = str(theirs["id"])
+        while current is not None and str(current["id"]) < key:
+            _missing(result, current)
+            current = next(mine, None)
+        if current is None or str(current["id"]) != key:
+            result.remote_only += key not in pending_ids
+            continue
+        columns = sorted(c for c in current if c not in LOCAL_ONLY)
+        if _digest(current, columns) == _digest(theirs, columns):
+            result.matched += 1
+        else:
+            result.changed += 1
+            if len(result.changed_rows) < EXAMPLES:
+                differing = [
+                    c for c in columns if normalise(current.get(c)) != normalise(theirs.get(c))
+                ]
+                result.changed_rows.append((key, differing))
+        current = next(mine, None)
+    while current is not None:
+        _missing(result, current)
+        current = next(mine, None)
+    return result
+
+
+def _missing(result: TableDiff, row: dict[str, Any]) -> None:
+    result.missing_remote += 1
+    if len(result.missing_rows) < EXAMPLES:
+        result.missing_rows.append(str(row["id"]))
+
+
+def _tenants(stores: dict[str, list[dict[str, Any]]]) -> list[str]:
+    found = {
+        str(row["tenant_id"])
+        for name in ("students", "peis")
+        for row in stores.get(name, [])
+        if row.get("tenant_id")
+    }
+    return sorted(found)
+
+
+def _fetch_and_diff(
+    session: dict[str, Any],
+    table: str,
+    local: list[dict[str, Any]],
+    tenants: list[str],
+) -> TableDiff:
+    select, scope = TABLES[table]
+    query = f"select={select}&{scope}={rest.in_list(tenants)}"
+    return diff_table(table, local, rest.pages(session, table, query))
+
+
+async def check(page: async_api.Page) -> Report:
+    """Diff ``page``'s offline cache against the backend, as its signed-in user."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    dump = await page.evaluate(
+        _DUMP,
+        {"database": DATABASE, "stores": list(TABLES), "authKey": config.auth_storage_key()},
+    )
+    session, stores = dump["session"], dump["stores"]
+    if not session or not session.get("access_token"):
+        raise ConsistencyError("The page has no Supabase session to query the backend with")
+    if stores is None:
+        raise ConsistencyError(f"{DATABASE} has not been created on {page.url}")
+    tenants = _tenants(stores)
+    if not tenants:
+        tables = [TableDiff(name, local=len(stores.get(name, []))) for name in TABLES]
+        return Report(tables, loop.time() - started)
+    tables = await asyncio.gather(
+        *(
+            asyncio.to_thread(_fetch_and_diff, session, name, stores.get(name, []), tenants)
+            for name in TABLES
+        )
+    )
+    return Report(list(tables), loop.time() - started)
@@ -0,0 +1,255 @@
+"""Capture the apps' CSV exports and check them against the backend.
+
+:func:`export` opens one of :data:`EXPORTS` on an authenticated page, times
+the download with :func:`harness.downloads.capture` (latency, heap, long
+tasks) and parses the file a row at a time with :mod:`csv`, so memory stays
+flat however large the export.  The rows are compared with the count the
+signed-in user should get, scoped like the app's own query::
+
+    run = await csv_export.export(page, "students")
+    assert run.complete, run.describe()
+
+``python -m harness.csv_export`` runs them as a benchmark; with ``--standin
+--students N`` the seeded network is first grown to N students
+(:mod:`harness.synthetic`).  Results go to ``tmp/csv_export_benchmark.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Mapping
+
+from playwright import async_api
+
+from harness import auth, downloads, network, rest, synthetic
+from harness.launch import DEFAULT_PROFILE, PROFILES
+from harness.pages import AuditLogsPage, PageObject, StudentsPage
+from harness.scenarios import SUITE_DIR
+from harness.session import SharedBrowser
+from harness.standin import StandIn
+from harness.standin.seed import TENANT_NAME, stable_id
+
+OUTPUT_FILE = SUITE_DIR / "tmp" / "csv_export_benchmark.json"
+
+
+@dataclass(frozen=True)
+class Export:
+    page: type[PageObject]
+    table: str
+    # Scoped to the user's school when the profile has one, as the app does.
+    by_school: bool = False
+    # Most rows the app asks for.
+    limit: int | None = None
+
+
+EXPORTS: dict[str, Export] = {
+    "students": Export(StudentsPage, "students", by_school=True),
+    "audit": Export(AuditLogsPage, "audit_events", limit=10_000),
+}
+
+
+@dataclass
+class CsvStats:
+    rows: int = 0
+    columns: int = 0
+    # Rows whose field count differs from the header's.
+    ragged: int = 0
+
+
+@dataclass
+class ExportRun:
+    export: str
+    role: str | None = None
+    expected: int | None = None
+    download: downloads.Download | None = None
+    csv: CsvStats | None = None
+    error: str | None = None
+
+    @property
+    def complete(self) -> bool:
+        return self.csv is not None and self.csv.rows == self.expected and not self.csv.ragged
+
+    def describe(self) -> str:
+        if self.download is None or self.csv is None:
+            return f"{self.export} export failed: {self.error}"
+        d = self.download
+        text = (
+            f"{self.export} export {d.file}: {self.csv.rows} rows of {self.expected} expected, "
+            f"{d.bytes / 1024:.0f} KB in {d.total_s:.2f}s, {d.blocking_ms:.0f}ms blocking"
+        )
+        if self.csv.ragged:
+            text += f", {self.csv.ragged} rows with a wrong field count"
+        return text
+
+
+def scan(path: Path | str) -> CsvStats:
+    """Count the data rows of a CSV file without holding it in memory."""
+    stats = CsvStats()
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return stats
+        stats.columns = len(header)
+        for row in reader:
+            if not row:
+                continue
+            stats.rows += 1
+            stats.ragged += len(row) != stats.columns
+    return stats
+
+
+def expected_rows(session: Mapping[str, Any], export: Export) -> int:
+    """Rows of ``export.table`` the signed-in user's export should contain."""
+    profile = rest.profile(session)
+    if not profile.get("tenant_id"):
+        raise rest.BackendError(f"{session['user'].get('email')} has no tenant")
+    query = f"select=id&tenant_id=eq.{profile['tenant_id']}"
+    if export.by_school and profile.get("school_id"):
+        query += f"&school_id=eq.{profile['school_id']}"
+    total = rest.count(session, export.table, query)
+    return total if export.limit is None else min(total, export.limit)
+
+
+async def export(
+    page: async_api.Page,
+    name: str,
+    timeout: float = downloads.DEFAULT_TIMEOUT,
+) -> ExportRun:
+    """Open ``name``'s screen on ``page``, export it and count what it should hold."""
+    spec = EXPORTS[name]
+    run = ExportRun(name)
+    session = auth.session_of(await page.context.storage_state())
+    if not session:
+        run.error = "The page has no Supabase session"
+        return run
+    try:
+        screen = await spec.page(page).open()
+        run.expected = await asyncio.to_thread(expected_rows, session, spec)
+        run.download, path = await downloads.capture(
+            page, lambda: screen.click(screen.export_csv), timeout
+        )
+        run.csv = await asyncio.to_thread(scan, path)
+    except (async_api.Error, rest.BackendError) as exc:
+        run.error = str(exc).splitlines()[0]
+    return run
+
+
+async def run(
+    names: list[str],
+    role: str,
+    repeat: int,
+    timeout: float,
+    profile: str,
+    headless: bool | None,
+) -> list[ExportRun]:
+    runs = []
+    state = await auth.storage_state(role)
+    async with SharedBrowser(headless=headless, profile=profile) as shared:
+        for _ in range(repeat):
+            for name in names:
+                context = await shared.new_context(network.Policy(), storage_state=state)
+                try:
+                    result = await export(await context.new_page(), name, timeout)
+                finally:
+                    await context.close()
+                result.role = role
+                runs.append(result)
+    return runs
+
+
+def _grow(standin: StandIn, students: int) -> None:
+    """Fill the seeded network with ``students`` synthetic students and their data."""
+    settings = synthetic.config_for(
+        "small",
+        students=students,
+        first_tenant=stable_id("tenant", TENANT_NAME),
+        author=stable_id("user", "superadmin"),
+    )
+    stats = synthetic.Generator(settings).run(synthetic.StoreSink(standin.store))
+    print(f"Loaded {stats.total:,} synthetic rows in {stats.seconds:.1f}s", flush=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.csv_export",
+        description="Export CSVs through the apps, parse them and compare with the backend.",
+    )
+    parser.add_argument("--exports", nargs="+", choices=list(EXPORTS), default=list(EXPORTS))
+    parser.add_argument("--role", default="education_secretary", choices=list(auth.ROLES))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=downloads.DEFAULT_TIMEOUT,
+        help="limit per export, in seconds",
+    )
+    parser.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--standin", action="store_true", help="use the local Supabase stand-in")
+    parser.add_argument(
+        "--students",
+        type=int,
+        help="with --standin, grow the seeded network to this many students first",
+    )
+    args = parser.parse_args(argv)
+    if args.students and not args.standin:
+        parser.error("--students needs --standin")
+
+    standin = StandIn() if args.standin else None
+    if standin is not None:
+        if args.students:
+            _grow(standin, args.students)
+        standin.start()
+        os.environ.update(standin.environ())
+    try:
+        runs = asyncio.run(
+            run(
+                args.exports,
+                args.role,
+                args.repeat,
+                args.timeout,
+                args.profile,
+                False if args.headed else None,
+            )
+        )
+    finally:
+        if standin is not None:
+            standin.stop()
+
+    print(
+        f"{'export':<9} {'rows':>7} {'expected':>8} {'KB':>7} {'ttfb':>7} {'download':>8} "
+        f"{'total':>7} {'heap peak':>9} {'blocking':>8} {'longest':>8}"
+    )
+    for r in runs:
+        d = r.download
+        if d is None or r.csv is None:
+            print(f"{r.export:<9} {r.error}")
+            continue
+        ttfb = "-" if d.ttfb_s is None else f"{d.ttfb_s:.2f}s"
+        heap = "-" if d.heap_peak is None else f"{d.heap_peak / 2**20:.0f} MB"
+        print(
+            f"{r.export:<9} {r.csv.rows:>7} {r.expected:>8} {d.bytes / 1024:>7.0f} {ttfb:>7} "
+            f"{d.download_s:>7.2f}s {d.total_s:>6.2f}s {heap:>9} {d.blocking_ms:>6.0f}ms "
+            f"{d.longest_task_ms:>6.0f}ms"
+        )
+        if not r.complete:
+            print(f"          {r.describe()}")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps({"role": args.role, "runs": [asdict(r) for r in runs]}, indent=2),
+        encoding="utf-8",
+    )
+    return 0 if all(r.complete for r in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
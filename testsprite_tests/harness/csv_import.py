@@ -0,0 +1,364 @@
+"""``python -m harness.csv_import``: throughput of the bulk student CSV upload.
+
+TC010, TC012 and TC018 stop at the dashboard; this drives the importer the
+app actually ships, ``CSVUploadDialog`` on the school director dashboard
+(``src/components/superadmin/CSVUploadDialog.tsx``), with generated files.
+For each size N a CSV in the dialog's template layout (``Nome``, ``Data de
+Nascimento``, ``Nome do Pai``, ``Nome da Mãe``, ``Telefone``, ``Email``) is
+written with three kinds of bad rows:
+
+duplicates (``--duplicates``)
+    exact copies of an earlier valid row;
+missing fields (``--missing``)
+    alternately an empty ``Nome`` and a row whose trailing empty cells were
+    dropped, as spreadsheet exports do;
+invalid values (``--invalid``)
+    a date of birth typed as ``15/05/2010``, which Postgres rejects.
+
+The file is selected with ``set_input_files`` and the dialog's
+"Cadastrar N Alunos" clicked.  Reported per size:
+
+``parse_ms``
+    from the input's ``change`` event to the preview showing the row count
+    (FileReader, the dialog's parser and the render), measured in the page;
+``rows_per_s``
+    students persisted on the backend over the import time; the dialog
+    inserts one row per request and re-renders after each;
+``heap_peak``
+    highest ``performance.memory.usedJSHeapSize`` sampled every 50 ms;
+``error_report_s``
+    from the click to the "Erros encontrados" card, polled every
+    ``_POLL_INTERVAL``; ``None`` when no row was rejected.
+
+The dialog silently drops rows it cannot parse (``skipped``) and does not
+look for duplicates, so ``duplicates_persisted`` is expected to equal the
+duplicates written.  An import that outlives ``--timeout`` is reported with
+the rows persisted so far.  Results go to ``tmp/csv_import_benchmark.json``;
+the files are written to ``tmp/csv_import/`` and deleted after their import.
+
+Imports create real students: run against the stand-in (``--standin``)
+unless the backend may be modified.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from playwright import async_api
+
+from harness import auth, network, rest
+from harness.launch import DEFAULT_PROFILE, PROFILES
+from harness.pages import StudentImportPage
+from harness.scenarios import SUITE_DIR
+from harness.session import SharedBrowser
+from harness.standin import StandIn
+from harness.synthetic import FIRST_NAMES, SURNAMES
+
+OUTPUT_FILE = SUITE_DIR / "tmp" / "csv_import_benchmark.json"
+CSV_DIR = SUITE_DIR / "tmp" / "csv_import"
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 500_000)
+DEFAULT_TIMEOUT = 900.0
+HEADER = ("Nome", "Data de Nascimento", "Nome do Pai", "Nome da Mãe", "Telefone", "Email")
+
+_POLL_INTERVAL = 0.2
+# Valid rows remembered as duplicate sources; bounds memory at 500k rows.
+_RECENT = 1000
+
+_PROBE = """() => {
+  const state = window.__csvImport = {change: null, peak: 0};
+  const sample = () => {
+    if (performance.memory) state.peak = Math.max(state.peak, performance.memory.usedJSHeapSize);
+  };
+  sample();
+  setInterval(sample, 50);
+  document.addEventListener("change", (event) => {
+    if (event.target.type === "file") state.change = performance.now();
+  }, true);
+}"""
+
+_PARSED = """() => {
+  const dialog = document.querySelector('[role="dialog"]');
+  const match = dialog && /\\((\\d+) alunos encontrados\\)/.exec(dialog.innerText);
+  const state = window.__csvImport;
+  if (!match || state.change === null) return null;
+  return {found: Number(match[1]), parse_ms: performance.now() - state.change};
+}"""
+
+_PROGRESS = """() => {
+  const text = (document.querySelector('[role="dialog"]') || document.body).innerText;
+  const saved = /(\\d+) alunos cadastrados/.exec(text);
+  return {
+    busy: text.includes("Processando..."),
+    finished: text.includes("com sucesso!") || text.includes("Erros encontrados"),
+    errors: text.includes("Erros encontrados"),
+    saved: saved ? Number(saved[1]) : 0,
+    heap: window.__csvImport.peak || null,
+  };
+}"""
+
+
+@dataclass
+class Mix:
+    duplicates: float = 0.05
+    missing: float = 0.02
+    invalid: float = 0.01
+
+
+@dataclass
+class CsvFile:
+    path: Path
+    rows: int
+    tag: str
+    duplicates: int = 0
+    missing: int = 0
+    invalid: int = 0
+
+    @property
+    def parseable(self) -> int:
+        return self.rows - self.missing
+
+    @property
+    def unique_valid(self) -> int:
+        return self.rows - self.missing - self.invalid - self.duplicates
+
+
+@dataclass
+class ImportRun:
+    size: int
+    file_mb: float = 0.0
+    duplicates: int = 0
+    missing: int = 0
+    invalid: int = 0
+    found: int | None = None
+    skipped: int | None = None
+    parse_ms: float | None = None
+    import_s: float | None = None
+    finished: bool = False
+    persisted: int | None = None
+    rows_per_s: float | None = None
+    rejected: int | None = None
+    duplicates_persisted: int | None = None
+    heap_peak: int | None = None
+    error_report_s: float | None = None
+    error: str | None = None
+
+
+def generate(rows: int, mix: Mix, seed: int = 1, directory: Path = CSV_DIR) -> CsvFile:
+    """Write a ``rows``-line student CSV; names start with a per-file tag."""
+    rng = random.Random(seed)
+    tag = f"csv{uuid.uuid4().hex[:8]}"
+    directory.mkdir(parents=True, exist_ok=True)
+    result = CsvFile(directory / f"students_{rows}_{tag}.csv", rows, tag)
+    recent: list[str] = []
+    first_birthday = date(2008, 1, 1)
+    with result.path.open("w", encoding="utf-8", newline="") as handle:
+        handle.write(",".join(HEADER) + "\n")
+        for i in range(rows):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(SURNAMES)
+            born = first_birthday + timedelta(days=rng.randrange(365 * 10))
+            fields = [
+                f"{tag} {first} {last}",
+                born.isoformat(),
+                f"{rng.choice(FIRST_NAMES)} {last}",
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}",
+                f"(11) 9{rng.randrange(10**8):08d}",
+                f"aluno{i}@example.com",
+            ]
+            roll = rng.random()
+            if roll < mix.missing:
+                result.missing += 1
+                if i % 2:
+                    fields[0] = ""
+                else:
+                    fields[4:] = []
+            elif roll < mix.missing + mix.duplicates and recent:
+                result.duplicates += 1
+                handle.write(rng.choice(recent))
+                continue
+            elif mix.missing + mix.duplicates <= roll < mix.missing + mix.duplicates + mix.invalid:
+                result.invalid += 1
+                fields[1] = born.strftime("%d/%m/%Y")
+            line = ",".join(fields) + "\n"
+            if fields[0] and len(fields) == len(HEADER) and "/" not in fields[1]:
+                if len(recent) < _RECENT:
+                    recent.append(line)
+                else:
+                    recent[rng.randrange(_RECENT)] = line
+            handle.write(line)
+    return result
+
+
+async def run_size(
+    shared: SharedBrowser,
+    role: str,
+    size: int,
+    mix: Mix,
+    seed: int = 1,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> ImportRun:
+    result = ImportRun(size)
+    csv = await asyncio.to_thread(generate, size, mix, seed)
+    result.file_mb = csv.path.stat().st_size / 2**20
+    result.duplicates, result.missing, result.invalid = csv.duplicates, csv.missing, csv.invalid
+    state = await auth.storage_state(role)
+    session = auth.session_of(json.loads(Path(state).read_text(encoding="utf-8")))
+
+    context = await shared.new_context(network.Policy(), storage_state=state)
+    try:
+        page = await context.new_page()
+        dialog = await StudentImportPage(page).open()
+        await page.evaluate(_PROBE)
+
+        await dialog.choose(csv.path)
+        parsed = await page.wait_for_function(_PARSED, polling="raf", timeout=timeout * 1000)
+        parsed = await parsed.json_value()
+        result.found, result.parse_ms = parsed["found"], parsed["parse_ms"]
+        result.skipped = csv.rows - result.found
+
+        await dialog.click(dialog.confirm)
+        start = time.perf_counter()
+        deadline = start + timeout
+        progress = await page.evaluate(_PROGRESS)
+        while time.perf_counter() < deadline:
+            if progress["errors"] and result.error_report_s is None:
+                result.error_report_s = time.perf_counter() - start
+            if progress["finished"] and not progress["busy"]:
+                result.finished = True
+                break
+            await asyncio.sleep(_POLL_INTERVAL)
+            progress = await page.evaluate(_PROGRESS)
+        result.import_s = time.perf_counter() - start
+        result.heap_peak = progress["heap"]
+        if not result.finished:
+            result.error = f"{progress['saved']} of {result.found} rows saved after {timeout:.0f}s"
+
+        query = f"select=id&name=like.{csv.tag}*"
+        result.persisted = await asyncio.to_thread(rest.count, session, "students", query)
+        result.rows_per_s = result.persisted / result.import_s if result.import_s else None
+        if result.finished:
+            result.rejected = result.found - result.persisted
+            result.duplicates_persisted = max(0, result.persisted - csv.unique_valid)
+    except (async_api.Error, rest.BackendError) as exc:
+        result.error = str(exc).splitlines()[0]
+    finally:
+        await context.close()
+        csv.path.unlink(missing_ok=True)
+    return result
+
+
+async def run(
+    sizes: list[int],
+    role: str,
+    mix: Mix,
+    seed: int,
+    repeat: int,
+    timeout: float,
+    profile: str,
+    headless: bool | None,
+) -> list[ImportRun]:
+    async with SharedBrowser(headless=headless, profile=profile) as shared:
+        return [
+            await run_size(shared, role, size, mix, seed + n, timeout)
+            for n in range(repeat)
+            for size in sizes
+        ]
+
+
+def _value(value: float | None, spec: str, unit: str = "") -> str:
+    return "-" if value is None else f"{value:{spec}}{unit}"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.csv_import",
+        description="Upload generated student CSVs through the bulk importer and time it.",
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--role", default="school_director", choices=list(auth.ROLES))
+    parser.add_argument(
+        "--duplicates", type=float, default=Mix.duplicates, help="share of duplicate rows (0-1)"
+    )
+    parser.add_argument(
+        "--missing",
+        type=float,
+        default=Mix.missing,
+        help="share of rows with a missing field (0-1)",
+    )
+    parser.add_argument(
+        "--invalid",
+        type=float,
+        default=Mix.invalid,
+        help="share of rows with an invalid date of birth (0-1)",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT, help="import limit per size, in seconds"
+    )
+    parser.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--standin", action="store_true", help="use the local Supabase stand-in")
+    args = parser.parse_args(argv)
+    mix = Mix(args.duplicates, args.missing, args.invalid)
+
+    standin = StandIn().start() if args.standin else None
+    if standin is not None:
+        os.environ.update(standin.environ())
+    try:
+        runs = asyncio.run(
+            run(
+                args.sizes,
+                args.role,
+                mix,
+                args.seed,
+                args.repeat,
+                args.timeout,
+                args.profile,
+                False if args.headed else None,
+            )
+        )
+    finally:
+        if standin is not None:
+            standin.stop()
+
+    print(
+        f"{'size':>7} {'MB':>6} {'found':>7} {'parse':>9} {'import':>8} {'saved':>7} "
+        f"{'rows/s':>7} {'dup kept':>8} {'heap':>8} {'1st error':>9}"
+    )
+    for r in runs:
+        heap = None if r.heap_peak is None else r.heap_peak / 2**20
+        print(
+            f"{r.size:>7} {r.file_mb:>6.1f} {_value(r.found, 'd'):>7} "
+            f"{_value(r.parse_ms, '.0f', 'ms'):>9} {_value(r.import_s, '.1f', 's'):>8} "
+            f"{_value(r.persisted, 'd'):>7} {_value(r.rows_per_s, '.0f'):>7} "
+            f"{_value(r.duplicates_persisted, 'd'):>8} {_value(heap, '.0f', 'MB'):>8} "
+            f"{_value(r.error_report_s, '.1f', 's'):>9}"
+        )
+        if r.skipped:
+            print(f"        {r.skipped} rows dropped by the parser without a report")
+        if r.error:
+            print(f"        {r.error}")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(
+            {"role": args.role, "mix": asdict(mix), "runs": [asdict(r) for r in runs]}, indent=2
+        ),
+        encoding="utf-8",
+    )
+    return 0 if all(r.finished for r in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
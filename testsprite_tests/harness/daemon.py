@@ -0,0 +1,445 @@
+"""A long-lived Chromium that runs and scenario files attach to.
+
+Every ``python -m harness TC014`` or ``python TC014_....py`` pays for a
+Chromium launch before its first page.  ``python -m harness.daemon start``
+keeps one running between invocations: a supervisor process runs
+Playwright's browser server (the driver's ``launch-server``, which is what
+``BrowserType.launchServer`` does in Node; the Python API has no
+``launch_server``) with a :mod:`harness.launch` profile and records its
+WebSocket endpoint in ``tmp/browser/daemon.json``.
+
+:class:`harness.session.SharedBrowser` and :func:`harness.launch.browser`
+(used by the scenario files) then ``connect`` to it instead of launching, as
+long as it runs with the same profile and headless setting;
+``TESTSPRITE_DAEMON=off`` turns attaching off.  Each attached process
+leaves a lease in ``tmp/browser/clients/`` while it lives.
+
+Every :data:`CHECK_INTERVAL` seconds the supervisor connects to the server
+and sums the proportional set size of the server and its Chromium
+processes.  It restarts the server when a check fails, and recycles it when
+the memory passes ``--max-memory`` (``TESTSPRITE_DAEMON_MAX_MB``): new
+clients launch their own browser meanwhile ("draining"), and the restart
+waits for the attached ones to leave.  With no client for ``--idle``
+seconds the daemon exits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from playwright import async_api
+from playwright._impl._driver import compute_driver_executable
+
+from harness import launch
+from harness.scenarios import SUITE_DIR
+
+DAEMON_DIR = SUITE_DIR / "tmp" / "browser"
+STATE_FILE = DAEMON_DIR / "daemon.json"
+CLIENTS_DIR = DAEMON_DIR / "clients"
+LOG_FILE = DAEMON_DIR / "daemon.log"
+
+CHECK_INTERVAL = 15.0
+CONNECT_TIMEOUT = 5.0
+START_TIMEOUT = 30.0
+DEFAULT_MAX_MEMORY_MB = int(os.environ.get("TESTSPRITE_DAEMON_MAX_MB", 1536))
+DEFAULT_IDLE = 1800.0
+
+
+class DaemonError(RuntimeError):
+    pass
+
+
+@dataclass
+class DaemonState:
+    supervisor: int
+    server: int
+    endpoint: str
+    profile: str
+    headless: bool
+    started: float
+    recycled: int = 0
+    draining: bool = False
+    memory_mb: float | None = None
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_state(path: Path = STATE_FILE) -> DaemonState | None:
+    """The running daemon's state; ``None`` when there is none."""
+    try:
+        state = DaemonState(**json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+    return state if _alive(state.supervisor) else None
+
+
+def _write_state(state: DaemonState) -> None:
+    DAEMON_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=DAEMON_DIR, prefix=".daemon.", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        json.dump(asdict(state), handle)
+    os.replace(tmp, STATE_FILE)
+
+
+def _release(lease: Path) -> None:
+    lease.unlink(missing_ok=True)
+
+
+def endpoint(profile: str | None = None, headless: bool | None = None) -> str | None:
+    """WebSocket endpoint to attach to, or ``None`` to launch a browser instead.
+
+    Takes a lease for this process, dropped when it exits.
+    """
+    if os.environ.get("TESTSPRITE_DAEMON", "").lower() in ("0", "off", "false"):
+        return None
+    state = read_state()
+    if state is None or state.draining:
+        return None
+    wanted = launch.profile(profile)
+    if state.profile != wanted.name or state.headless != wanted.options(headless)["headless"]:
+        return None
+    lease = CLIENTS_DIR / str(os.getpid())
+    if not lease.exists():
+        CLIENTS_DIR.mkdir(parents=True, exist_ok=True)
+        lease.touch()
+        atexit.register(_release, lease)
+    return state.endpoint
+
+
+def clients() -> list[int]:
+    """Pids of the live processes attached to the daemon; stale leases are dropped."""
+    live = []
+    for lease in CLIENTS_DIR.glob("*"):
+        if lease.name.isdigit() and _alive(int(lease.name)):
+            live.append(int(lease.name))
+        else:
+            lease.unlink(missing_ok=True)
+    return live
+
+
+def _process_tree(root: int) -> list[int]:
+    children: dict[int, list[int]] = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+    tree, pending = [], [root]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def _pss_kb(pid: int) -> int:
+    for name, key in (("smaps_rollup", "Pss:"), ("status", "VmRSS:")):
+        try:
+            for line in Path(f"/proc/{pid}/{name}").read_text().splitlines():
+                if line.startswith(key):
+                    return int(line.split()[1])
+        except (OSError, ValueError):
+            continue
+    return 0
+
+
+def memory_mb(pid: int) -> float | None:
+    """Proportional set size of ``pid`` and its descendants; ``None`` without ``/proc``."""
+    if not Path("/proc/self/stat").exists():
+        return None
+    return sum(_pss_kb(p) for p in _process_tree(pid)) / 1024
+
+
+class _Server:
+    """One ``launch-server`` process of the Playwright driver."""
+
+    def __init__(self, profile: launch.LaunchProfile, headless: bool | None) -> None:
+        self.profile = profile
+        self.headless = headless
+        self.process: subprocess.Popen | None = None
+        self.endpoint = ""
+
+    def _config(self) -> dict[str, Any]:
+        options = self.profile.options(self.headless)
+        config: dict[str, Any] = {
+            "headless": options["headless"],
+            "args": options["args"],
+            "host": "127.0.0.1",
+            "port": 0,
+            "wsPath": f"/testsprite-{os.urandom(8).hex()}",
+        }
+        if "slow_mo" in options:
+            config["slowMo"] = options["slow_mo"]
+        if "env" in options:
+            config["env"] = options["env"]
+        return config
+
+    def start(self) -> "_Server":
+        node, cli = compute_driver_executable()
+        DAEMON_DIR.mkdir(parents=True, exist_ok=True)
+        config = DAEMON_DIR / "server.json"
+        config.write_text(json.dumps(self._config()), encoding="utf-8")
+        output = DAEMON_DIR / "server.out"
+        with output.open("w", encoding="utf-8") as stdout:
+            self.process = subprocess.Popen(
+                [node, cli, "launch-server", "--browser", "chromium", "--config", str(config)],
+                stdin=subprocess.DEVNULL,
+                stdout=stdout,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            lines = output.read_text(encoding="utf-8", errors="replace").splitlines()
+            found = next((line for line in lines if line.startswith("ws://")), None)
+            if found:
+                self.endpoint = found.strip()
+                return self
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.1)
+        self.stop()
+        lines = output.read_text(encoding="utf-8", errors="replace").splitlines()
+        error = next((line for line in lines if line.startswith("Error")), "\n".join(lines[-5:]))
+        raise DaemonError(f"browser server did not start: {error}")
+
+    def stop(self) -> None:
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            os.killpg(self.process.pid, signal.SIGTERM)
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                self.process.wait()
+        self.process = None
+
+
+async def _healthy(playwright: Any, endpoint: str) -> str | None:
+    """``None`` when a client can connect and read the version, else why not."""
+    try:
+        browser = await playwright.chromium.connect(endpoint, timeout=CONNECT_TIMEOUT * 1000)
+    except async_api.Error as exc:
+        return str(exc).splitlines()[0]
+    try:
+        return None if browser.version else "no browser version"
+    finally:
+        await browser.close()
+
+
+def _log(message: str) -> None:
+    print(f"{time.strftime('%H:%M:%S')} {message}", flush=True)
+
+
+async def serve(
+    profile: str | None = None,
+    headless: bool | None = None,
+    max_memory: float = DEFAULT_MAX_MEMORY_MB,
+    idle: float = DEFAULT_IDLE,
+    interval: float = CHECK_INTERVAL,
+) -> None:
+    """Supervisor loop: keep one healthy browser server, recycled by memory."""
+    chosen = launch.profile(profile)
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+
+    server: _Server | None = None
+    state: DaemonState | None = None
+    recycled = 0
+    last_client = time.monotonic()
+    async with async_api.async_playwright() as playwright:
+        try:
+            while not stopping.is_set():
+                if server is None:
+                    server = await asyncio.to_thread(_Server(chosen, headless).start)
+                    state = DaemonState(
+                        supervisor=os.getpid(),
+                        server=server.process.pid,
+                        endpoint=server.endpoint,
+                        profile=chosen.name,
+                        headless=chosen.options(headless)["headless"],
+                        started=time.time(),
+                        recycled=recycled,
+                    )
+                    _write_state(state)
+                    _log(f"browser server {state.endpoint} (pid {state.server})")
+                try:
+                    await asyncio.wait_for(stopping.wait(), interval)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+                attached = clients()
+                if attached:
+                    last_client = time.monotonic()
+                elif time.monotonic() - last_client > idle:
+                    _log(f"no client for {idle:.0f}s; exiting")
+                    break
+                problem = await _healthy(playwright, state.endpoint)
+                state.memory_mb = memory_mb(state.server)
+                if problem is None and state.memory_mb and state.memory_mb > max_memory:
+                    state.draining = True
+                _write_state(state)
+                if problem is not None:
+                    _log(f"health check failed ({problem}); restarting")
+                elif state.draining and not attached:
+                    _log(f"recycling at {state.memory_mb:.0f} MB (limit {max_memory:.0f} MB)")
+                    recycled += 1
+                else:
+                    continue
+                await asyncio.to_thread(server.stop)
+                server = None
+        finally:
+            if server is not None:
+                await asyncio.to_thread(server.stop)
+            current = read_state()
+            if current is not None and current.supervisor == os.getpid():
+                STATE_FILE.unlink(missing_ok=True)
+
+
+def start(
+    profile: str | None = None,
+    headless: bool | None = None,
+    max_memory: float = DEFAULT_MAX_MEMORY_MB,
+    idle: float = DEFAULT_IDLE,
+) -> DaemonState:
+    """Start the supervisor in the background and wait for its first server."""
+    running = read_state()
+    if running is not None:
+        return running
+    DAEMON_DIR.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, "-m", "harness.daemon", "serve"]
+    command += ["--profile", launch.profile(profile).name]
+    command += ["--max-memory", str(max_memory), "--idle", str(idle)]
+    if headless is False:
+        command.append("--headed")
+    with LOG_FILE.open("a", encoding="utf-8") as log:
+        supervisor = subprocess.Popen(
+            command,
+            cwd=SUITE_DIR,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + START_TIMEOUT + 5
+    while time.monotonic() < deadline:
+        state = read_state()
+        if state is not None and state.supervisor == supervisor.pid:
+            return state
+        if supervisor.poll() is not None:
+            break
+        time.sleep(0.1)
+    if supervisor.poll() is None:
+        supervisor.terminate()
+    tail = LOG_FILE.read_text(encoding="utf-8", errors="replace").splitlines()[-1:]
+    raise DaemonError(f"daemon did not start (log: {LOG_FILE}): {''.join(tail)}")
+
+
+def stop(timeout: float = 15.0) -> bool:
+    """Stop the running daemon; ``False`` when there was none."""
+    state = read_state()
+    if state is None:
+        return False
+    os.kill(state.supervisor, signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while _alive(state.supervisor) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    return True
+
+
+async def _attach_time(state: DaemonState) -> float:
+    async with async_api.async_playwright() as playwright:
+        began = time.perf_counter()
+        browser = await playwright.chromium.connect(state.endpoint)
+        elapsed = time.perf_counter() - began
+        await browser.close()
+    return elapsed
+
+
+def describe(state: DaemonState) -> str:
+    memory = "-" if state.memory_mb is None else f"{state.memory_mb:.0f} MB"
+    return (
+        f"browser daemon pid {state.supervisor}: {state.profile}"
+        f"{'' if state.headless else ', headed'}, server pid {state.server}, "
+        f"up {time.time() - state.started:.0f}s, {memory}, recycled {state.recycled}x, "
+        f"{len(clients())} client(s){', draining' if state.draining else ''}\n"
+        f"  {state.endpoint}"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.daemon",
+        description="Keep a Chromium running between harness and scenario runs.",
+    )
+    parser.add_argument("command", choices=("start", "stop", "restart", "status", "serve"))
+    parser.add_argument("--profile", choices=list(launch.PROFILES), default=None)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument(
+        "--max-memory",
+        type=float,
+        default=DEFAULT_MAX_MEMORY_MB,
+        metavar="MB",
+        help="recycle the browser past this many MB (env: TESTSPRITE_DAEMON_MAX_MB)",
+    )
+    parser.add_argument(
+        "--idle", type=float, default=DEFAULT_IDLE, help="exit after this many seconds unused"
+    )
+    args = parser.parse_args(argv)
+    headless = False if args.headed else None
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.profile, headless, args.max_memory, args.idle))
+        except DaemonError as exc:
+            _log(str(exc))
+            return 1
+        return 0
+    if args.command in ("stop", "restart"):
+        print("stopped" if stop() else "not running")
+        if args.command == "stop":
+            return 0
+    if args.command == "status":
+        state = read_state()
+        if state is None:
+            print("not running")
+            return 1
+        print(describe(state))
+        print(f"  attach in {asyncio.run(_attach_time(state)) * 1000:.0f} ms")
+        return 0
+    try:
+        state = start(args.profile, headless, args.max_memory, args.idle)
+    except DaemonError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(describe(state))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Timing and main-thread cost of files the apps build in the page.
+
+The apps' exports (CSV lists, jsPDF reports) fetch from Supabase, build the
+file on the main thread and hand it to the browser as a download.
+:func:`capture` runs the click that starts one inside
+``page.expect_download()`` and reports:
+
+``ttfb_s``
+    click to the first Supabase response (status and headers received);
+``download_s``
+    click to the browser starting the download, i.e. fetching plus building
+    the file;
+``total_s``
+    click to the file being complete on disk.
+
+Meanwhile the page samples ``performance.memory.usedJSHeapSize`` every 50 ms
+and records long tasks, so a tab frozen by a large export shows up as
+``blocking_ms`` (time beyond 50 ms per task, as in TBT) and
+``longest_task_ms``.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from playwright import async_api
+
+from harness import config
+
+DEFAULT_TIMEOUT = 300.0
+
+_PROBE = """() => {
+  const state = window.__download = {before: null, peak: 0, blocking: 0, longest: 0};
+  const heap = () => performance.memory ? performance.memory.usedJSHeapSize : null;
+  const sample = () => {
+    const used = heap();
+    if (used !== null) state.peak = Math.max(state.peak, used);
+  };
+  state.account = (entries) => {
+    for (const entry of entries) {
+      state.blocking += Math.max(0, entry.duration - 50);
+      state.longest = Math.max(state.longest, entry.duration);
+    }
+  };
+  state.before = heap();
+  sample();
+  state.timer = setInterval(sample, 50);
+  state.observer = new PerformanceObserver((list) => state.account(list.getEntries()));
+  state.observer.observe({type: "longtask"});
+}"""
+
+_READ = """() => {
+  const state = window.__download;
+  clearInterval(state.timer);
+  state.account(state.observer.takeRecords());
+  state.observer.disconnect();
+  return {
+    heap_before: state.before,
+    heap_peak: state.peak || null,
+    blocking_ms: state.blocking,
+    longest_task_ms: state.longest,
+  };
+}"""
+
+
+@dataclass
+class Download:
+    file: str
+    bytes: int
+    ttfb_s: float | None
+    download_s: float
+    total_s: float
+    heap_before: int | None = None
+    heap_peak: int | None = None
+    blocking_ms: float = 0.0
+    longest_task_ms: float = 0.0
+
+
+async def capture(
+    page: async_api.Page,
+    trigger: Callable[[], Awaitable[None]],
+    timeout: float = DEFAULT_TIMEOUT,
+) -> tuple[Download, Path]:
+    """Run ``trigger`` (a click starting a download) and time the download.
+
+    Returns the measurements and the downloaded file, which Playwright
+    deletes when the page's context closes.
+    """
+    await page.evaluate(_PROBE)
+    supabase = config.supabase_url()
+    first_response: list[float] = []
+
+    def seen(response: async_api.Response) -> None:
+        if not first_response and response.url.startswith(supabase):
+            first_response.append(time.perf_counter())
+
+    page.on("response", seen)
+    start = time.perf_counter()
+    try:
+        async with page.expect_download(timeout=timeout * 1000) as info:
+            await trigger()
+        download = await info.value
+        started = time.perf_counter()
+        path = await download.path()
+        finished = time.perf_counter()
+    finally:
+        page.remove_listener("response", seen)
+    probe = await page.evaluate(_READ)
+    measured = Download(
+        file=download.suggested_filename,
+        bytes=os.path.getsize(path),
+        ttfb_s=first_response[0] - start if first_response else None,
+        download_s=started - start,
+        total_s=finished - start,
+        **probe,
+    )
+    return measured, Path(path)
@@ -0,0 +1,167 @@
+"""Flakiness scores from the result history, retries and the quarantine lane.
+
+Many failures are environmental (the Supabase 400 on ``/auth/v1/token``, the
+empty login page of TESTSPRITE-REPORT.md) and go away on the next run.
+:func:`assess` scores each scenario over its last :data:`WINDOW` executions
+in the result store (:mod:`harness.results`):
+
+``flips``
+    Status changes between consecutive runs (first attempts only).
+``recovered``
+    Runs in which the scenario failed and then passed on a retry.
+
+``score = min(1, flips / (runs - 1) + recovered / runs)``.  A scenario that
+always fails scores 0: it is broken, not flaky, and retrying it only wastes
+time; so does a single flip, which is more likely a regression or a fix.
+With at least :data:`MIN_RUNS` runs, and two flips or a recovery:
+
+* ``score >= QUARANTINE_SCORE``: **quarantined**.  It runs in its own lane,
+  one at a time, beside the main run, and its result never fails the gate.
+* ``score >= FLAKY_SCORE``: **flaky**.  When it fails, :class:`RetryBudget`
+  runs it again right away, up to :data:`MAX_RETRIES` times, as long as the
+  run's retry budget (in seconds, charged with each failed attempt's
+  duration) lasts.
+* otherwise **stable**: a failure is final.
+
+``python -m harness.flaky`` prints the scores.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from harness.results import ResultStore, results_file
+from harness.runner import PASSED, ScenarioResult
+
+WINDOW = 30
+MIN_RUNS = 5
+FLAKY_SCORE = 0.1
+QUARANTINE_SCORE = 0.5
+
+# Seconds of reruns per run, and attempts per scenario after the first.
+DEFAULT_RETRY_BUDGET = 300.0
+MAX_RETRIES = 2
+
+STABLE = "stable"
+FLAKY = "flaky"
+QUARANTINED = "quarantined"
+BROKEN = "broken"
+NEW = "new"
+
+
+@dataclass(frozen=True)
+class Flakiness:
+    scenario: str
+    runs: int
+    failures: int
+    flips: int
+    recovered: int
+
+    @property
+    def score(self) -> float:
+        if self.runs < 2:
+            return 0.0
+        return min(1.0, self.flips / (self.runs - 1) + self.recovered / self.runs)
+
+    @property
+    def verdict(self) -> str:
+        if self.runs < MIN_RUNS:
+            return NEW
+        if self.flips < 2 and not self.recovered:
+            return BROKEN if self.failures == self.runs else STABLE
+        if self.score >= QUARANTINE_SCORE:
+            return QUARANTINED
+        if self.score >= FLAKY_SCORE:
+            return FLAKY
+        return BROKEN if self.failures == self.runs else STABLE
+
+
+def assess(store: ResultStore, window: int = WINDOW) -> dict[str, Flakiness]:
+    """Score every scenario in ``store`` over its last ``window`` executions."""
+    scores = {}
+    for scenario, outcomes in store.outcomes(window).items():
+        firsts = [o["status"] == PASSED for o in outcomes if o["attempt"] == 0]
+        retried_runs = {o["run_id"] for o in outcomes if o["attempt"] > 0 and o["status"] == PASSED}
+        scores[scenario] = Flakiness(
+            scenario=scenario,
+            runs=len(firsts),
+            failures=firsts.count(False),
+            flips=sum(a != b for a, b in zip(firsts, firsts[1:])),
+            recovered=len(retried_runs),
+        )
+    return scores
+
+
+def load(window: int = WINDOW) -> dict[str, Flakiness]:
+    """:func:`assess` over the configured store; empty when there is none."""
+    path = results_file()
+    if path is None or not path.exists():
+        return {}
+    with ResultStore(path) as store:
+        return assess(store, window)
+
+
+@dataclass
+class RetryBudget:
+    """Lets flaky scenarios run again while the run's time budget lasts.
+
+    ``scores`` maps scenario names to their :class:`Flakiness`; only flaky
+    (or quarantined) ones are retried.  Each retry reserves the failed
+    attempt's duration, so the budget bounds the extra scenario time the
+    retries add; concurrent scenarios compete for what is left.
+    """
+
+    seconds: float
+    scores: dict[str, Flakiness] = field(default_factory=dict)
+    max_retries: int = MAX_RETRIES
+    used: float = 0.0
+    retries: int = 0
+
+    def share(self, parts: int) -> "RetryBudget":
+        """An equal slice of the budget, for one of ``parts`` worker processes."""
+        return RetryBudget(self.seconds / max(1, parts), self.scores, self.max_retries)
+
+    def allow(self, result: ScenarioResult) -> bool:
+        flakiness = self.scores.get(result.scenario.name)
+        if flakiness is None or flakiness.verdict not in (FLAKY, QUARANTINED):
+            return False
+        if result.attempt >= self.max_retries:
+            return False
+        if self.used + result.duration > self.seconds:
+            return False
+        self.used += result.duration
+        self.retries += 1
+        return True
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.flaky",
+        description="Score scenarios by flakiness over the result store.",
+    )
+    parser.add_argument("--db", type=Path, help="result store (default: TESTSPRITE_RESULTS)")
+    parser.add_argument("--window", type=int, default=WINDOW, help="executions per scenario")
+    parser.add_argument("--all", action="store_true", help="include stable scenarios")
+    args = parser.parse_args(argv)
+
+    path = args.db or results_file()
+    if path is None or not path.exists():
+        parser.error("no result store (see harness.results)")
+    with ResultStore(path) as store:
+        scores = assess(store, args.window)
+    print(f"{'scenario':<60} {'runs':>4} {'fail':>4} {'flips':>5} {'rec':>3} {'score':>5}  verdict")
+    for f in sorted(scores.values(), key=lambda f: (-f.score, f.scenario)):
+        if f.verdict in (STABLE, NEW) and not args.all:
+            continue
+        print(
+            f"{f.scenario[:60]:<60} {f.runs:>4} {f.failures:>4} {f.flips:>5} {f.recovered:>3} "
+            f"{f.score:>5.2f}  {f.verdict}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""A private copy of the seeded stand-in data for every scenario.
+
+With ``TESTSPRITE_ISOLATE=1`` (set by ``python -m harness --standin``) the
+runner asks the stand-in for a clone of its baseline before each scenario
+(:func:`acquire`) and drops it afterwards (:func:`release`).  Every context
+the scenario opens tags its Supabase requests with the clone's name
+(:func:`install`), and :mod:`harness.rest` does the same for requests the
+harness makes on the scenario's behalf, so mutating scenarios (PEI edits,
+versioning, audit logs) can run side by side without seeing each other's
+writes and without a restore step.
+
+Realtime subscriptions still observe the shared store.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from contextvars import ContextVar
+
+from playwright import async_api
+
+from harness import config
+
+HEADER = "x-testsprite-clone"
+
+_current: ContextVar[str | None] = ContextVar("clone", default=None)
+
+
+class IsolationError(RuntimeError):
+    pass
+
+
+def enabled() -> bool:
+    return os.environ.get("TESTSPRITE_ISOLATE", "") not in ("", "0")
+
+
+def current() -> str | None:
+    """Clone of the running scenario, if any."""
+    return _current.get()
+
+
+def _control(method: str, path: str) -> None:
+    request = urllib.request.Request(
+        f"{config.supabase_url()}/_testsprite/{path}", data=b"", method=method
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as exc:
+        detail = exc.read().decode(errors="replace")
+        raise IsolationError(f"{method} {path} failed with {exc.code}: {detail}") from None
+    except urllib.error.URLError as exc:
+        raise IsolationError(f"{method} {path} failed: {exc.reason}") from None
+
+
+async def acquire(label: str, source: str | None = None) -> str | None:
+    """Create a clone for the current task; ``None`` when isolation is off.
+
+    The clone copies the baseline, or clone ``source`` as it is now.
+    """
+    if not enabled():
+        return None
+    name = f"{label}-{uuid.uuid4().hex[:8]}"
+    query = f"?from={urllib.parse.quote(source)}" if source else ""
+    await asyncio.to_thread(_control, "PUT", f"clones/{name}{query}")
+    _current.set(name)
+    return name
+
+
+async def release(name: str | None) -> None:
+    if name is None:
+        return
+    _current.set(None)
+    try:
+        await asyncio.to_thread(_control, "DELETE", f"clones/{name}")
+    except IsolationError:
+        pass
+
+
+async def snapshot() -> None:
+    """Make the stand-in's current data the baseline new clones start from."""
+    await asyncio.to_thread(_control, "PUT", "baseline")
+
+
+async def install(context: async_api.BrowserContext, name: str) -> None:
+    """Send ``context``'s Supabase requests to clone ``name``.
+
+    Registered after :func:`harness.network.install`, so it runs first and
+    falls back to the interception handler with the header added.
+    """
+
+    async def tag(route: async_api.Route) -> None:
+        await route.fallback(headers={**route.request.headers, HEADER: name})
+
+    await context.route(f"{config.supabase_url()}/**", tag)
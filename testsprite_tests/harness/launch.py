@@ -0,0 +1,135 @@
+"""Chromium launch profiles shared by the runner and the scenario files.
+
+The generated scenarios used to launch with ``--single-process`` and
+``--ipc=host``, which puts every renderer in the browser process: pages of
+concurrent contexts serialise on one main thread and a crash in one takes the
+whole browser down.  Profiles keep Chromium's multi-process model and differ
+in how they trade memory for throughput:
+
+``throughput`` (default)
+    One renderer per site, no background throttling of the contexts that are
+    not in front, so concurrent scenarios progress at full speed.
+``low-memory``
+    Caps the renderer process count, drops site isolation and limits the V8
+    heap, for small CI boxes; pair with a low ``-j``.
+``debug``
+    Headed, slowed down and with DevTools open on every tab.
+
+Select one with ``--profile`` or ``TESTSPRITE_LAUNCH_PROFILE``.  Scenario
+files get their browser from :func:`browser` so they use the same profile
+when run on their own, attached to the :mod:`harness.daemon` browser when
+one is running.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+from playwright import async_api
+
+DEFAULT_PROFILE = "throughput"
+
+_COMMON_ARGS = (
+    "--window-size=1280,720",
+    "--disable-dev-shm-usage",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-extensions",
+    "--mute-audio",
+)
+
+
+@dataclass(frozen=True)
+class LaunchProfile:
+    name: str
+    args: tuple[str, ...]
+    headless: bool = True
+    slow_mo: float = 0.0
+    # Suggested scenarios in flight per browser for this profile.
+    concurrency: int = 4
+    env: dict[str, str] = field(default_factory=dict)
+
+    def options(self, headless: bool | None = None) -> dict[str, Any]:
+        """Keyword arguments for ``BrowserType.launch``."""
+        options: dict[str, Any] = {
+            "headless": self.headless if headless is None else headless,
+            "args": list(self.args),
+        }
+        if self.slow_mo:
+            options["slow_mo"] = self.slow_mo
+        if self.env:
+            options["env"] = {**os.environ, **self.env}
+        return options
+
+
+PROFILES: dict[str, LaunchProfile] = {
+    "throughput": LaunchProfile(
+        "throughput",
+        _COMMON_ARGS
+        + (
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding",
+            "--disable-features=Translate,MediaRouter,OptimizationHints",
+        ),
+        concurrency=4,
+    ),
+    "low-memory": LaunchProfile(
+        "low-memory",
+        _COMMON_ARGS
+        + (
+            "--renderer-process-limit=2",
+            "--disable-site-isolation-trials",
+            "--disable-features=site-per-process,IsolateOrigins,Translate,MediaRouter",
+            "--js-flags=--max-old-space-size=256",
+            "--disable-gpu",
+            "--aggressive-cache-discard",
+            "--disk-cache-size=33554432",
+        ),
+        concurrency=2,
+    ),
+    "debug": LaunchProfile(
+        "debug",
+        _COMMON_ARGS + ("--auto-open-devtools-for-tabs",),
+        headless=False,
+        slow_mo=250.0,
+        concurrency=1,
+    ),
+}
+
+
+def profile(name: str | None = None) -> LaunchProfile:
+    """The named profile, else ``TESTSPRITE_LAUNCH_PROFILE``, else the default."""
+    name = name or os.environ.get("TESTSPRITE_LAUNCH_PROFILE") or DEFAULT_PROFILE
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown launch profile {name!r}; expected one of {', '.join(PROFILES)}"
+        ) from None
+
+
+def options(name: str | None = None, headless: bool | None = None) -> dict[str, Any]:
+    """``BrowserType.launch`` keyword arguments for a profile."""
+    return profile(name).options(headless)
+
+
+async def browser(
+    playwright: Any, name: str | None = None, headless: bool | None = None
+) -> async_api.Browser:
+    """Attach to the browser daemon if it runs this profile, else launch Chromium."""
+    # Imported here: ``python -m harness.daemon`` would otherwise find the
+    # module already loaded through ``harness/__init__``.
+    from harness import daemon
+
+    endpoint = daemon.endpoint(name, headless)
+    if endpoint is not None:
+        try:
+            return await playwright.chromium.connect(
+                endpoint, timeout=daemon.CONNECT_TIMEOUT * 1000
+            )
+        except async_api.Error:
+            pass
+    return await playwright.chromium.launch(**options(name, headless))
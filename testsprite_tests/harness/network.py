@@ -0,0 +1,338 @@
+"""Request interception for functional runs.
+
+Every context the runner opens is routed through :func:`install`, which
+
+* aborts requests in the blocked categories — ``analytics`` beacons,
+  web ``fonts``, ``avatars`` (profile pictures, stock photos, Supabase
+  storage avatars) and ``cdn`` (any third-party host);
+* serves static assets of the apps (scripts, stylesheets, images, the
+  manifest) from an :class:`AssetCache` shared by all contexts of the
+  browser, so the Vite dev bundle is transferred once per run instead of once
+  per navigation;
+* lets everything else through, in particular Supabase traffic.
+
+A scenario can adjust this with a module-level ``NETWORK`` policy::
+
+    NETWORK = {"allow": ["avatars", "*vlibras.gov.br*"], "deny": ["*/rest/v1/notifications*"],
+               "cache": False}
+
+``allow`` and ``deny`` take category names or ``fnmatch`` URL globs; deny
+wins.  ``cache: False`` bypasses the asset cache (PWA and offline scenarios,
+whose service worker must see the real responses).  Set
+``TESTSPRITE_FULL_NETWORK=1`` (``--full-network``) to disable interception.
+
+What was saved is kept per scenario in a :class:`NetworkLedger`.  Byte counts
+of blocked requests are estimates from the sizes recorded in
+``tmp/network_sizes.json`` whenever the same URL was loaded for real.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+from harness import config
+from harness.scenarios import SUITE_DIR
+
+SIZES_FILE = SUITE_DIR / "tmp" / "network_sizes.json"
+
+CATEGORIES = ("analytics", "fonts", "avatars", "cdn")
+
+ANALYTICS_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "analytics.google.com",
+    "doubleclick.net",
+    "plausible.io",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "clarity.ms",
+    "sentry.io",
+    "posthog.com",
+)
+ANALYTICS_PATHS = ("/_vercel/insights/", "/_vercel/speed-insights/")
+FONT_HOSTS = ("fonts.googleapis.com", "fonts.gstatic.com", "use.typekit.net")
+AVATAR_HOSTS = (
+    "images.unsplash.com",
+    "gravatar.com",
+    "ui-avatars.com",
+    "api.dicebear.com",
+    "googleusercontent.com",
+)
+AVATAR_PATHS = ("/storage/v1/object/public/avatars/", "/storage/v1/render/image/")
+
+CACHED_TYPES = frozenset({"script", "stylesheet", "image", "manifest"})
+
+# Response headers that describe the transfer rather than the body.
+_HOP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+DEFAULT_CACHE_BYTES = 256 * 2**20
+
+
+def _host_matches(host: str, suffixes: tuple[str, ...]) -> bool:
+    return any(host == s or host.endswith("." + s) for s in suffixes)
+
+
+def _local_hosts() -> frozenset[str]:
+    origins = (*config.app_origins(), config.supabase_url())
+    return frozenset(urlsplit(origin).netloc for origin in origins)
+
+
+def category(request: async_api.Request) -> str | None:
+    """The blockable category of ``request``, or ``None`` if it is essential."""
+    parts = urlsplit(request.url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    host = parts.hostname or ""
+    if _host_matches(host, ANALYTICS_HOSTS) or parts.path.startswith(ANALYTICS_PATHS):
+        return "analytics"
+    if request.resource_type == "font" or _host_matches(host, FONT_HOSTS):
+        return "fonts"
+    if _host_matches(host, AVATAR_HOSTS) or any(p in parts.path for p in AVATAR_PATHS):
+        return "avatars"
+    if parts.netloc not in _local_hosts() and host not in ("localhost", "127.0.0.1"):
+        return "cdn"
+    return None
+
+
+@dataclass(frozen=True)
+class Policy:
+    allow: tuple[str, ...] = ()
+    deny: tuple[str, ...] = ()
+    cache: bool = True
+
+    @classmethod
+    def from_spec(cls, spec: Mapping[str, Any] | None) -> "Policy":
+        """Build a policy from a scenario's ``NETWORK`` dictionary."""
+        if not spec:
+            return cls()
+        unknown = set(spec) - {"allow", "deny", "cache"}
+        if unknown:
+            raise ValueError(f"Unknown NETWORK keys: {', '.join(sorted(unknown))}")
+        return cls(
+            allow=tuple(spec.get("allow", ())),
+            deny=tuple(spec.get("deny", ())),
+            cache=bool(spec.get("cache", True)),
+        )
+
+    @staticmethod
+    def _listed(entries: tuple[str, ...], url: str, kind: str | None) -> bool:
+        return any(
+            entry == kind or (entry not in CATEGORIES and fnmatch.fnmatchcase(url, entry))
+            for entry in entries
+        )
+
+    def blocks(self, url: str, kind: str | None) -> bool:
+        if self._listed(self.deny, url, kind):
+            return True
+        if kind is None or self._listed(self.allow, url, kind):
+            return False
+        return True
+
+
+@dataclass
+class NetworkLedger:
+    """Requests seen by one scenario and what interception saved."""
+
+    requests: int = 0
+    blocked: dict[str, int] = field(default_factory=dict)
+    blocked_bytes: int = 0
+    unsized: int = 0
+    cache_hits: int = 0
+    cached_bytes: int = 0
+
+    def block(self, kind: str, size: int | None) -> None:
+        self.blocked[kind] = self.blocked.get(kind, 0) + 1
+        if size is None:
+            self.unsized += 1
+        else:
+            self.blocked_bytes += size
+
+    def hit(self, size: int) -> None:
+        self.cache_hits += 1
+        self.cached_bytes += size
+
+    def merge(self, other: "NetworkLedger") -> None:
+        """Add ``other``'s counts to this ledger's."""
+        self.requests += other.requests
+        for kind, count in other.blocked.items():
+            self.blocked[kind] = self.blocked.get(kind, 0) + count
+        self.blocked_bytes += other.blocked_bytes
+        self.unsized += other.unsized
+        self.cache_hits += other.cache_hits
+        self.cached_bytes += other.cached_bytes
+
+    @property
+    def saved_requests(self) -> int:
+        return sum(self.blocked.values()) + self.cache_hits
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.blocked_bytes + self.cached_bytes
+
+
+@dataclass(frozen=True)
+class _Asset:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+
+class AssetCache:
+    """In-memory LRU of static asset responses, shared across contexts.
+
+    Concurrent misses for the same URL are fetched once.  Also remembers the
+    size of blockable responses seen, for estimating what blocking them saves.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._assets: OrderedDict[str, _Asset] = OrderedDict()
+        self._pending: dict[str, asyncio.Future[_Asset | None]] = {}
+        self.sizes: dict[str, int] = {}
+        self._new_sizes = False
+
+    def load_sizes(self, path: Path = SIZES_FILE) -> None:
+        try:
+            self.sizes.update(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            pass
+
+    def save_sizes(self, path: Path = SIZES_FILE) -> None:
+        if not self._new_sizes:
+            return
+        merged: dict[str, int] = {}
+        try:
+            merged.update(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            pass
+        merged.update(self.sizes)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(merged, handle, sort_keys=True)
+        os.replace(tmp, path)
+        self._new_sizes = False
+
+    def record_size(self, response: async_api.Response) -> None:
+        """Remember the size of a blockable response loaded for real."""
+        if category(response.request) is None:
+            return
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and self.sizes.get(response.url) != int(length):
+            self.sizes[response.url] = int(length)
+            self._new_sizes = True
+
+    def _store(self, url: str, asset: _Asset) -> None:
+        if len(asset.body) > self.max_bytes:
+            return
+        self._assets[url] = asset
+        self.bytes += len(asset.body)
+        while self.bytes > self.max_bytes:
+            _, evicted = self._assets.popitem(last=False)
+            self.bytes -= len(evicted.body)
+
+    async def serve(self, route: async_api.Route, ledger: NetworkLedger) -> None:
+        url = route.request.url
+        asset = self._assets.get(url)
+        if asset is None and url in self._pending:
+            asset = await asyncio.shield(self._pending[url])
+        if asset is not None:
+            self._assets.move_to_end(url)
+            ledger.hit(len(asset.body))
+            await route.fulfill(status=asset.status, headers=asset.headers, body=asset.body)
+            return
+
+        future: asyncio.Future[_Asset | None] = asyncio.get_running_loop().create_future()
+        self._pending[url] = future
+        try:
+            response = await route.fetch()
+            body = await response.body()
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in _HOP_HEADERS}
+            asset = _Asset(response.status, headers, body)
+            if response.status == 200:
+                self._store(url, asset)
+                future.set_result(asset)
+        except async_api.Error:
+            future.set_result(None)
+            await route.continue_()
+            return
+        finally:
+            self._pending.pop(url, None)
+            # Cancelled or timed out: let concurrent waiters fetch for themselves.
+            if not future.done():
+                future.set_result(None)
+        await route.fulfill(status=asset.status, headers=headers, body=body)
+
+
+def enabled() -> bool:
+    return os.environ.get("TESTSPRITE_FULL_NETWORK", "") in ("", "0")
+
+
+async def install(
+    context: async_api.BrowserContext,
+    policy: Policy,
+    cache: AssetCache,
+    ledger: NetworkLedger,
+) -> None:
+    """Route every request of ``context`` through ``policy`` and ``cache``."""
+    if not enabled():
+        return
+    context.on("response", cache.record_size)
+    await _route(context, policy, cache, ledger)
+
+
+async def reroute(
+    context: async_api.BrowserContext,
+    policy: Policy,
+    cache: AssetCache,
+    ledger: NetworkLedger,
+) -> None:
+    """Drop every route of a context set up by :func:`install` and route it anew.
+
+    Used by :mod:`harness.pool` to hand a context over to another ledger.
+    """
+    await context.unroute_all(behavior="wait")
+    if enabled():
+        await _route(context, policy, cache, ledger)
+
+
+async def _route(
+    context: async_api.BrowserContext,
+    policy: Policy,
+    cache: AssetCache,
+    ledger: NetworkLedger,
+) -> None:
+    local = {urlsplit(origin).netloc for origin in config.app_origins()}
+
+    async def handle(route: async_api.Route) -> None:
+        request = route.request
+        ledger.requests += 1
+        kind = category(request)
+        if policy.blocks(request.url, kind):
+            ledger.block(kind or "denied", cache.sizes.get(request.url))
+            await route.abort("blockedbyclient")
+        elif (
+            policy.cache
+            and request.method == "GET"
+            and request.resource_type in CACHED_TYPES
+            and urlsplit(request.url).netloc in local
+        ):
+            await cache.serve(route, ledger)
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
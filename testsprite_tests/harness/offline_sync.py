@@ -0,0 +1,378 @@
+"""``python -m harness.offline_sync``: benchmark the offline queue and its drain.
+
+For each size N a fresh context signs in as ``--role``, opens the dashboard
+(which creates the ``PEICollabOffline`` Dexie database) and goes offline with
+``context.set_offline(True)``.  N edits to the role's PEIs are then written
+the way the app's Dexie layer stores them (``src/lib/offlineDatabase.ts``):
+the edited row in ``peis`` with ``is_synced: false`` and one ``UPDATE`` entry
+per edit in ``sync_queue``.  With ``--conflicts`` a share of the edited PEIs
+is also changed on the backend meanwhile.
+
+The context then reconnects.  Conflicting rows (remote ``updated_at`` moved
+since the edit started) are passed to ``SyncService.resolveConflict``
+(``src/services/SyncService.ts``, loaded through the Vite dev server) and the
+strategies it picks are counted.  Finally the page is reloaded and the
+benchmark waits for ``useOfflineSync`` to upload every unsynced row.  Its
+pending count is only read on mount, hence the reload, and it starts
+syncing 2 s after that, which is part of the drain time.
+
+Reported per size: time to enqueue, drain time, Supabase requests during the
+drain (PEI upserts and all ``/rest/v1`` calls), conflicts and strategies,
+IndexedDB usage before and after the drain, ``sync_queue`` entries left and
+the rows :func:`harness.consistency.check` finds differing afterwards.
+Nothing in the app consumes ``sync_queue`` today, so the latter equals N.
+Results are written to ``tmp/offline_sync_benchmark.json``.
+
+Edits upsert real PEI rows: run against the stand-in (``--standin``) unless
+the backend may be modified.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from playwright import async_api
+
+from harness import auth, consistency, network, rest
+from harness.launch import DEFAULT_PROFILE, PROFILES
+from harness.pages import DashboardPage
+from harness.scenarios import SUITE_DIR
+from harness.session import SharedBrowser
+from harness.standin import StandIn
+
+OUTPUT_FILE = SUITE_DIR / "tmp" / "offline_sync_benchmark.json"
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000)
+DEFAULT_TIMEOUT = 600.0
+
+DATABASE = "PEICollabOffline"
+SYNC_SERVICE_MODULE = "/src/services/SyncService.ts"
+
+_POLL_INTERVAL = 0.5
+
+# Shared by the scripts below: opens the app's database once Dexie created it.
+_OPEN_DB = """
+  const openDb = async () => {
+    for (let i = 0; i < 100; i++) {
+      const names = (await indexedDB.databases()).map((d) => d.name);
+      if (names.includes(%(name)r)) break;
+      await new Promise((r) => setTimeout(r, 100));
+    }
+    const db = await new Promise((resolve, reject) => {
+      const request = indexedDB.open(%(name)r);
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+    if (!db.objectStoreNames.contains("sync_queue")) {
+      db.close();
+      throw new Error(%(name)r + " has no sync_queue store; did the app open it?");
+    }
+    return db;
+  };
+  const done = (tx) => new Promise((resolve, reject) => {
+    tx.oncomplete = resolve;
+    tx.onerror = tx.onabort = () => reject(tx.error);
+  });
+  const all = (store) => new Promise((resolve, reject) => {
+    const request = store.getAll();
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+""" % {"name": DATABASE}
+
+# Writes ``count`` edits over ``rows`` in a single transaction.
+_ENQUEUE = (
+    "async ({rows, count}) => {"
+    + _OPEN_DB
+    + """
+  const db = await openDb();
+  const tx = db.transaction(["peis", "sync_queue"], "readwrite");
+  const peis = tx.objectStore("peis");
+  const queue = tx.objectStore("sync_queue");
+  const latest = new Map();
+  for (let i = 0; i < count; i++) {
+    const base = rows[i % rows.length];
+    const now = Date.now();
+    const edited = {
+      ...(latest.get(base.id) || base),
+      planning_data: {...(base.planning_data || {}), offline_edit: i},
+      updated_at: new Date(now).toISOString(),
+      is_synced: false,
+      last_modified: now,
+    };
+    latest.set(base.id, edited);
+    queue.put({
+      id: crypto.randomUUID(),
+      table_name: "peis",
+      record_id: base.id,
+      action: "UPDATE",
+      data: edited,
+      created_at: now,
+      retry_count: 0,
+    });
+  }
+  latest.forEach((row) => peis.put(row));
+  await done(tx);
+  db.close();
+  return latest.size;
+}"""
+)
+
+_STATE = (
+    "async () => {"
+    + _OPEN_DB
+    + """
+  const db = await openDb();
+  const tx = db.transaction(["peis", "sync_queue"], "readonly");
+  const [peis, queued] = await Promise.all([
+    all(tx.objectStore("peis")),
+    new Promise((resolve) => {
+      const request = tx.objectStore("sync_queue").count();
+      request.onsuccess = () => resolve(request.result);
+    }),
+  ]);
+  db.close();
+  const estimate = await navigator.storage.estimate();
+  return {
+    unsynced: peis.filter((p) => p.is_synced === false).length,
+    queued,
+    bytes: (estimate.usageDetails && estimate.usageDetails.indexedDB) || estimate.usage,
+  };
+}"""
+)
+
+# Runs SyncService.resolveConflict on each local/remote pair; ``null`` when
+# the module cannot be loaded (e.g. against a production build).
+_RESOLVE = (
+    "async (remote) => {"
+    + _OPEN_DB
+    + """
+  let service;
+  try {
+    const module = await import(%r);
+    service = new module.default();
+  } catch (error) {
+    return null;
+  }
+  const db = await openDb();
+  const local = await all(db.transaction("peis", "readonly").objectStore("peis"));
+  db.close();
+  const byId = new Map(local.map((row) => [row.id, row]));
+  const strategies = {};
+  for (const row of remote) {
+    if (!byId.has(row.id)) continue;
+    const result = await service.resolveConflict("peis", byId.get(row.id), row);
+    strategies[result.strategy] = (strategies[result.strategy] || 0) + 1;
+  }
+  return strategies;
+}"""
+    % SYNC_SERVICE_MODULE
+)
+
+
+@dataclass
+class SyncRun:
+    size: int
+    records: int = 0
+    enqueue_s: float = 0.0
+    drain_s: float | None = None
+    drained: bool = False
+    upserts: int = 0
+    rest_requests: int = 0
+    conflicts: int = 0
+    strategies: dict[str, int] | None = None
+    idb_bytes_queued: int | None = None
+    idb_bytes_drained: int | None = None
+    queue_left: int | None = None
+    inconsistent: int | None = None
+    check_s: float | None = None
+    error: str | None = None
+
+
+@dataclass
+class _Requests:
+    counting: bool = False
+    upserts: int = 0
+    rest: int = 0
+
+    def seen(self, request: async_api.Request) -> None:
+        if not self.counting or "/rest/v1/" not in request.url:
+            return
+        self.rest += 1
+        if request.method == "POST" and "/rest/v1/peis" in request.url:
+            self.upserts += 1
+
+
+def _by_ids(ids: list[str]) -> str:
+    return f"peis?select=*&id={rest.in_list(ids)}"
+
+
+async def run_size(
+    shared: SharedBrowser,
+    role: str,
+    size: int,
+    conflicts: float = 0.0,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> SyncRun:
+    result = SyncRun(size)
+    state = await auth.storage_state(role)
+    session = auth.session_of(json.loads(Path(state).read_text(encoding="utf-8")))
+    rows = await asyncio.to_thread(rest.request, session, "GET", "peis?select=*&limit=1000")
+    if not rows:
+        result.error = f"No PEIs visible to {role}"
+        return result
+
+    requests = _Requests()
+    context = await shared.new_context(network.Policy(cache=False), storage_state=state)
+    context.on("request", requests.seen)
+    try:
+        page = await context.new_page()
+        await DashboardPage(page).open()
+        await context.set_offline(True)
+
+        start = time.perf_counter()
+        result.records = await page.evaluate(_ENQUEUE, {"rows": rows, "count": size})
+        result.enqueue_s = time.perf_counter() - start
+        result.idb_bytes_queued = (await page.evaluate(_STATE))["bytes"]
+
+        edited = [row["id"] for row in rows[: result.records]]
+        changed = edited[: round(len(edited) * conflicts)]
+        if changed:
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(time.time() + 60))
+            path = f"peis?id={rest.in_list(changed)}"
+            await asyncio.to_thread(rest.request, session, "PATCH", path, {"updated_at": stamp})
+
+        await context.set_offline(False)
+        base = {row["id"]: row.get("updated_at") for row in rows}
+        remote = await asyncio.to_thread(rest.request, session, "GET", _by_ids(edited))
+        moved = [row for row in remote if row.get("updated_at") != base.get(row["id"])]
+        result.conflicts = len(moved)
+        if moved:
+            result.strategies = await page.evaluate(_RESOLVE, moved)
+
+        requests.counting = True
+        start = time.perf_counter()
+        await page.reload(wait_until="domcontentloaded")
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            current = await page.evaluate(_STATE)
+            if current["unsynced"] == 0:
+                result.drained = True
+                result.drain_s = time.perf_counter() - start
+                break
+            await asyncio.sleep(_POLL_INTERVAL)
+        requests.counting = False
+        current = await page.evaluate(_STATE)
+        result.idb_bytes_drained = current["bytes"]
+        result.queue_left = current["queued"]
+        if not result.drained:
+            result.error = f"{current['unsynced']} rows still unsynced after {timeout:.0f}s"
+        else:
+            report = await consistency.check(page)
+            result.check_s = report.seconds
+            result.inconsistent = sum(t.changed + t.missing_remote for t in report.tables)
+    except (async_api.Error, rest.BackendError, consistency.ConsistencyError) as exc:
+        result.error = str(exc).splitlines()[0]
+    finally:
+        await context.close()
+    result.upserts, result.rest_requests = requests.upserts, requests.rest
+    return result
+
+
+async def run(
+    sizes: list[int],
+    role: str,
+    conflicts: float,
+    repeat: int,
+    timeout: float,
+    profile: str,
+    headless: bool | None,
+) -> list[SyncRun]:
+    async with SharedBrowser(headless=headless, profile=profile) as shared:
+        return [
+            await run_size(shared, role, size, conflicts, timeout)
+            for _ in range(repeat)
+            for size in sizes
+        ]
+
+
+def _mb(value: int | None) -> str:
+    return "-" if value is None else f"{value / 2**20:.1f} MB"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.offline_sync",
+        description="Queue PEI edits offline, reconnect and measure the sync drain.",
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--role", default="teacher", choices=list(auth.ROLES))
+    parser.add_argument(
+        "--conflicts",
+        type=float,
+        default=0.0,
+        help="share of the edited PEIs also changed on the backend while offline (0-1)",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT, help="drain limit per size, in seconds"
+    )
+    parser.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--standin", action="store_true", help="use the local Supabase stand-in")
+    args = parser.parse_args(argv)
+
+    standin = StandIn().start() if args.standin else None
+    if standin is not None:
+        os.environ.update(standin.environ())
+    try:
+        runs = asyncio.run(
+            run(
+                args.sizes,
+                args.role,
+                args.conflicts,
+                args.repeat,
+                args.timeout,
+                args.profile,
+                False if args.headed else None,
+            )
+        )
+    finally:
+        if standin is not None:
+            standin.stop()
+
+    print(
+        f"{'size':>6} {'rows':>5} {'enqueue':>8} {'drain':>8} {'upserts':>7} {'rest':>6} "
+        f"{'confl':>5} {'idb queued':>11} {'idb after':>10} {'queue':>6}"
+    )
+    for r in runs:
+        drain = "-" if r.drain_s is None else f"{r.drain_s:.1f}s"
+        print(
+            f"{r.size:>6} {r.records:>5} {r.enqueue_s:>7.2f}s {drain:>8} {r.upserts:>7} "
+            f"{r.rest_requests:>6} {r.conflicts:>5} {_mb(r.idb_bytes_queued):>11} "
+            f"{_mb(r.idb_bytes_drained):>10} {r.queue_left if r.queue_left is not None else '-':>6}"
+        )
+        if r.inconsistent:
+            print(f"       {r.inconsistent} rows differ from the backend after the drain")
+        if r.strategies:
+            print(f"       resolveConflict: {r.strategies}")
+        if r.error:
+            print(f"       {r.error}")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps({"role": args.role, "runs": [asdict(r) for r in runs]}, indent=2),
+        encoding="utf-8",
+    )
+    return 0 if all(r.drained for r in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Page objects for the screens the scenarios drive.
+
+Elements are located by ARIA role and accessible name or by form label,
+never by document position, so a wrapper ``div`` added around a form does not
+break them (the apps carry no ``data-testid`` attributes yet; prefer
+``page.get_by_test_id`` once they do).  Each locator is built once per page
+object::
+
+    auth = await AuthPage(page).open()
+    await auth.login(email, password)
+
+    dashboard = await DashboardPage(page, app=GESTAO_ESCOLAR).open()
+    await dashboard.select_tab("Tokens")
+
+``app`` picks the origin from :func:`harness.config.app_origins`.
+"""
+
+from harness.pages.audit_logs import AuditLogsPage
+from harness.pages.auth import AuthPage
+from harness.pages.base import GESTAO_ESCOLAR, PEI_COLLAB, PageObject
+from harness.pages.dashboard import DashboardPage
+from harness.pages.family_tokens import FamilyTokensPage
+from harness.pages.landing import LandingPage
+from harness.pages.pei_editor import PEIEditorPage
+from harness.pages.reports import ReportsPage
+from harness.pages.student_import import StudentImportPage
+from harness.pages.students import StudentsPage
+
+__all__ = [
+    "GESTAO_ESCOLAR",
+    "PEI_COLLAB",
+    "AuditLogsPage",
+    "AuthPage",
+    "DashboardPage",
+    "FamilyTokensPage",
+    "LandingPage",
+    "PEIEditorPage",
+    "PageObject",
+    "ReportsPage",
+    "StudentImportPage",
+    "StudentsPage",
+]
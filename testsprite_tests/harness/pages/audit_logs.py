@@ -0,0 +1,34 @@
+"""Audit trail (gestao-escolar ``AuditReports`` at ``/audit``)."""
+
+from __future__ import annotations
+
+from functools import cached_property
+
+from playwright import async_api
+
+from harness.pages.base import GESTAO_ESCOLAR, PageObject
+
+
+class AuditLogsPage(PageObject):
+    path = "/audit"
+    app = GESTAO_ESCOLAR
+
+    @cached_property
+    def title(self) -> async_api.Locator:
+        return self.heading("Relatórios de Auditoria")
+
+    @cached_property
+    def export_csv(self) -> async_api.Locator:
+        return self.button("Exportar CSV")
+
+    @cached_property
+    def data_audit(self) -> async_api.Locator:
+        return self.tab("Auditoria de Dados")
+
+    @cached_property
+    def access_logs(self) -> async_api.Locator:
+        return self.tab("Logs de Acesso")
+
+    @cached_property
+    def rows(self) -> async_api.Locator:
+        return self.page.get_by_role("row")
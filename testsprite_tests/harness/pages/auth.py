@@ -0,0 +1,40 @@
+"""Sign-in screen (``Auth`` in pei-collab, the shared ``LoginForm`` in gestao-escolar)."""
+
+from __future__ import annotations
+
+from functools import cached_property
+
+from playwright import async_api
+
+from harness.pages.base import GESTAO_ESCOLAR, PageObject, exact
+
+
+class AuthPage(PageObject):
+    @property
+    def path(self) -> str:
+        return "/login" if self.app == GESTAO_ESCOLAR else "/auth"
+
+    @cached_property
+    def email(self) -> async_api.Locator:
+        return self.page.get_by_label(exact("E-mail", "Email")).first
+
+    @cached_property
+    def password(self) -> async_api.Locator:
+        return self.page.get_by_label(exact("Senha", "Password")).first
+
+    @cached_property
+    def submit(self) -> async_api.Locator:
+        return self.page.locator("form").get_by_role("button", name=exact("Entrar")).first
+
+    @cached_property
+    def forgot_password(self) -> async_api.Locator:
+        return self.button("Esqueceu sua senha?", "Esqueci minha senha")
+
+    @cached_property
+    def back_home(self) -> async_api.Locator:
+        return self.button("Voltar para o início")
+
+    async def login(self, email: str, password: str) -> None:
+        await self.fill(self.email, email)
+        await self.fill(self.password, password)
+        await self.click(self.submit)
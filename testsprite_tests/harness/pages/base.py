@@ -0,0 +1,132 @@
+"""Common behaviour of the page objects."""
+
+from __future__ import annotations
+
+import re
+import time
+from functools import cached_property
+from typing import TypeVar
+
+from playwright import async_api
+
+from harness import config, pool, vitals, waits
+
+# Index of each app in ``config.app_origins()``.
+PEI_COLLAB = 0
+GESTAO_ESCOLAR = 1
+
+NAVIGATION_TIMEOUT = 10_000
+ACTION_TIMEOUT = 5_000
+
+_P = TypeVar("_P", bound="PageObject")
+
+
+def exact(*names: str) -> re.Pattern[str]:
+    """Case-insensitive pattern matching any of ``names`` as the whole text."""
+    return re.compile(r"^\s*(?:%s)\s*$" % "|".join(map(re.escape, names)), re.I)
+
+
+class PageObject:
+    """One screen of an app, bound to a Playwright page.
+
+    Subclasses declare their elements as ``cached_property`` locators built
+    from roles, labels and visible names, so each is created once per page
+    object and keeps matching when the surrounding markup is rearranged.
+    Actions go through :func:`harness.waits.actionable` and fail after
+    ``ACTION_TIMEOUT`` with Playwright's own error.  Every navigation and
+    click is recorded as a step by :func:`harness.vitals.capture`.
+    """
+
+    path = "/"
+    app = PEI_COLLAB
+
+    def __init__(self, page: async_api.Page, app: int | None = None) -> None:
+        self.page = page
+        if app is not None:
+            self.app = app
+
+    @property
+    def origin(self) -> str:
+        origins = config.app_origins()
+        return origins[min(self.app, len(origins) - 1)]
+
+    def url(self, path: str | None = None) -> str:
+        return self.origin + (self.path if path is None else path)
+
+    async def open(
+        self: _P,
+        path: str | None = None,
+        replaced: float = waits.REPLACED_WAIT,
+    ) -> _P:
+        """Navigate to the page (or ``path`` on the same app) and let it settle.
+
+        ``replaced`` is the fixed sleep this navigation stands in for, as
+        recorded by :func:`harness.waits.settle`.
+        """
+        started = time.perf_counter()
+        # A pooled page may already show it (see harness.pool); the step then
+        # counts the pool's load of it instead of a navigation.
+        warm = pool.claim(self.page, self.url(path))
+        if warm is None:
+            await self.page.goto(self.url(path), wait_until="commit", timeout=NAVIGATION_TIMEOUT)
+        await waits.settle(self.page, replaced=replaced)
+        target = self.path if path is None else path
+        await vitals.capture(self.page, "navigate", target, started, warm)
+        return self
+
+    async def click(self, locator: async_api.Locator) -> None:
+        await waits.actionable(self.page, locator)
+        started = time.perf_counter()
+        await locator.click(timeout=ACTION_TIMEOUT)
+        await vitals.capture(self.page, "click", self._name(locator), started)
+
+    async def fill(self, locator: async_api.Locator, value: str) -> None:
+        await waits.actionable(self.page, locator)
+        await locator.fill(value, timeout=ACTION_TIMEOUT)
+
+    def _name(self, locator: async_api.Locator) -> str:
+        """Attribute name of a cached locator, for labelling steps."""
+        for name, value in vars(self).items():
+            if value is locator:
+                return f"{type(self).__name__}.{name}"
+        return type(self).__name__
+
+    def button(self, *names: str) -> async_api.Locator:
+        return self.page.get_by_role("button", name=exact(*names)).first
+
+    def link(self, *names: str) -> async_api.Locator:
+        return self.page.get_by_role("link", name=exact(*names)).first
+
+    def action(self, *names: str) -> async_api.Locator:
+        """A button or a link, whichever the app renders for ``names``."""
+        pattern = exact(*names)
+        return (
+            self.page.get_by_role("button", name=pattern)
+            .or_(self.page.get_by_role("link", name=pattern))
+            .first
+        )
+
+    def tab(self, *names: str) -> async_api.Locator:
+        return self.page.get_by_role("tab", name=exact(*names)).first
+
+    def heading(self, *names: str) -> async_api.Locator:
+        return self.page.get_by_role("heading", name=exact(*names)).first
+
+    def text(self, text: str) -> async_api.Locator:
+        return self.page.get_by_text(text).first
+
+    # PWA prompts (PWAUpdatePrompt), which can show up over any screen.
+
+    @cached_property
+    def update_prompt(self) -> async_api.Locator:
+        """'Atualizar' button of the "Nova versão disponível!" alert."""
+        return (
+            self.page.get_by_role("alert")
+            .filter(has_text=re.compile(r"nova vers[aã]o", re.I))
+            .get_by_role("button", name=exact("Atualizar"))
+            .first
+        )
+
+    @cached_property
+    def install_prompt(self) -> async_api.Locator:
+        return self.button("Instalar")
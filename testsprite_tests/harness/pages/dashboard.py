@@ -0,0 +1,30 @@
+"""Role dashboard at ``/dashboard`` (``/home`` is an alias in pei-collab)."""
+
+from __future__ import annotations
+
+from functools import cached_property
+
+from playwright import async_api
+
+from harness.pages.base import PageObject
+
+
+class DashboardPage(PageObject):
+    path = "/dashboard"
+
+    @cached_property
+    def contact(self) -> async_api.Locator:
+        """'Entrar em Contato' on the screen shown to users without a role."""
+        return self.button("Entrar em Contato")
+
+    @cached_property
+    def logout(self) -> async_api.Locator:
+        return self.button("Sair")
+
+    @cached_property
+    def report(self) -> async_api.Locator:
+        """Coordinator's 'Relatório': a jsPDF report listing every active PEI in scope."""
+        return self.button("Relatório")
+
+    async def select_tab(self, name: str) -> None:
+        await self.click(self.tab(name))
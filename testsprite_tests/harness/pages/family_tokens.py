@@ -0,0 +1,61 @@
+"""Family access tokens (``FamilyTokenManager``), the coordinator dashboard's Tokens tab."""
+
+from __future__ import annotations
+
+from functools import cached_property
+
+from playwright import async_api
+
+from harness import waits
+from harness.pages.base import PageObject, exact
+
+
+class FamilyTokensPage(PageObject):
+    path = "/dashboard"
+
+    async def open(
+        self,
+        path: str | None = None,
+        replaced: float = waits.REPLACED_WAIT,
+    ) -> "FamilyTokensPage":
+        await super().open(path, replaced)
+        await self.click(self.tokens_tab)
+        return self
+
+    @cached_property
+    def tokens_tab(self) -> async_api.Locator:
+        return self.tab("Tokens")
+
+    @cached_property
+    def search(self) -> async_api.Locator:
+        return self.page.get_by_label(exact("Buscar")).first
+
+    @cached_property
+    def status_filter(self) -> async_api.Locator:
+        return self.page.get_by_label(exact("Status")).first
+
+    @cached_property
+    def generate(self) -> async_api.Locator:
+        """Opens the 'Gerar Token de Acesso Familiar' dialog."""
+        return self.button("Gerar Token Familiar")
+
+    @cached_property
+    def dialog(self) -> async_api.Locator:
+        return self.page.get_by_role("dialog").first
+
+    @cached_property
+    def expires_in(self) -> async_api.Locator:
+        return self.dialog.get_by_label(exact("Expira em")).first
+
+    @cached_property
+    def max_uses(self) -> async_api.Locator:
+        return self.dialog.get_by_label(exact("Máximo de usos")).first
+
+    @cached_property
+    def confirm(self) -> async_api.Locator:
+        return self.dialog.get_by_role("button", name=exact("Gerar Token")).first
+
+    async def filter_status(self, status: str) -> None:
+        """``status`` is one of ``all``, ``active``, ``expired`` or ``used``."""
+        await waits.actionable(self.page, self.status_filter)
+        await self.status_filter.select_option(status)
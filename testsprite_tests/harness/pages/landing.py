@@ -0,0 +1,39 @@
+"""Public landing pages (pei-collab ``Splash``, gestao-escolar ``landing``)."""
+
+from __future__ import annotations
+
+from functools import cached_property
+
+from playwright import async_api
+
+from harness.pages.base import PageObject, exact
+
+
+class LandingPage(PageObject):
+    @cached_property
+    def login(self) -> async_api.Locator:
+        return self.action("Fazer Login", "Acesso ao PEI Collab")
+
+    @cached_property
+    def about(self) -> async_api.Locator:
+        return self.action("Sobre o Projeto")
+
+    @cached_property
+    def access_system(self) -> async_api.Locator:
+        return self.action("Acessar Sistema")
+
+    @cached_property
+    def explore(self) -> async_api.Locator:
+        return self.action("Explorar Plataforma")
+
+    @cached_property
+    def back(self) -> async_api.Locator:
+        return self.action("Voltar")
+
+    @cached_property
+    def footer_access_system(self) -> async_api.Locator:
+        return (
+            self.page.get_by_role("contentinfo")
+            .get_by_role("link", name=exact("Acessar Sistema"))
+            .first
+        )
@@ -0,0 +1,37 @@
+"""PEI creation and editing wizard (``CreatePEI``)."""
+
+from __future__ import annotations
+
+from functools import cached_property
+
+from playwright import async_api
+
+from harness.pages.base import PageObject
+
+
+class PEIEditorPage(PageObject):
+    path = "/pei/new"
+
+    async def edit(self, pei_id: str) -> "PEIEditorPage":
+        """Open an existing PEI in the editor."""
+        return await self.open(f"/pei/edit?pei={pei_id}")
+
+    @cached_property
+    def title(self) -> async_api.Locator:
+        return self.heading("Criar novo PEI", "Editar PEI")
+
+    @cached_property
+    def back(self) -> async_api.Locator:
+        return self.button("Voltar para o dashboard")
+
+    @cached_property
+    def save(self) -> async_api.Locator:
+        return self.button("Salvar rascunho", "Salvar")
+
+    @cached_property
+    def next_step(self) -> async_api.Locator:
+        return self.button("Continuar")
+
+    @cached_property
+    def submit(self) -> async_api.Locator:
+        return self.button("Enviar para validação", "Enviar")
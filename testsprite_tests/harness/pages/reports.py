@@ -0,0 +1,29 @@
+"""Reports and analytics (``Reports`` at ``/reports``)."""
+
+from __future__ import annotations
+
+from functools import cached_property
+
+from playwright import async_api
+
+from harness.pages.base import PageObject
+
+
+class ReportsPage(PageObject):
+    path = "/reports"
+
+    @cached_property
+    def title(self) -> async_api.Locator:
+        return self.heading("Relatórios e Analytics", "Relatórios")
+
+    @cached_property
+    def refresh(self) -> async_api.Locator:
+        return self.button("Atualizar")
+
+    @cached_property
+    def new_report(self) -> async_api.Locator:
+        return self.button("Novo")
+
+    @cached_property
+    def back(self) -> async_api.Locator:
+        return self.button("Voltar")
@@ -0,0 +1,59 @@
+"""Bulk student upload (``CSVUploadDialog``), the school director dashboard's Alunos tab."""
+
+from __future__ import annotations
+
+import re
+from functools import cached_property
+from pathlib import Path
+
+from playwright import async_api
+
+from harness import waits
+from harness.pages.base import PageObject, exact
+
+
+class StudentImportPage(PageObject):
+    path = "/dashboard"
+
+    async def open(
+        self,
+        path: str | None = None,
+        replaced: float = waits.REPLACED_WAIT,
+    ) -> "StudentImportPage":
+        """Open the dashboard's Alunos tab and the 'Upload CSV' dialog."""
+        await super().open(path, replaced)
+        await self.click(self.students_tab)
+        await self.click(self.upload)
+        return self
+
+    @cached_property
+    def students_tab(self) -> async_api.Locator:
+        return self.tab("Alunos")
+
+    @cached_property
+    def upload(self) -> async_api.Locator:
+        return self.button("Upload CSV")
+
+    @cached_property
+    def dialog(self) -> async_api.Locator:
+        return self.page.get_by_role("dialog").first
+
+    @cached_property
+    def file(self) -> async_api.Locator:
+        return self.dialog.get_by_label(exact("Arquivo CSV")).first
+
+    @cached_property
+    def confirm(self) -> async_api.Locator:
+        """'Cadastrar N Alunos', enabled once the file has been parsed."""
+        name = re.compile(r"^\s*Cadastrar \d+ Alunos\s*$", re.I)
+        return self.dialog.get_by_role("button", name=name).first
+
+    @cached_property
+    def errors(self) -> async_api.Locator:
+        """The 'Erros encontrados' card, shown from the first rejected row."""
+        return self.dialog.get_by_text(exact("Erros encontrados")).first
+
+    async def choose(self, csv: Path | str) -> None:
+        """Select ``csv`` in the file input, as a user picking it would."""
+        await waits.actionable(self.page, self.file)
+        await self.file.set_input_files(csv)
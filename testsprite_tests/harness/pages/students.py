@@ -0,0 +1,27 @@
+"""Student list (gestao-escolar ``Students`` at ``/students``)."""
+
+from __future__ import annotations
+
+from functools import cached_property
+
+from playwright import async_api
+
+from harness.pages.base import GESTAO_ESCOLAR, PageObject
+
+
+class StudentsPage(PageObject):
+    path = "/students"
+    app = GESTAO_ESCOLAR
+
+    @cached_property
+    def title(self) -> async_api.Locator:
+        return self.heading("Alunos")
+
+    @cached_property
+    def new_student(self) -> async_api.Locator:
+        return self.button("Novo Aluno")
+
+    @cached_property
+    def export_csv(self) -> async_api.Locator:
+        """Exports the rows on the current page of the list."""
+        return self.button("Exportar lista de alunos para CSV", "Exportar CSV")
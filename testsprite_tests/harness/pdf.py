@@ -0,0 +1,61 @@
+"""Just enough PDF parsing to check the files the apps generate.
+
+jsPDF writes plain (non-stream) objects with a classic cross-reference
+table, so the page tree can be read with regular expressions rather than a
+PDF library: the page count is the ``/Count`` of the root ``/Pages`` node,
+falling back to the number of ``/Page`` objects.  Files using object streams
+(PDF 1.5+ compression) would hide their page tree and are rejected.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+_OBJECT = re.compile(rb"\b(\d+)\s+(\d+)\s+obj\b(.*?)\bendobj\b", re.S)
+_PAGES = re.compile(rb"/Type\s*/Pages\b")
+_PAGE = re.compile(rb"/Type\s*/Page\b(?!s)")
+_COUNT = re.compile(rb"/Count\s+(\d+)")
+_STREAM = re.compile(rb"\bstream\r?\n.*?\bendstream\b", re.S)
+
+
+class PdfError(ValueError):
+    pass
+
+
+@dataclass
+class PdfInfo:
+    version: str
+    pages: int
+    bytes: int
+    objects: int
+
+
+def inspect(path: Path | str) -> PdfInfo:
+    """Version, page count and size of the PDF at ``path``."""
+    data = Path(path).read_bytes()
+    if not data.startswith(b"%PDF-"):
+        raise PdfError(f"{path} is not a PDF")
+    if b"%%EOF" not in data[-1024:]:
+        raise PdfError(f"{path} is truncated (no %%EOF trailer)")
+    version = data[5:8].decode("ascii", errors="replace")
+    # Content streams may hold anything, including "obj"; drop them first.
+    bodies = [m[3] for m in _OBJECT.finditer(_STREAM.sub(b"stream endstream", data))]
+    if any(b"/ObjStm" in body for body in bodies):
+        raise PdfError(f"{path} uses object streams, which this parser does not read")
+    roots = [
+        int(count[1])
+        for body in bodies
+        if _PAGES.search(body) and b"/Parent" not in body
+        for count in [_COUNT.search(body)]
+        if count
+    ]
+    pages = roots[0] if len(roots) == 1 else sum(1 for body in bodies if _PAGE.search(body))
+    if not pages:
+        raise PdfError(f"{path} has no pages")
+    return PdfInfo(version=version, pages=pages, bytes=len(data), objects=len(bodies))
+
+
+def page_count(path: Path | str) -> int:
+    return inspect(path).pages
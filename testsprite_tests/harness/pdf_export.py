@@ -0,0 +1,216 @@
+"""``python -m harness.pdf_export``: time the coordinator's PEI report at batch scale.
+
+The only jsPDF output over many PEIs is the coordinator dashboard's
+"Relatório" (``handleExportReport`` in
+``src/components/dashboards/CoordinatorDashboard.tsx``): network statistics
+followed by every active PEI of the coordinator's school, built page by page
+on the main thread and saved with ``doc.save()``.  Printing a single PEI
+("Imprimir") goes through ``window.print()`` and produces no file.
+
+With ``--standin`` each size N runs in its own data clone
+(:mod:`harness.isolation`): the school's active PEIs are replaced by N new
+students with one PEI each before the dashboard opens.  Without it a single
+run measures whatever the coordinator sees on the backend.
+
+The report is captured with :func:`harness.downloads.capture` (generation
+latency, long tasks, heap) and its pages counted with :mod:`harness.pdf`.
+Results are written to ``tmp/pdf_export_benchmark.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Mapping
+
+from playwright import async_api
+
+from harness import auth, downloads, isolation, network, pdf, rest
+from harness.launch import DEFAULT_PROFILE, PROFILES
+from harness.pages import DashboardPage
+from harness.scenarios import SUITE_DIR
+from harness.session import SharedBrowser
+from harness.standin import StandIn
+
+OUTPUT_FILE = SUITE_DIR / "tmp" / "pdf_export_benchmark.json"
+
+DEFAULT_SIZES = (1, 50, 500)
+STATUSES = ("draft", "pending", "approved", "returned")
+
+
+@dataclass
+class PdfRun:
+    size: int | None
+    # Active PEIs in the coordinator's school when the report was generated.
+    listed: int | None = None
+    download: downloads.Download | None = None
+    pdf: pdf.PdfInfo | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.pdf is not None
+
+
+def stage(session: Mapping[str, Any], count: int) -> None:
+    """Leave exactly ``count`` active PEIs, on new students, in the user's school."""
+    profile = rest.profile(session)
+    school, tenant = profile["school_id"], profile["tenant_id"]
+    active = f"peis?school_id=eq.{school}&is_active_version=eq.true"
+    current = rest.request(session, "GET", f"{active}&select=assigned_teacher_id&limit=1")
+    teacher = current[0]["assigned_teacher_id"] if current else None
+    rest.request(session, "PATCH", active, {"is_active_version": False}, prefer="return=minimal")
+    students = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Aluno {i + 1:04d}",
+            "school_id": school,
+            "tenant_id": tenant,
+        }
+        for i in range(count)
+    ]
+    rest.request(session, "POST", "students", students, prefer="return=minimal")
+    peis = [
+        {
+            "student_id": student["id"],
+            "school_id": school,
+            "tenant_id": tenant,
+            "assigned_teacher_id": teacher,
+            "created_by": session["user"]["id"],
+            "status": STATUSES[i % len(STATUSES)],
+            "is_active_version": True,
+        }
+        for i, student in enumerate(students)
+    ]
+    rest.request(session, "POST", "peis", peis, prefer="return=minimal")
+
+
+def _listed(session: Mapping[str, Any]) -> int:
+    school = rest.profile(session)["school_id"]
+    return rest.count(session, "peis", f"select=id&school_id=eq.{school}&is_active_version=eq.true")
+
+
+async def run_size(
+    shared: SharedBrowser,
+    role: str,
+    size: int | None,
+    timeout: float = downloads.DEFAULT_TIMEOUT,
+) -> PdfRun:
+    result = PdfRun(size)
+    state = await auth.storage_state(role)
+    session = auth.session_of(json.loads(Path(state).read_text(encoding="utf-8")))
+    clone = None
+    context = None
+    try:
+        if size is not None:
+            clone = await isolation.acquire(f"pdf-{size}")
+            await asyncio.to_thread(stage, session, size)
+        result.listed = await asyncio.to_thread(_listed, session)
+        context = await shared.new_context(network.Policy(), clone=clone, storage_state=state)
+        page = await context.new_page()
+        dashboard = await DashboardPage(page).open()
+        result.download, path = await downloads.capture(
+            page, lambda: dashboard.click(dashboard.report), timeout
+        )
+        result.pdf = await asyncio.to_thread(pdf.inspect, path)
+    except (async_api.Error, rest.BackendError, isolation.IsolationError, pdf.PdfError) as exc:
+        result.error = str(exc).splitlines()[0]
+    finally:
+        if context is not None:
+            await context.close()
+        await isolation.release(clone)
+    return result
+
+
+async def run(
+    sizes: list[int | None],
+    role: str,
+    repeat: int,
+    timeout: float,
+    profile: str,
+    headless: bool | None,
+) -> list[PdfRun]:
+    async with SharedBrowser(headless=headless, profile=profile) as shared:
+        return [
+            await run_size(shared, role, size, timeout) for _ in range(repeat) for size in sizes
+        ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.pdf_export",
+        description="Generate the coordinator's PEI report for growing PEI counts and time it.",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=list(DEFAULT_SIZES),
+        help="active PEIs per report; needs --standin",
+    )
+    parser.add_argument("--role", default="coordinator", choices=list(auth.ROLES))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=downloads.DEFAULT_TIMEOUT,
+        help="limit per report, in seconds",
+    )
+    parser.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--standin", action="store_true", help="use the local Supabase stand-in")
+    args = parser.parse_args(argv)
+
+    standin = StandIn().start() if args.standin else None
+    if standin is not None:
+        os.environ.update(standin.environ())
+        os.environ["TESTSPRITE_ISOLATE"] = "1"
+    else:
+        print("Without --standin the report covers the backend's PEIs; --sizes is ignored.")
+    sizes: list[int | None] = list(args.sizes) if standin is not None else [None]
+    try:
+        runs = asyncio.run(
+            run(
+                sizes,
+                args.role,
+                args.repeat,
+                args.timeout,
+                args.profile,
+                False if args.headed else None,
+            )
+        )
+    finally:
+        if standin is not None:
+            standin.stop()
+
+    print(
+        f"{'PEIs':>5} {'pages':>5} {'KB':>7} {'latency':>8} {'total':>7} "
+        f"{'blocking':>8} {'longest':>8} {'heap peak':>9}"
+    )
+    for r in runs:
+        d, info = r.download, r.pdf
+        if d is None or info is None:
+            print(f"{r.listed if r.listed is not None else '-':>5} {r.error}")
+            continue
+        heap = "-" if d.heap_peak is None else f"{d.heap_peak / 2**20:.0f} MB"
+        print(
+            f"{r.listed:>5} {info.pages:>5} {info.bytes / 1024:>7.0f} {d.download_s:>7.2f}s "
+            f"{d.total_s:>6.2f}s {d.blocking_ms:>6.0f}ms {d.longest_task_ms:>6.0f}ms {heap:>9}"
+        )
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps({"role": args.role, "runs": [asdict(r) for r in runs]}, indent=2),
+        encoding="utf-8",
+    )
+    return 0 if all(r.ok for r in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""Pre-warmed browser contexts leased to scenarios.
+
+A scenario starts with ``browser.new_context(storage_state=...)``,
+``context.new_page()`` and ``DashboardPage(page).open()``: a new context, the
+app's bundle fetched, parsed and run, React mounted and the session
+restored, all before its first step.  :class:`ContextPool` does that ahead
+of time.  It keeps up to :func:`size` contexts (``TESTSPRITE_POOL``) per
+storage state, network policy and entry URL (the page the scenario opens
+first, see :attr:`harness.scenarios.Scenario.entry`), already showing that
+URL with the app mounted.
+
+Leasing
+    A scenario's ``new_context()`` with no option other than
+    ``storage_state`` takes a pooled context when one is ready or warming,
+    routed through the scenario's network ledger and data clone.  Its first
+    ``new_page()`` returns the warm page, and :meth:`PageObject.open` on that
+    URL skips the navigation (:func:`claim`) unless the scenario has a data
+    clone: the warm page loaded the shared data.  The step then reports the
+    warm-up load's duration, so load budgets still apply to it.
+Reset
+    ``close()`` hands the context back.  In the background its other pages
+    are closed, the listeners and routes the scenario added removed,
+    cookies, ``localStorage`` and IndexedDB of every origin it visited
+    replaced by the storage state (``BrowserContext.set_storage_state``),
+    the app's CacheStorage (except the Workbox precache) emptied,
+    permissions, offline mode, headers, geolocation and timeouts restored,
+    and the page loaded again.
+Recycling
+    A context is closed instead after :func:`uses` leases
+    (``TESTSPRITE_POOL_USES``), when its scenario added init scripts or
+    bindings or installed the clock (which cannot be undone), or when the
+    reset fails.
+
+The pool only warms contexts that scenarios still to run will lease.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from playwright import async_api
+
+from harness import isolation, network
+
+if TYPE_CHECKING:
+    from harness.session import SharedBrowser
+
+DEFAULT_SIZE = 2
+DEFAULT_USES = 10
+WARM_TIMEOUT = 30.0
+DEFAULT_TIMEOUT = 30_000
+
+# Storage state path (``None`` for a signed-out context), policy, entry URL.
+Key = tuple[Optional[str], network.Policy, str]
+
+_MOUNTED = "() => (document.getElementById('root')?.childElementCount ?? 0) > 0"
+
+_CLEAR_CACHES = """async () => {
+  if (!('caches' in self)) return;
+  for (const key of await caches.keys())
+    if (!key.startsWith('workbox-precache')) await caches.delete(key);
+}"""
+
+_EMPTY_STATE = {"cookies": [], "origins": []}
+
+
+def size() -> int:
+    """Contexts kept warm per key; ``0`` turns the pool off."""
+    return int(os.environ.get("TESTSPRITE_POOL") or DEFAULT_SIZE)
+
+
+def uses() -> int:
+    return int(os.environ.get("TESTSPRITE_POOL_USES") or DEFAULT_USES)
+
+
+# Fresh pooled pages: the URL they show and how long it took to load, in ms.
+_warm: weakref.WeakKeyDictionary[async_api.Page, tuple[str, float]] = weakref.WeakKeyDictionary()
+
+
+def claim(page: async_api.Page, url: str) -> float | None:
+    """The load time of ``url`` if ``page`` is a fresh pooled page showing it (once)."""
+    shown, load_ms = _warm.pop(page, ("", 0.0))
+    return load_ms if shown == url else None
+
+
+@dataclass(eq=False)
+class _Entry:
+    key: Key
+    context: async_api.BrowserContext
+    page: async_api.Page
+    # Duration of the last warm-up load, in ms.
+    load_ms: float = 0.0
+    leases: int = 0
+    # The scenario changed the context in a way the reset cannot undo.
+    dirty: bool = False
+    listeners: list[tuple[str, Callable[..., Any]]] = field(default_factory=list)
+
+
+class PooledContext:
+    """A leased ``BrowserContext``; ``close()`` hands it back to the pool."""
+
+    def __init__(self, pool: "ContextPool", entry: _Entry, fresh: bool) -> None:
+        self._pool = pool
+        self._entry = entry
+        self._fresh = fresh
+        self._page_taken = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._entry.context, name)
+
+    async def new_page(self) -> async_api.Page:
+        if self._page_taken:
+            return await self._entry.context.new_page()
+        self._page_taken = True
+        if self._fresh:
+            _warm[self._entry.page] = (self._entry.key[2], self._entry.load_ms)
+        return self._entry.page
+
+    def on(self, event: str, handler: Callable[..., Any]) -> None:
+        self._entry.listeners.append((event, handler))
+        self._entry.context.on(event, handler)
+
+    def once(self, event: str, handler: Callable[..., Any]) -> None:
+        self._entry.listeners.append((event, handler))
+        self._entry.context.once(event, handler)
+
+    async def add_init_script(self, *args: Any, **kwargs: Any) -> None:
+        self._entry.dirty = True
+        await self._entry.context.add_init_script(*args, **kwargs)
+
+    async def expose_binding(self, *args: Any, **kwargs: Any) -> None:
+        self._entry.dirty = True
+        await self._entry.context.expose_binding(*args, **kwargs)
+
+    async def expose_function(self, *args: Any, **kwargs: Any) -> None:
+        self._entry.dirty = True
+        await self._entry.context.expose_function(*args, **kwargs)
+
+    @property
+    def clock(self) -> async_api.Clock:
+        self._entry.dirty = True
+        return self._entry.context.clock
+
+    async def close(self, **_options: Any) -> None:
+        self._pool.give_back(self._entry)
+
+
+class ContextPool:
+    """Warm contexts on ``shared``, leased to the scenarios that will ask for them."""
+
+    def __init__(self, shared: "SharedBrowser", size: int = DEFAULT_SIZE, uses: int = DEFAULT_USES):
+        self.shared = shared
+        self.size = size
+        self.uses = uses
+        self.hits = 0
+        self.misses = 0
+        self._demand: Counter[Key] = Counter()
+        self._ready: dict[Key, asyncio.Queue[_Entry | None]] = {}
+        self._pending: Counter[Key] = Counter()
+        self._leased: Counter[Key] = Counter()
+        self._waiting: Counter[Key] = Counter()
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+
+    def plan(self, keys: Counter[Key]) -> None:
+        """Expect ``keys[key]`` leases of each key and start warming for them."""
+        self._demand.update(keys)
+        for key in keys:
+            self._ready.setdefault(key, asyncio.Queue())
+            self._fill(key)
+
+    def _wanted(self, key: Key) -> int:
+        """Contexts to add for ``key``: at most :attr:`size` in all, leased ones included."""
+        leased = self._leased[key]
+        supply = self._ready[key].qsize() + self._pending[key] + leased
+        return min(self.size, self._demand[key] + leased) - supply
+
+    def _spawn(self, key: Key, job: Callable[[], Any]) -> None:
+        self._pending[key] += 1
+
+        async def run() -> None:
+            try:
+                entry = await job()
+            except (async_api.Error, asyncio.TimeoutError):
+                entry = None
+            self._pending[key] -= 1
+            if self._closed:
+                if entry is not None:
+                    await self._discard(entry)
+                return
+            self._ready[key].put_nowait(entry)
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _fill(self, key: Key) -> None:
+        for _ in range(max(0, self._wanted(key))):
+            self._spawn(key, lambda: self._create(key))
+
+    async def _load(self, page: async_api.Page, url: str) -> float:
+        """Load ``url`` until the app mounts; its duration in ms."""
+        started = time.perf_counter()
+        await page.goto(url, wait_until="load", timeout=WARM_TIMEOUT * 1000)
+        await page.wait_for_function(_MOUNTED, timeout=WARM_TIMEOUT * 1000)
+        return (time.perf_counter() - started) * 1000
+
+    async def _create(self, key: Key) -> _Entry:
+        state, policy, url = key
+        options = {"storage_state": state} if state else {}
+        context = await self.shared.new_context(policy, network.NetworkLedger(), **options)
+        try:
+            page = await context.new_page()
+            load_ms = await self._load(page, url)
+        except BaseException:
+            await context.close()
+            raise
+        return _Entry(key, context, page, load_ms)
+
+    async def lease(
+        self,
+        key: Key,
+        ledger: network.NetworkLedger,
+        clone: str | None,
+    ) -> PooledContext | None:
+        """A warm context for ``key``, or ``None`` to open a new one as usual."""
+        if self._closed or key not in self._ready:
+            return None
+        self._demand[key] -= 1
+        queue = self._ready[key]
+        # Wait only for a context no other lease is already waiting for.
+        if queue.qsize() + self._pending[key] - self._waiting[key] <= 0:
+            self.misses += 1
+            self._fill(key)
+            return None
+        self._waiting[key] += 1
+        try:
+            entry = await queue.get()
+        finally:
+            self._waiting[key] -= 1
+        if entry is None:
+            self.misses += 1
+            self._fill(key)
+            return None
+        self._leased[key] += 1
+        self._fill(key)
+        try:
+            await network.reroute(entry.context, key[1], self.shared.assets, ledger)
+            if clone:
+                await isolation.install(entry.context, clone)
+        except async_api.Error:
+            self._leased[key] -= 1
+            await self._discard(entry)
+            self._fill(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry.leases += 1
+        return PooledContext(self, entry, fresh=clone is None)
+
+    def give_back(self, entry: _Entry) -> None:
+        """Reset ``entry`` in the background, or close it if it is not needed again."""
+        key = entry.key
+        self._leased[key] -= 1
+        if self._closed or self._wanted(key) <= 0:
+            self._spawn_discard(entry)
+        elif entry.dirty or entry.leases >= self.uses:
+            self._spawn(key, lambda: self._replace(entry))
+        else:
+            self._spawn(key, lambda: self._reset(entry))
+
+    def _spawn_discard(self, entry: _Entry) -> None:
+        task = asyncio.create_task(self._discard(entry))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _replace(self, entry: _Entry) -> _Entry:
+        await self._discard(entry)
+        return await self._create(entry.key)
+
+    async def _reset(self, entry: _Entry) -> _Entry:
+        state, policy, url = entry.key
+        context, page = entry.context, entry.page
+        try:
+            for event, handler in entry.listeners:
+                context.remove_listener(event, handler)
+            entry.listeners.clear()
+            for other in context.pages:
+                if other is not page:
+                    await other.close()
+            try:
+                await page.evaluate(_CLEAR_CACHES)
+            except async_api.Error:
+                pass
+            await page.goto("about:blank")
+            await context.set_storage_state(state or _EMPTY_STATE)
+            await context.clear_permissions()
+            await context.set_offline(False)
+            await context.set_extra_http_headers({})
+            await context.set_geolocation(None)
+            context.set_default_timeout(DEFAULT_TIMEOUT)
+            context.set_default_navigation_timeout(DEFAULT_TIMEOUT)
+            await network.reroute(context, policy, self.shared.assets, network.NetworkLedger())
+            entry.load_ms = await self._load(page, url)
+        except (async_api.Error, asyncio.TimeoutError):
+            return await self._replace(entry)
+        return entry
+
+    async def _discard(self, entry: _Entry) -> None:
+        _warm.pop(entry.page, None)
+        try:
+            await entry.context.close()
+        except async_api.Error:
+            pass
+
+    async def close(self) -> None:
+        """Close every pooled context; leased ones are closed when handed back."""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for queue in self._ready.values():
+            while not queue.empty():
+                entry = queue.get_nowait()
+                if entry is not None:
+                    await self._discard(entry)
@@ -0,0 +1,361 @@
+"""Leading steps shared by scenarios, run once and forked into each of them.
+
+Many scenarios start the same way: open the landing page, click "Fazer
+Login", fill the credentials, reach ``/dashboard`` (TC001 alone has three
+files).  :func:`plan` reads each scenario's ``run_test`` and splits it into
+its setup (up to ``page = await context.new_page()``) and its steps (the
+statements after it).  Scenarios with the same setup, network policy and
+role are arranged in a prefix tree of their steps; two steps are the same
+when their code and the module-level names they use are.
+
+The runner runs each shared prefix (:class:`Node`) once, in a context of its
+own, then captures a :class:`Fork`:
+
+* the context's storage state with its IndexedDB
+  (``BrowserContext.storage_state(indexed_db=True)``);
+* the page's URL;
+* with :mod:`harness.isolation`, the prefix's data clone, which each branch
+  copies instead of the baseline;
+* the prefix's wait, vitals and network ledgers, which each branch starts
+  from, so its result (and its budgets) cover the shared steps too.
+
+Each branch (a longer shared prefix or a scenario's remaining steps) runs
+the same setup with the fork's storage state, opens the URL, replays the
+prefix's statements that do not ``await`` (``auth_page = AuthPage(page)``,
+``page.on(...)``) so its names refer to the new page, and goes on from
+there.  A scenario is only forked after a step whose awaited results it does
+not use later.  Only prefixes with at least :data:`MIN_SHARED` awaited steps
+the restore does not redo are shared; page object ``open()`` calls and
+``waits.settle`` do not count, since the restore navigates and settles
+again.  What the app kept in memory or ``sessionStorage`` is not
+carried over; the fork is the state a reload at that URL sees.
+
+If a prefix fails, the cause is printed to stderr and its scenarios run in
+full instead; retries always run in full.  ``TESTSPRITE_PREFIX=off`` turns sharing off.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
+
+from playwright import async_api
+
+from harness import waits
+from harness.network import NetworkLedger
+from harness.pages.base import NAVIGATION_TIMEOUT
+from harness.scenarios import RunTest, Scenario
+from harness.vitals import VitalsLedger
+from harness.waits import WaitLedger
+
+MIN_SHARED = 2
+
+# Global the transformed ``run_test`` reaches its :class:`Fork` through.
+FORK = "_testsprite_fork"
+
+
+class PrefixError(RuntimeError):
+    pass
+
+
+def enabled() -> bool:
+    return os.environ.get("TESTSPRITE_PREFIX", "").lower() not in ("0", "off")
+
+
+@dataclass(frozen=True)
+class Fork:
+    """Browser (and data) state after the first :attr:`steps` steps."""
+
+    steps: int
+    storage_state: dict[str, Any]
+    url: str
+    clone: str | None = None
+    waits: WaitLedger = field(default_factory=WaitLedger)
+    vitals: VitalsLedger = field(default_factory=VitalsLedger)
+    network: NetworkLedger = field(default_factory=NetworkLedger)
+
+    def carry(self, waited: WaitLedger, steps: VitalsLedger, requests: NetworkLedger) -> None:
+        """Start a branch's ledgers with what the shared steps recorded."""
+        waited.records[:0] = self.waits.records
+        steps.steps[:0] = self.vitals.steps
+        requests.merge(self.network)
+
+    async def restore(self, page: async_api.Page) -> None:
+        await page.goto(self.url, wait_until="commit", timeout=NAVIGATION_TIMEOUT)
+        await waits.settle(page, replaced=0)
+
+
+class _Capture:
+    """What a prefix run's ``run_test`` reaches as :data:`FORK`."""
+
+    def __init__(self, parent: Fork | None, steps: int) -> None:
+        self.parent = parent
+        self.steps = steps
+
+    async def restore(self, page: async_api.Page) -> None:
+        if self.parent is not None:
+            await self.parent.restore(page)
+
+    async def capture(self, context: async_api.BrowserContext, page: async_api.Page) -> Fork:
+        state = await context.storage_state(indexed_db=True)
+        return Fork(self.steps, dict(state), page.url)
+
+
+@dataclass(frozen=True)
+class Steps:
+    """A scenario's ``run_test`` as setup plus steps (see :func:`split`)."""
+
+    setup: str
+    keys: tuple[str, ...]
+    # Steps without ``await`` (nor names bound by one), replayed by every
+    # branch forked after them.
+    replayed: tuple[bool, ...]
+    # Numbers of leading steps after which the scenario can be forked.
+    cuts: frozenset[int]
+    # Awaited steps that are not navigations or settles (see _redone).
+    saved: tuple[bool, ...] = ()
+
+
+@dataclass
+class Node:
+    """A prefix shared by several scenarios: steps ``start:end`` of each."""
+
+    scenario: Scenario
+    start: int
+    end: int
+    children: list["Node"] = field(default_factory=list)
+    # Scenarios that go on alone after ``end`` steps.
+    leaves: list[Scenario] = field(default_factory=list)
+
+    def scenarios(self) -> Iterator[Scenario]:
+        yield from self.leaves
+        for child in self.children:
+            yield from child.scenarios()
+
+    def load(self, parent: Fork | None, overrides: dict[str, Any]) -> RunTest:
+        """``run_test`` running this prefix and returning its :class:`Fork`."""
+        fork = _Capture(parent, self.end)
+        return _load(self.scenario, self.start, self.end, fork, overrides)
+
+
+def load(scenario: Scenario, fork: Fork, overrides: dict[str, Any]) -> RunTest:
+    """``run_test`` running ``scenario`` on from ``fork``."""
+    return _load(scenario, fork.steps, None, fork, overrides)
+
+
+def _run_test(tree: ast.Module) -> ast.AsyncFunctionDef | None:
+    return next(
+        (n for n in tree.body if isinstance(n, ast.AsyncFunctionDef) and n.name == "run_test"),
+        None,
+    )
+
+
+def _body(function: ast.AsyncFunctionDef) -> tuple[ast.Try, int, str, str] | None:
+    """The ``try`` holding the scenario, the index after its setup, and the
+    names of its context and page."""
+    for node in function.body:
+        if not isinstance(node, ast.Try):
+            continue
+        for i, statement in enumerate(node.body):
+            if (
+                isinstance(statement, ast.Assign)
+                and len(statement.targets) == 1
+                and isinstance(statement.targets[0], ast.Name)
+                and isinstance(statement.value, ast.Await)
+                and isinstance(statement.value.value, ast.Call)
+                and isinstance(statement.value.value.func, ast.Attribute)
+                and statement.value.value.func.attr == "new_page"
+                and isinstance(statement.value.value.func.value, ast.Name)
+            ):
+                return node, i + 1, statement.value.value.func.value.id, statement.targets[0].id
+    return None
+
+
+def _stored(node: ast.AST) -> set[str]:
+    return {
+        n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)
+    }
+
+
+def _loaded(node: ast.AST) -> set[str]:
+    return {n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)}
+
+
+def _awaits(node: ast.AST) -> bool:
+    return any(isinstance(n, ast.Await) for n in ast.walk(node))
+
+
+def _redone(step: ast.stmt) -> bool:
+    """Whether ``step`` only navigates or settles, which a fork's restore redoes:
+    ``[x =] await XxxPage(...).open(...)`` or ``await waits.settle(...)``."""
+    if not isinstance(step, (ast.Expr, ast.Assign)) or not isinstance(step.value, ast.Await):
+        return False
+    call = step.value.value
+    if not isinstance(call, ast.Call) or not isinstance(call.func, ast.Attribute):
+        return False
+    target = call.func.value
+    if call.func.attr == "open":
+        return (
+            isinstance(target, ast.Call)
+            and isinstance(target.func, ast.Name)
+            and target.func.id.endswith("Page")
+        )
+    return call.func.attr == "settle" and isinstance(target, ast.Name) and target.id == "waits"
+
+
+def _globals(tree: ast.Module, scenario: Scenario) -> dict[str, str]:
+    """Module-level names and what they are bound to."""
+    bound = {}
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            module = getattr(node, "module", None) or ""
+            for alias in node.names:
+                bound[alias.asname or alias.name] = f"import {module}:{alias.name}"
+        elif isinstance(node, ast.Assign):
+            for name in set().union(*map(_stored, node.targets)):
+                bound[name] = ast.dump(node.value)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound[node.name] = f"{scenario.path.name}:{node.name}"
+    if scenario.variant:
+        bound["ROLE"] = repr(scenario.variant)
+    return bound
+
+
+def _key(node: ast.AST, local: set[str], bound: dict[str, str]) -> str:
+    names = sorted(_loaded(node) - local)
+    return ast.dump(node) + repr([(name, bound.get(name)) for name in names])
+
+
+def split(scenario: Scenario) -> Steps | None:
+    """``scenario``'s setup and steps, or ``None`` when it does not have the
+    generated ``try:`` / ``page = await context.new_page()`` shape."""
+    tree = ast.parse(scenario.path.read_text(encoding="utf-8"), filename=str(scenario.path))
+    function = _run_test(tree)
+    body = _body(function) if function is not None else None
+    if body is None:
+        return None
+    try_node, first, _, _ = body
+    setup, steps = try_node.body[:first], try_node.body[first:]
+    local = _stored(function) | {a.arg for a in function.args.args}
+    bound = _globals(tree, scenario)
+    # Names read after the ``try`` body (its handlers and ``finally``).
+    tail = set().union(*map(_loaded, try_node.handlers + try_node.finalbody), set())
+    cuts = set()
+    replayed = []
+    # Names bound by steps that only the prefix runs.
+    awaited: set[str] = set()
+    for n, step in enumerate(steps, 1):
+        replayed.append(not _awaits(step) and not awaited & _loaded(step))
+        if not replayed[-1]:
+            awaited |= _stored(step)
+        later = set().union(*map(_loaded, steps[n:]), tail)
+        if not awaited & later:
+            cuts.add(n)
+    return Steps(
+        setup=repr([_key(s, local, bound) for s in setup]) + repr(scenario.network),
+        keys=tuple(_key(s, local, bound) for s in steps),
+        replayed=tuple(replayed),
+        cuts=frozenset(cuts),
+        saved=tuple(not again and not _redone(s) for s, again in zip(steps, replayed)),
+    )
+
+
+def _load(
+    scenario: Scenario,
+    start: int,
+    end: int | None,
+    fork: Fork | _Capture,
+    overrides: dict[str, Any],
+) -> RunTest:
+    def transform(tree: ast.Module) -> None:
+        function = _run_test(tree)
+        try_node, first, context, page = _body(function)
+        setup, steps = try_node.body[:first], try_node.body[first:]
+        restore = ast.parse(f"await {FORK}.restore({page})").body
+        replayed = [s for s, again in zip(steps[:start], split(scenario).replayed) if again]
+        body = setup + restore + replayed + steps[start:end]
+        if end is not None:
+            body += ast.parse(f"return await {FORK}.capture({context}, {page})").body
+        try_node.body = body
+        ast.fix_missing_locations(tree)
+
+    return scenario.load({**overrides, FORK: fork}, transform)
+
+
+def _shared(steps: Steps, start: int, end: int) -> int:
+    return sum(steps.saved[start:end])
+
+
+def _branch(group: list[tuple[Scenario, Steps]], start: int) -> tuple[list[Node], list[Scenario]]:
+    """Nodes and leaves for scenarios sharing their first ``start`` steps."""
+    by_step: dict[str | None, list[tuple[Scenario, Steps]]] = defaultdict(list)
+    for scenario, steps in group:
+        key = steps.keys[start] if start < len(steps.keys) else None
+        by_step[key].append((scenario, steps))
+    nodes, leaves = [], []
+    for key, members in by_step.items():
+        if key is None or len(members) < 2:
+            leaves.extend(scenario for scenario, _ in members)
+            continue
+        end = start + 1
+        while all(
+            end < len(steps.keys) and steps.keys[end] == members[0][1].keys[end]
+            for _, steps in members
+        ):
+            end += 1
+        cut = next(
+            (
+                n
+                for n in range(end, start, -1)
+                if all(n in steps.cuts for _, steps in members)
+                and _shared(members[0][1], start, n) >= MIN_SHARED
+            ),
+            None,
+        )
+        if cut is None:
+            leaves.extend(scenario for scenario, _ in members)
+            continue
+        node = Node(members[0][0], start, cut)
+        node.children, node.leaves = _branch(members, cut)
+        nodes.append(node)
+    return nodes, leaves
+
+
+def plan(scenarios: Iterable[Scenario]) -> tuple[list[Node], list[Scenario]]:
+    """Prefix trees over ``scenarios``, and the scenarios that share nothing."""
+    roots: dict[tuple[str, str | None], list[tuple[Scenario, Steps]]] = defaultdict(list)
+    alone = []
+    for scenario in scenarios:
+        steps = split(scenario)
+        if steps is None:
+            alone.append(scenario)
+        else:
+            roots[steps.setup, scenario.role].append((scenario, steps))
+    trees = []
+    for group in roots.values():
+        nodes, leaves = _branch(group, 0)
+        trees.extend(nodes)
+        alone.extend(leaves)
+    return trees, alone
+
+
+def describe(trees: list[Node]) -> str:
+    lines = []
+
+    def walk(node: Node, depth: int) -> None:
+        count = sum(1 for _ in node.scenarios())
+        lines.append(
+            f"{'  ' * depth}steps {node.start + 1}-{node.end} of {node.scenario.name}, "
+            f"shared by {count}"
+        )
+        for child in node.children:
+            walk(child, depth + 1)
+        for leaf in node.leaves:
+            lines.append(f"{'  ' * (depth + 1)}{leaf.name}")
+
+    for tree in trees:
+        walk(tree, 0)
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+"""Preflight checks run before any scenario, concurrently, in seconds.
+
+When the apps or auth are down every scenario fails the same way, but only
+after spending its timeouts on the login form (TESTSPRITE-REPORT.md: 18 of
+18 failed on "The login page is empty").  :func:`run` checks the shared
+preconditions at once:
+
+``server``
+    Each app server (:func:`harness.config.app_origins`) answers ``/``
+    with the ``<div id="root">`` shell.
+``login``
+    In Chromium, each app's sign-in route mounts React into ``#root`` and
+    renders the e-mail and password fields.  Uncaught page errors are kept
+    for the diagnostic.
+``token``
+    One password grant on ``/auth/v1/token`` succeeds.
+
+If any check fails the runner prints one diagnostic and exits without
+running a scenario.  ``python -m harness.preflight`` runs the checks alone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Awaitable
+
+from playwright import async_api
+
+from harness import auth, config, network
+from harness.launch import DEFAULT_PROFILE, PROFILES
+from harness.pages import AuthPage
+from harness.session import SharedBrowser
+from harness.standin import StandIn
+
+DEFAULT_TIMEOUT = 20.0
+DEFAULT_ROLE = "coordinator"
+
+_MOUNTED = "() => (document.getElementById('root')?.childElementCount ?? 0) > 0"
+
+
+class PreflightError(RuntimeError):
+    pass
+
+
+@dataclass
+class Check:
+    name: str
+    ok: bool
+    detail: str
+    seconds: float = 0.0
+
+
+@dataclass
+class Preflight:
+    checks: list[Check] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(check.ok for check in self.checks)
+
+    def describe(self) -> str:
+        lines = [
+            f"  {'ok  ' if c.ok else 'FAIL'} {c.name:<28} {c.seconds:5.1f}s  {c.detail}"
+            for c in self.checks
+        ]
+        if self.ok:
+            return "Preflight passed:\n" + "\n".join(lines)
+        return "Preflight failed; no scenario was run:\n" + "\n".join(lines)
+
+
+async def _timed(name: str, check: Awaitable[str], timeout: float) -> Check:
+    start = time.perf_counter()
+    try:
+        detail = await asyncio.wait_for(check, timeout)
+    except asyncio.TimeoutError:
+        return Check(name, False, f"no answer within {timeout:.0f}s", time.perf_counter() - start)
+    except (async_api.Error, auth.AuthError, OSError, PreflightError) as exc:
+        return Check(name, False, str(exc).splitlines()[0], time.perf_counter() - start)
+    return Check(name, True, detail, time.perf_counter() - start)
+
+
+def _fetch(origin: str, timeout: float) -> str:
+    try:
+        with urllib.request.urlopen(origin + "/", timeout=timeout) as response:
+            body = response.read()
+    except urllib.error.HTTPError as exc:
+        raise PreflightError(f"HTTP {exc.code}") from None
+    except urllib.error.URLError as exc:
+        raise PreflightError(f"unreachable: {exc.reason}") from None
+    if b'id="root"' not in body:
+        raise PreflightError(f'HTTP 200 but no <div id="root"> in {len(body)} bytes')
+    return f"HTTP 200, {len(body) / 1024:.1f} KB"
+
+
+async def server(origin: str, timeout: float) -> str:
+    return await asyncio.to_thread(_fetch, origin, timeout)
+
+
+def _crash(errors: list[str]) -> str:
+    return f"; page error: {errors[0]}" if errors else ""
+
+
+async def login(shared: SharedBrowser, app: int, timeout: float) -> str:
+    """Open ``app``'s sign-in route and wait for React and the form."""
+    context = await shared.new_context(network.Policy())
+    errors: list[str] = []
+    try:
+        page = await context.new_page()
+        page.on("pageerror", lambda error: errors.append(str(error).splitlines()[0]))
+        screen = AuthPage(page, app=app)
+        await page.goto(screen.url(), wait_until="domcontentloaded", timeout=timeout * 1000)
+        try:
+            await page.wait_for_function(_MOUNTED, timeout=timeout * 1000)
+        except async_api.TimeoutError:
+            raise PreflightError("React did not mount into #root" + _crash(errors)) from None
+        try:
+            await screen.email.wait_for(state="visible", timeout=timeout * 1000)
+            await screen.password.wait_for(state="visible", timeout=timeout * 1000)
+        except async_api.TimeoutError:
+            raise PreflightError("no e-mail/password fields rendered" + _crash(errors)) from None
+        return f"login form on {screen.path}"
+    finally:
+        await context.close()
+
+
+async def token(role: str) -> str:
+    session = await asyncio.to_thread(auth.sign_in, role)
+    return f"signed in as {role} ({session['user'].get('email')})"
+
+
+async def _browser_checks(
+    origins: tuple[str, ...],
+    timeout: float,
+    headless: bool | None,
+    profile: str | None,
+) -> list[Check]:
+    names = [f"login {origin}" for origin in origins]
+    shared = SharedBrowser(headless=headless, profile=profile)
+    try:
+        await asyncio.wait_for(shared.start(), timeout)
+    except (async_api.Error, asyncio.TimeoutError) as exc:
+        reason = str(exc).splitlines()[0] if str(exc) else f"no browser within {timeout:.0f}s"
+        await shared.stop()
+        return [Check(name, False, f"Chromium did not start: {reason}") for name in names]
+    try:
+        return list(
+            await asyncio.gather(
+                *(
+                    _timed(name, login(shared, app, timeout), timeout * 2)
+                    for app, name in enumerate(names)
+                )
+            )
+        )
+    finally:
+        await shared.stop()
+
+
+async def run(
+    role: str = DEFAULT_ROLE,
+    timeout: float = DEFAULT_TIMEOUT,
+    headless: bool | None = None,
+    profile: str | None = None,
+) -> Preflight:
+    """Run every check concurrently; each is bounded by ``timeout`` seconds."""
+    origins = config.app_origins()
+    checks = await asyncio.gather(
+        *(_timed(f"server {origin}", server(origin, timeout), timeout) for origin in origins),
+        _timed("token /auth/v1/token", token(role), timeout),
+        _browser_checks(origins, timeout, headless, profile),
+    )
+    flat: list[Check] = []
+    for check in checks:
+        flat.extend(check if isinstance(check, list) else [check])
+    return Preflight(flat)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.preflight",
+        description="Check that the apps, their login form and Supabase auth work.",
+    )
+    parser.add_argument("--role", default=DEFAULT_ROLE, choices=list(auth.ROLES))
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="per check")
+    parser.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--standin", action="store_true", help="use the local Supabase stand-in")
+    args = parser.parse_args(argv)
+
+    standin = StandIn().start() if args.standin else None
+    if standin is not None:
+        os.environ.update(standin.environ())
+    try:
+        result = asyncio.run(
+            run(args.role, args.timeout, False if args.headed else None, args.profile)
+        )
+    finally:
+        if standin is not None:
+            standin.stop()
+    print(result.describe())
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""HTML and Markdown run reports, written as scenarios finish.
+
+A :class:`RunReport` opens ``tmp/reports/<start time>.html`` and ``.md``
+when the run starts and appends one row per scenario as its result arrives,
+so either file can be opened mid-run (the HTML page reloads itself until the
+run is over).  Nothing already written is re-rendered: each row costs one
+indexed query for the scenario's recent history in the result store
+(:mod:`harness.results`), whatever its size, and is flushed at once.
+
+Each row shows the scenario's status and duration with sparklines of its
+last runs: duration, largest LCP, total blocking time and peak heap.  Failed
+scenarios are clustered by error signature, the error's first line with
+numbers, ids, quoted values and URL queries masked, so one broken login
+shows as one cluster rather than twenty failures.  The clusters and totals
+are appended when the run finishes.
+
+``python -m harness.report [RUN_ID]`` renders a stored run (default: the
+latest) the same way.
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import os
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from harness.results import ResultStore, results_file
+from harness.scenarios import SUITE_DIR
+
+if TYPE_CHECKING:
+    from harness.runner import ScenarioResult
+
+REPORTS_DIR = SUITE_DIR / "tmp" / "reports"
+
+# Runs shown in each sparkline.
+HISTORY_RUNS = 20
+
+# (history key, column title, unit divisor, unit suffix)
+SPARKLINES = (
+    ("duration", "Duration", 1, "s"),
+    ("lcp", "LCP", 1, "ms"),
+    ("blocking_time", "Blocking", 1, "ms"),
+    ("heap", "Heap", 2**20, "MB"),
+)
+
+_BLOCKS = "▁▂▃▄▅▆▇█"
+
+_MASKS = (
+    (re.compile(r"https?://[^\s?#'\"]+[?#][^\s'\"]*"), lambda m: m[0].split("?")[0] + "?…"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<id>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b[0-9a-f]{16,}\b", re.I), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "'…'"),
+    (re.compile(r"\d+(\.\d+)?"), "N"),
+)
+
+_STYLE = """
+body { font: 14px system-ui, sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; }
+th, td { padding: 4px 10px; border-bottom: 1px solid #ddd; text-align: left; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+.PASSED { color: #17803d; } .FAILED { color: #b42318; }
+svg polyline { fill: none; stroke: #4767d6; stroke-width: 1.5; }
+svg circle.FAILED { fill: #b42318; }
+pre { white-space: pre-wrap; background: #f6f6f6; padding: 8px; }
+"""
+
+# Reload while the run is still appending; the closing marker stops it.
+_RELOAD = """
+addEventListener("load", () => {
+  if (!document.getElementById("finished")) setTimeout(() => location.reload(), 5000);
+});
+"""
+
+
+@dataclass
+class Entry:
+    """What the report needs from one scenario execution."""
+
+    scenario: str
+    role: str | None
+    status: str
+    started: float
+    duration: float
+    error: str | None = None
+    attempt: int = 0
+    lane: str = "main"
+
+    @property
+    def label(self) -> str:
+        retry = f" (retry {self.attempt})" if self.attempt else ""
+        lane = "" if self.lane == "main" else f" [{self.lane}]"
+        return f"{self.scenario}{retry}{lane}"
+
+    @classmethod
+    def of(cls, result: "ScenarioResult") -> "Entry":
+        return cls(
+            scenario=result.scenario.name,
+            role=result.scenario.role,
+            status=result.status,
+            started=result.started_at,
+            duration=result.duration,
+            error=result.error,
+            attempt=result.attempt,
+            lane=result.lane,
+        )
+
+
+@dataclass
+class Cluster:
+    number: int
+    signature: str
+    example: str
+    scenarios: list[str] = field(default_factory=list)
+
+
+def signature(error: str) -> str:
+    """The error's first non-empty line with volatile parts masked."""
+    line = next((text.strip() for text in error.splitlines() if text.strip()), "")
+    for pattern, replacement in _MASKS:
+        line = pattern.sub(replacement, line)
+    return line[:200]
+
+
+def spark_text(values: list[float | None]) -> str:
+    known = [v for v in values if v is not None]
+    if not known:
+        return ""
+    low, high = min(known), max(known)
+    span = (high - low) or 1
+    return "".join(
+        " " if v is None else _BLOCKS[int((v - low) / span * (len(_BLOCKS) - 1))] for v in values
+    )
+
+
+def spark_svg(values: list[float | None], statuses: list[str], width: int = 100) -> str:
+    points = [(i, v) for i, v in enumerate(values) if v is not None]
+    if not points:
+        return ""
+    low = min(v for _, v in points)
+    span = (max(v for _, v in points) - low) or 1
+    step = width / max(1, len(values) - 1)
+
+    def xy(i: int, v: float) -> tuple[float, float]:
+        return round(i * step, 1), round(18 - (v - low) / span * 16, 1)
+
+    line = " ".join("%s,%s" % xy(i, v) for i, v in points)
+    dots = "".join(
+        '<circle class="FAILED" cx="%s" cy="%s" r="2"/>' % xy(i, v)
+        for i, v in points
+        if statuses[i] != "PASSED"
+    )
+    return (
+        f'<svg width="{width}" height="20" viewBox="-2 0 {width + 4} 20">'
+        f'<polyline points="{line}"/>{dots}</svg>'
+    )
+
+
+def _latest(values: list[float | None], divisor: float, unit: str) -> str:
+    value = values[-1] if values else None
+    return "-" if value is None else f"{value / divisor:.{1 if unit == 's' else 0}f}{unit}"
+
+
+class RunReport:
+    """Append-only HTML and Markdown reports of one run."""
+
+    def __init__(
+        self,
+        started: float | None = None,
+        store: ResultStore | None = None,
+        directory: Path = REPORTS_DIR,
+        title: str = "TestSprite run",
+        history: int = HISTORY_RUNS,
+    ) -> None:
+        self.started = time.time() if started is None else started
+        self.store = store
+        self.runs = history
+        self.clusters: dict[str, Cluster] = {}
+        self.passed = self.failed = 0
+        self.durations: list[float] = []
+        self.ended = self.started
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        directory.mkdir(parents=True, exist_ok=True)
+        self.html_path = directory / f"{stamp}.html"
+        self.md_path = directory / f"{stamp}.md"
+        self._html: IO[str] = open(self.html_path, "w", encoding="utf-8")
+        self._md: IO[str] = open(self.md_path, "w", encoding="utf-8")
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started))
+        columns = "".join(f"<th>{name}</th>" for _, name, _, _ in SPARKLINES)
+        self._write(
+            f'<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">'
+            f"<title>{html.escape(title)} {when}</title>"
+            f"<style>{_STYLE}</style><script>{_RELOAD}</script></head><body>\n"
+            f"<h1>{html.escape(title)}</h1><p>Started {when}</p>\n"
+            f"<table><thead><tr><th>Status</th><th>Scenario</th><th>Role</th>"
+            f"{columns}<th>Cluster</th></tr></thead><tbody>\n",
+            f"# {title}\n\nStarted {when}\n\n"
+            f"| Status | Scenario | Role | {' | '.join(n for _, n, _, _ in SPARKLINES)} "
+            f"| Cluster |\n|---|---|---|{'---|' * len(SPARKLINES)}---|\n",
+        )
+
+    def _write(self, html_text: str, md_text: str) -> None:
+        self._html.write(html_text)
+        self._html.flush()
+        self._md.write(md_text)
+        self._md.flush()
+
+    def _history(self, entry: Entry) -> list[dict[str, Any]]:
+        if self.store is not None:
+            points = self.store.history(entry.scenario, self.runs, until=entry.started)
+            if points:
+                return points
+        return [{"status": entry.status, "duration": entry.duration}]
+
+    def _cluster(self, entry: Entry) -> Cluster | None:
+        if entry.status == "PASSED":
+            return None
+        key = signature(entry.error or entry.status)
+        cluster = self.clusters.get(key)
+        if cluster is None:
+            cluster = self.clusters[key] = Cluster(len(self.clusters) + 1, key, entry.error or "")
+        cluster.scenarios.append(entry.scenario)
+        return cluster
+
+    def add(self, entry: Entry) -> None:
+        """Append ``entry``'s row to both reports."""
+        if entry.status == "PASSED":
+            self.passed += 1
+        else:
+            self.failed += 1
+        self.durations.append(entry.duration)
+        self.ended = max(self.ended, entry.started + entry.duration)
+        points = self._history(entry)
+        statuses = [p["status"] for p in points]
+        cluster = self._cluster(entry)
+        html_cells, md_cells = [], []
+        for key, _, divisor, unit in SPARKLINES:
+            values = [p.get(key) for p in points]
+            html_cells.append(
+                f'<td class="num">{_latest(values, divisor, unit)} '
+                f"{spark_svg(values, statuses)}</td>"
+            )
+            md_cells.append(f"{_latest(values, divisor, unit)} {spark_text(values)}".strip())
+        link = f'<a href="#cluster-{cluster.number}">#{cluster.number}</a>' if cluster else ""
+        self._write(
+            f'<tr><td class="{entry.status}">{entry.status}</td>'
+            f"<td>{html.escape(entry.label)}</td><td>{html.escape(entry.role or '')}</td>"
+            f"{''.join(html_cells)}<td>{link}</td></tr>\n",
+            f"| {'✅' if entry.status == 'PASSED' else '❌'} | {entry.label} "
+            f"| {entry.role or ''} | {' | '.join(md_cells)} "
+            f"| {f'#{cluster.number}' if cluster else ''} |\n",
+        )
+
+    def close(self) -> None:
+        """Append the totals and failure clusters and end the HTML document."""
+        total = self.passed + self.failed
+        wall = self.ended - self.started
+        median = statistics.median(self.durations) if self.durations else 0.0
+        summary = (
+            f"{self.passed} passed, {self.failed} failed of {total} in {wall:.0f}s "
+            f"(median scenario {median:.1f}s)"
+        )
+        clusters = sorted(self.clusters.values(), key=lambda c: (-len(c.scenarios), c.number))
+        html_parts = [f"</tbody></table>\n<h2>Summary</h2><p>{summary}</p>\n"]
+        md_parts = [f"\n## Summary\n\n{summary}\n"]
+        if clusters:
+            html_parts.append("<h2>Failure clusters</h2>\n")
+            md_parts.append("\n## Failure clusters\n")
+        for c in clusters:
+            names = ", ".join(c.scenarios)
+            html_parts.append(
+                f'<h3 id="cluster-{c.number}">#{c.number}: {len(c.scenarios)} scenario(s)</h3>'
+                f"<p><code>{html.escape(c.signature)}</code></p>"
+                f"<p>{html.escape(names)}</p><pre>{html.escape(c.example)}</pre>\n"
+            )
+            md_parts.append(
+                f"\n### #{c.number}: {len(c.scenarios)} scenario(s)\n\n`{c.signature}`\n\n"
+                f"{names}\n\n```\n{c.example}\n```\n"
+            )
+        html_parts.append('<p id="finished"></p></body></html>\n')
+        self._write("".join(html_parts), "".join(md_parts))
+        self._html.close()
+        self._md.close()
+
+
+class Reporter:
+    """Runner callback feeding a :class:`RunReport`; inert when reports are off."""
+
+    def __init__(self, report: RunReport | None) -> None:
+        self.report = report
+
+    @classmethod
+    def open(cls, started: float, store: ResultStore | None) -> "Reporter":
+        directory = reports_dir()
+        if directory is None:
+            return cls(None)
+        return cls(RunReport(started, store, directory))
+
+    def __call__(self, result: "ScenarioResult") -> None:
+        if self.report is not None:
+            self.report.add(Entry.of(result))
+
+    def close(self) -> None:
+        if self.report is not None:
+            self.report.close()
+
+
+def reports_dir() -> Path | None:
+    value = os.environ.get("TESTSPRITE_REPORT")
+    if value and value.lower() == "off":
+        return None
+    return Path(value) if value else REPORTS_DIR
+
+
+def _stored(store: ResultStore, run_id: int | None) -> tuple[int, float, list[Entry]]:
+    if run_id is None:
+        row = store.db.execute("SELECT id FROM runs ORDER BY started DESC LIMIT 1").fetchone()
+        if row is None:
+            raise SystemExit(f"No runs in {store.path}")
+        run_id = row["id"]
+    run = store.db.execute("SELECT started FROM runs WHERE id = ?", (run_id,)).fetchone()
+    if run is None:
+        raise SystemExit(f"No run {run_id} in {store.path}")
+    rows = store.db.execute(
+        "SELECT scenario, role, status, started, duration, error, attempt, lane FROM executions "
+        "WHERE run_id = ? ORDER BY started",
+        (run_id,),
+    )
+    return run_id, run["started"], [Entry(**dict(row)) for row in rows]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.report",
+        description="Render a stored run as HTML and Markdown reports.",
+    )
+    parser.add_argument("run", type=int, nargs="?", help="run id (default: the latest)")
+    parser.add_argument("--db", type=Path, help="result store (default: TESTSPRITE_RESULTS)")
+    parser.add_argument("-o", "--output", type=Path, default=reports_dir() or REPORTS_DIR)
+    parser.add_argument("--history", type=int, default=HISTORY_RUNS, help="runs per sparkline")
+    args = parser.parse_args(argv)
+
+    path = args.db or results_file()
+    if path is None or not path.exists():
+        parser.error("no result store (see harness.results)")
+    with ResultStore(path) as store:
+        run_id, started, entries = _stored(store, args.run)
+        report = RunReport(started, store, args.output, f"Run {run_id}", args.history)
+        for entry in entries:
+            report.add(entry)
+        report.close()
+    print(f"{report.html_path}\n{report.md_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Minimal PostgREST client for the harness tools, authenticated as a user.
+
+Blocking (``urllib``); call from coroutines through ``asyncio.to_thread``.
+"""
+
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.request
+from http.client import HTTPMessage
+from typing import Any, Iterable, Iterator, Mapping
+from urllib.parse import quote
+
+from harness import config, isolation
+
+# PostgREST's ``max-rows`` on Supabase projects.
+PAGE_SIZE = 1000
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+def request(
+    session: Mapping[str, Any],
+    method: str,
+    path: str,
+    body: Any = None,
+    timeout: float = 60,
+    prefer: str = "return=representation",
+) -> Any:
+    """Send ``method /rest/v1/<path>`` with ``session``'s token.
+
+    Returns the decoded JSON, or ``None`` for an empty response.
+    """
+    payload, _ = _send(session, method, path, body, timeout, prefer)
+    return json.loads(payload) if payload else None
+
+
+def count(session: Mapping[str, Any], table: str, query: str = "select=id") -> int:
+    """Exact number of rows of ``table`` matching ``query``, without fetching them."""
+    _, headers = _send(session, "GET", f"{table}?{query}&limit=1", None, 300, "count=exact")
+    total = (headers.get("Content-Range") or "").rpartition("/")[2]
+    if not total.isdigit():
+        raise BackendError(f"GET {table} returned no row count")
+    return int(total)
+
+
+def profile(session: Mapping[str, Any]) -> dict[str, Any]:
+    """The signed-in user's ``profiles`` row (``tenant_id``, ``school_id``...)."""
+    user = session["user"]["id"]
+    rows = request(session, "GET", f"profiles?select=*&id=eq.{user}")
+    if not rows:
+        raise BackendError(f"{session['user'].get('email')} has no profile")
+    return rows[0]
+
+
+def _send(
+    session: Mapping[str, Any],
+    method: str,
+    path: str,
+    body: Any,
+    timeout: float,
+    prefer: str,
+) -> tuple[bytes, HTTPMessage]:
+    req = urllib.request.Request(
+        f"{config.supabase_url()}/rest/v1/{path}",
+        data=None if body is None else json.dumps(body).encode(),
+        headers={
+            "apikey": config.supabase_anon_key(),
+            "Authorization": f"Bearer {session['access_token']}",
+            "Content-Type": "application/json",
+            "Prefer": prefer,
+        },
+        method=method,
+    )
+    clone = isolation.current()
+    if clone:
+        req.add_header(isolation.HEADER, clone)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.read(), response.headers
+    except urllib.error.HTTPError as exc:
+        detail = exc.read().decode(errors="replace")
+        raise BackendError(f"{method} {path} failed with {exc.code}: {detail}") from None
+    except urllib.error.URLError as exc:
+        raise BackendError(f"{method} {path} failed: {exc.reason}") from None
+
+
+def in_list(values: Iterable[str]) -> str:
+    """``in.(...)`` filter value, quoting each item."""
+    return "in.(%s)" % ",".join(quote(f'"{value}"', safe='"') for value in values)
+
+
+def pages(
+    session: Mapping[str, Any],
+    table: str,
+    query: str = "select=*",
+    key: str = "id",
+    size: int = PAGE_SIZE,
+) -> Iterator[list[dict[str, Any]]]:
+    """Every row of ``table`` matching ``query``, ordered by ``key``, a page at a time.
+
+    Keyset pagination (``key=gt.<last>``), so each page costs the same however
+    deep into the table it is.
+    """
+    last = None
+    while True:
+        after = "" if last is None else f"&{key}=gt.{quote(str(last))}"
+        path = f"{table}?{query}&order={key}.asc&limit={size}{after}"
+        rows = request(session, "GET", path)
+        if not isinstance(rows, list):
+            raise BackendError(f"GET {path} returned {type(rows).__name__}, not a list of rows")
+        if rows:
+            yield rows
+        if len(rows) < size:
+            return
+        last = rows[-1][key]
@@ -0,0 +1,475 @@
+"""Append-only SQLite store of scenario executions.
+
+Every run of ``python -m harness`` adds one row to ``runs`` (git SHA and
+environment) and, as each scenario finishes, one row to ``executions``
+(status, error, timings, wait and network savings) plus its vitals steps in
+``steps``.  Each scenario is committed on its own, so an interrupted run
+keeps what already finished, and nothing is ever rewritten.  Scenario code
+is not stored: the git SHA identifies it.
+
+``executions`` is indexed by scenario and by date, so per-scenario history
+and date-range queries answer in milliseconds over months of runs::
+
+    with ResultStore() as store:
+        store.trend("TC014_Offline_Data_Synchronization", days=90)
+        store.pass_rates(days=30)
+
+The database is ``tmp/results.sqlite`` (``TESTSPRITE_RESULTS`` points
+elsewhere, ``off`` disables it).  ``python -m harness.results`` prints
+trends and pass rates; ``python -m harness.results import`` loads a
+TestSprite ``tmp/test_results.json`` into the store.
+"""
+
+from __future__ import annotations
+
+import argparse
+import getpass
+import json
+import os
+import platform
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from harness import config
+from harness.scenarios import SUITE_DIR
+from harness.vitals import METRICS
+
+if TYPE_CHECKING:
+    from harness.runner import ScenarioResult
+
+RESULTS_FILE = SUITE_DIR / "tmp" / "results.sqlite"
+LEGACY_FILE = SUITE_DIR / "tmp" / "test_results.json"
+
+SCHEMA_VERSION = 2
+
+# Statements bringing a database of the key's version up to the next one.
+_MIGRATIONS = {
+    1: (
+        "ALTER TABLE executions ADD COLUMN attempt INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE executions ADD COLUMN lane TEXT NOT NULL DEFAULT 'main'",
+    ),
+}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL,
+    git_sha TEXT,
+    source TEXT NOT NULL DEFAULT 'harness',
+    environment TEXT NOT NULL DEFAULT '{{}}'
+);
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    scenario TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    role TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    waits_replaced REAL,
+    waits_removed REAL,
+    requests INTEGER,
+    saved_requests INTEGER,
+    saved_bytes INTEGER,
+    attempt INTEGER NOT NULL DEFAULT 0,
+    lane TEXT NOT NULL DEFAULT 'main'
+);
+-- Covering the columns the history queries read, so they never touch the table.
+CREATE INDEX IF NOT EXISTS executions_scenario
+    ON executions (scenario, started, status, duration);
+CREATE INDEX IF NOT EXISTS executions_started
+    ON executions (started, scenario, status, duration);
+CREATE INDEX IF NOT EXISTS executions_run ON executions (run_id);
+CREATE TABLE IF NOT EXISTS steps (
+    execution_id INTEGER NOT NULL REFERENCES executions (id),
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL,
+    route TEXT NOT NULL,
+    at REAL,
+    {", ".join(f"{metric} REAL" for metric in METRICS)},
+    PRIMARY KEY (execution_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS steps_route ON steps (route);
+"""
+
+_DAY = 86400.0
+
+
+def results_file() -> Path | None:
+    value = os.environ.get("TESTSPRITE_RESULTS")
+    if value and value.lower() == "off":
+        return None
+    return Path(value) if value else RESULTS_FILE
+
+
+def git_sha(directory: Path = SUITE_DIR) -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def environment(**run: Any) -> dict[str, Any]:
+    """Where and how the suite ran; ``run`` adds the CLI settings (profile, ...)."""
+    try:
+        playwright = metadata.version("playwright")
+    except metadata.PackageNotFoundError:
+        playwright = None
+    return {
+        "host": socket.gethostname(),
+        "user": getpass.getuser(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "playwright": playwright,
+        "supabase_url": config.supabase_url(),
+        "app_origins": list(config.app_origins()),
+        "ci": bool(os.environ.get("CI")),
+        **run,
+    }
+
+
+class ResultStore:
+    """One SQLite connection to the result database.
+
+    Used from a single thread: the runner records results from its event
+    loop (or, with ``-w``, from the parent process collecting them).
+    """
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path) if path is not None else results_file() or RESULTS_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        # WAL lets report queries read while a run is appending.
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path} has schema {version}, newer than this harness")
+        with self.db:
+            for step in range(version or SCHEMA_VERSION, SCHEMA_VERSION):
+                for statement in _MIGRATIONS[step]:
+                    self.db.execute(statement)
+            self.db.executescript(_SCHEMA)
+            self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    # Writing
+
+    def begin_run(
+        self,
+        started: float | None = None,
+        sha: str | None = None,
+        source: str = "harness",
+        **run: Any,
+    ) -> int:
+        """Add a run and return its id; ``run`` is stored with :func:`environment`."""
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (started, git_sha, source, environment) VALUES (?, ?, ?, ?)",
+                (
+                    time.time() if started is None else started,
+                    sha,
+                    source,
+                    json.dumps(environment(**run) if source == "harness" else run),
+                ),
+            )
+        return int(cursor.lastrowid)
+
+    def finish_run(self, run_id: int, finished: float | None = None) -> None:
+        with self.db:
+            self.db.execute(
+                "UPDATE runs SET finished = ? WHERE id = ?",
+                (time.time() if finished is None else finished, run_id),
+            )
+
+    def record(self, run_id: int, result: "ScenarioResult") -> int:
+        """Append one finished scenario and its steps; returns the execution id."""
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO executions (run_id, scenario, case_id, role, status, error, "
+                "started, duration, waits_replaced, waits_removed, requests, saved_requests, "
+                "saved_bytes, attempt, lane) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    result.scenario.name,
+                    result.scenario.case_id,
+                    result.scenario.role,
+                    result.status,
+                    result.error,
+                    result.started_at,
+                    result.duration,
+                    result.waits.replaced,
+                    result.waits.removed,
+                    result.network.requests,
+                    result.network.saved_requests,
+                    result.network.saved_bytes,
+                    result.attempt,
+                    result.lane,
+                ),
+            )
+            execution = int(cursor.lastrowid)
+            self.db.executemany(
+                f"INSERT INTO steps (execution_id, position, kind, target, route, at, "
+                f"{', '.join(METRICS)}) VALUES ({', '.join('?' * (6 + len(METRICS)))})",
+                [
+                    (
+                        execution,
+                        position,
+                        step.kind,
+                        step.target,
+                        step.route,
+                        step.at,
+                        *(getattr(step, metric) for metric in METRICS),
+                    )
+                    for position, step in enumerate(result.vitals.steps)
+                ],
+            )
+        return execution
+
+    def import_testsprite(self, path: Path = LEGACY_FILE) -> int:
+        """Load a TestSprite ``test_results.json`` as one run; returns the rows added.
+
+        The embedded ``code`` of each entry is dropped.  Durations come from
+        the entries' ``created``/``modified`` timestamps.
+        """
+        entries = json.loads(path.read_text(encoding="utf-8"))
+        stamps = [_timestamp(e["created"]) for e in entries if e.get("created")]
+        run_id = self.begin_run(
+            started=min(stamps) if stamps else path.stat().st_mtime,
+            source="testsprite",
+            file=str(path),
+            project=next((e.get("projectId") for e in entries), None),
+        )
+        added = 0
+        with self.db:
+            for entry in entries:
+                try:
+                    started = _timestamp(entry["created"])
+                    duration = _timestamp(entry["modified"]) - started
+                except (KeyError, TypeError, ValueError):
+                    continue
+                title = entry.get("title", "")
+                case = re.match(r"^(TC\d+)", title)
+                self.db.execute(
+                    "INSERT INTO executions (run_id, scenario, case_id, status, error, started, "
+                    "duration) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        title,
+                        case.group(1) if case else title,
+                        entry.get("testStatus", "UNKNOWN"),
+                        entry.get("testError"),
+                        started,
+                        duration,
+                    ),
+                )
+                added += 1
+        self.finish_run(run_id, max(stamps) if stamps else None)
+        return added
+
+    # Reading
+
+    def executions(
+        self,
+        scenario: str | None = None,
+        days: float | None = None,
+        limit: int | None = None,
+    ) -> list[sqlite3.Row]:
+        """Executions, newest first, optionally of one scenario and the last ``days``."""
+        where, params = _filters(scenario, days)
+        sql = f"SELECT * FROM executions{where} ORDER BY started DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params).fetchall()
+
+    def history(
+        self,
+        scenario: str,
+        runs: int = 20,
+        until: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """The last ``runs`` executions of ``scenario`` up to ``until``, oldest first.
+
+        Each has its status and duration plus, from its steps, the largest
+        LCP, the total blocking time and the peak heap.
+        """
+        rows = self.db.execute(
+            "SELECT e.id, e.status, e.started, e.duration, "
+            "  (SELECT MAX(lcp) FROM steps WHERE execution_id = e.id) AS lcp, "
+            "  (SELECT SUM(blocking_time) FROM steps WHERE execution_id = e.id) AS blocking_time, "
+            "  (SELECT MAX(heap) FROM steps WHERE execution_id = e.id) AS heap "
+            "FROM executions AS e WHERE e.scenario = ? AND e.started <= ? "
+            "ORDER BY e.started DESC LIMIT ?",
+            (scenario, time.time() if until is None else until, runs),
+        )
+        return [dict(row) for row in reversed(rows.fetchall())]
+
+    def last_durations(self, runs: int = 5) -> dict[str, list[float]]:
+        """The last ``runs`` durations of every scenario, newest first."""
+        rows = self.db.execute(
+            "SELECT s.scenario, e.duration FROM (SELECT DISTINCT scenario FROM executions) AS s "
+            "JOIN executions AS e ON e.id IN ("
+            "  SELECT id FROM executions WHERE scenario = s.scenario ORDER BY started DESC LIMIT ?"
+            ") ORDER BY s.scenario, e.started DESC",
+            (runs,),
+        )
+        durations: dict[str, list[float]] = {}
+        for row in rows:
+            durations.setdefault(row["scenario"], []).append(row["duration"])
+        return durations
+
+    def outcomes(self, runs: int = 30) -> dict[str, list[dict[str, Any]]]:
+        """Status, run and attempt of every scenario's last ``runs`` executions, oldest first."""
+        rows = self.db.execute(
+            "SELECT e.scenario, e.run_id, e.attempt, e.status FROM "
+            "(SELECT DISTINCT scenario FROM executions) AS s "
+            "JOIN executions AS e ON e.id IN ("
+            "  SELECT id FROM executions WHERE scenario = s.scenario ORDER BY started DESC LIMIT ?"
+            ") ORDER BY s.scenario, e.started",
+            (runs,),
+        )
+        outcomes: dict[str, list[dict[str, Any]]] = {}
+        for row in rows:
+            outcomes.setdefault(row["scenario"], []).append(dict(row))
+        return outcomes
+
+    def trend(self, scenario: str, days: float = 90) -> list[dict[str, Any]]:
+        """Per day: executions, failures and the mean and max duration of ``scenario``."""
+        where, params = _filters(scenario, days)
+        rows = self.db.execute(
+            "SELECT date(started, 'unixepoch', 'localtime') AS day, COUNT(*) AS runs, "
+            "SUM(status != 'PASSED') AS failed, AVG(duration) AS mean, MAX(duration) AS max "
+            f"FROM executions{where} GROUP BY day ORDER BY day",
+            params,
+        )
+        return [dict(row) for row in rows]
+
+    def pass_rates(self, days: float | None = 30) -> list[dict[str, Any]]:
+        """Per scenario over the last ``days``: executions, passes and mean duration."""
+        where, params = _filters(None, days)
+        rows = self.db.execute(
+            "SELECT scenario, COUNT(*) AS runs, SUM(status = 'PASSED') AS passed, "
+            "AVG(duration) AS mean, MAX(started) AS last "
+            f"FROM executions{where} GROUP BY scenario ORDER BY scenario",
+            params,
+        )
+        return [dict(row) for row in rows]
+
+    def steps(self, execution_id: int) -> list[dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT * FROM steps WHERE execution_id = ? ORDER BY position", (execution_id,)
+        )
+        return [dict(row) for row in rows]
+
+
+def _filters(scenario: str | None, days: float | None) -> tuple[str, list[Any]]:
+    clauses, params = [], []
+    if scenario is not None:
+        clauses.append("scenario = ?")
+        params.append(scenario)
+    if days is not None:
+        clauses.append("started >= ?")
+        params.append(time.time() - days * _DAY)
+    return (" WHERE " + " AND ".join(clauses) if clauses else "", params)
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class Recorder:
+    """Runner callback that appends each result to the store as it arrives.
+
+    Without a store (``TESTSPRITE_RESULTS=off``) it does nothing.
+    """
+
+    def __init__(self, store: ResultStore | None, **run: Any) -> None:
+        self.store = store
+        self.run_id = store.begin_run(sha=git_sha(), **run) if store is not None else None
+
+    @classmethod
+    def open(cls, **run: Any) -> "Recorder":
+        path = results_file()
+        return cls(ResultStore(path) if path is not None else None, **run)
+
+    def __call__(self, result: "ScenarioResult") -> None:
+        if self.store is not None and self.run_id is not None:
+            self.store.record(self.run_id, result)
+
+    def close(self) -> None:
+        if self.store is not None and self.run_id is not None:
+            self.store.finish_run(self.run_id)
+            self.store.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.results",
+        description="Query the scenario result store, or import TestSprite results into it.",
+    )
+    parser.add_argument("--db", type=Path, help="database (default: TESTSPRITE_RESULTS)")
+    commands = parser.add_subparsers(dest="command")
+    rates = commands.add_parser("rates", help="pass rate and mean duration per scenario")
+    rates.add_argument("--days", type=float, default=30)
+    trend = commands.add_parser("trend", help="daily runs, failures and durations of a scenario")
+    trend.add_argument("scenario")
+    trend.add_argument("--days", type=float, default=90)
+    legacy = commands.add_parser("import", help="load a TestSprite test_results.json")
+    legacy.add_argument("file", type=Path, nargs="?", default=LEGACY_FILE)
+    args = parser.parse_args(argv)
+
+    path = args.db or results_file()
+    if path is None:
+        parser.error("the result store is disabled (TESTSPRITE_RESULTS=off)")
+    with ResultStore(path) as store:
+        if args.command == "import":
+            added = store.import_testsprite(args.file)
+            print(f"Imported {added} executions from {args.file} into {store.path}")
+        elif args.command == "trend":
+            print(f"{'day':<10} {'runs':>5} {'failed':>6} {'mean':>8} {'max':>8}")
+            for row in store.trend(args.scenario, args.days):
+                print(
+                    f"{row['day']:<10} {row['runs']:>5} {row['failed']:>6} "
+                    f"{row['mean']:>7.1f}s {row['max']:>7.1f}s"
+                )
+        else:
+            print(f"{'scenario':<60} {'runs':>5} {'pass':>6} {'mean':>8}")
+            for row in store.pass_rates(getattr(args, "days", 30)):
+                print(
+                    f"{row['scenario'][:60]:<60} {row['runs']:>5} "
+                    f"{row['passed'] / row['runs']:>6.0%} {row['mean']:>7.1f}s"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
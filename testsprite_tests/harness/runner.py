@@ -0,0 +1,276 @@
+"""Concurrent execution of scenarios over a :class:`SharedBrowser`."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import sys
+import time
+import traceback
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Protocol
+
+from harness import auth, budgets, isolation, network, pages, pool, prefix, vitals, waits
+from harness.network import NetworkLedger
+from harness.scenarios import Scenario
+from harness.session import SharedBrowser
+from harness.vitals import VitalsLedger
+from harness.waits import WaitLedger
+
+PASSED = "PASSED"
+FAILED = "FAILED"
+
+# Lanes: quarantined scenarios run beside the main gate and never fail it.
+MAIN = "main"
+QUARANTINE = "quarantine"
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 300.0
+
+
+@dataclass
+class ScenarioResult:
+    scenario: Scenario
+    status: str
+    started_at: float
+    duration: float
+    error: str | None = None
+    waits: WaitLedger = field(default_factory=WaitLedger)
+    network: NetworkLedger = field(default_factory=NetworkLedger)
+    vitals: VitalsLedger = field(default_factory=VitalsLedger)
+    # 0 for the first run, then 1, 2, ... for retries (see harness.flaky).
+    attempt: int = 0
+    lane: str = MAIN
+
+    @property
+    def gating(self) -> bool:
+        """Whether this result counts towards the run's exit code."""
+        return self.lane == MAIN
+
+    @property
+    def passed(self) -> bool:
+        return self.status == PASSED
+
+
+ResultCallback = Callable[[ScenarioResult], None]
+
+
+class RetryPolicy(Protocol):
+    def allow(self, result: ScenarioResult) -> bool:
+        """Whether the failed ``result`` may run again (and reserve the time)."""
+
+    def share(self, parts: int) -> "RetryPolicy":
+        """The policy for one of ``parts`` worker processes."""
+
+
+def entry_url(scenario: Scenario) -> str | None:
+    """URL of the page the scenario opens first, if it opens one through a page object."""
+    entry = scenario.entry
+    page = getattr(pages, entry[0], None) if entry else None
+    if not (isinstance(page, type) and issubclass(page, pages.PageObject)):
+        return None
+    app = getattr(pages, entry[1], None) if entry[1] else None
+    if not isinstance(app, (int, type(None))):
+        return None
+    # An instance, not the class: ``path`` may depend on the app (AuthPage).
+    return page(None, app).url()
+
+
+async def _pool_key(scenario: Scenario) -> pool.Key | None:
+    try:
+        url = entry_url(scenario)
+    except (AttributeError, IndexError, TypeError):
+        # A page object that cannot resolve its URL without a page.
+        return None
+    if url is None:
+        return None
+    try:
+        policy = network.Policy.from_spec(scenario.network)
+        state = await auth.storage_state(scenario.role) if scenario.role else None
+    except (ValueError, auth.AuthError):
+        return None
+    return state, policy, url
+
+
+async def run_prefix(
+    shared: SharedBrowser,
+    node: prefix.Node,
+    parent: prefix.Fork | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> prefix.Fork:
+    """Run ``node``'s shared steps once, from ``parent``.
+
+    Raises :class:`harness.prefix.PrefixError` with the cause if they fail.
+
+    The returned fork holds a data clone when isolation is on; the caller
+    releases it once every branch has copied it.  Its ledgers hold the steps
+    of ``parent`` and of this node.
+    """
+    ledger = waits.begin()
+    steps = vitals.begin()
+    try:
+        policy = network.Policy.from_spec(node.scenario.network)
+        source = parent.clone if parent else None
+        clone = await isolation.acquire(f"prefix-{node.scenario.case_id}", source)
+    except ValueError as exc:
+        raise prefix.PrefixError(f"{node.scenario.name}: {exc}") from None
+    except isolation.IsolationError as exc:
+        raise prefix.PrefixError(f"Data clone: {exc}") from None
+    if parent is None:
+        api = shared.lease(policy, clone, entry_url(node.scenario))
+    else:
+        api = shared.lease(policy, clone, state=parent.storage_state)
+        parent.carry(ledger, steps, api.network)
+    error = None
+    try:
+        run_test = node.load(parent, {"async_api": api})
+        fork = await asyncio.wait_for(run_test(), timeout)
+    except asyncio.TimeoutError:
+        error = f"Timed out after {timeout:.0f}s"
+    except Exception as exc:
+        error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+    finally:
+        await api.release()
+    if error is not None:
+        await isolation.release(clone)
+        raise prefix.PrefixError(error)
+    return dataclasses.replace(fork, clone=clone, waits=ledger, vitals=steps, network=api.network)
+
+
+async def run_scenario(
+    shared: SharedBrowser,
+    scenario: Scenario,
+    timeout: float = DEFAULT_TIMEOUT,
+    fork: prefix.Fork | None = None,
+) -> ScenarioResult:
+    """Run one scenario in its own browser contexts and capture the outcome.
+
+    With ``fork``, the scenario starts from that shared prefix instead of
+    its first step (see :mod:`harness.prefix`); the prefix's waits, steps and
+    requests are part of the result, and its steps are checked against the
+    budgets with the scenario's own.
+    """
+    ledger = waits.begin()
+    steps = vitals.begin()
+    started_at = time.time()
+    start = time.perf_counter()
+    status, error = PASSED, None
+    try:
+        policy = network.Policy.from_spec(scenario.network)
+    except ValueError as exc:
+        return ScenarioResult(scenario, FAILED, started_at, 0.0, f"{scenario.name}: {exc}")
+    try:
+        clone = await isolation.acquire(scenario.name, fork.clone if fork else None)
+    except isolation.IsolationError as exc:
+        return ScenarioResult(scenario, FAILED, started_at, 0.0, f"Data clone: {exc}")
+    if fork is None:
+        api = shared.lease(policy, clone, entry_url(scenario))
+    else:
+        api = shared.lease(policy, clone, state=fork.storage_state)
+        fork.carry(ledger, steps, api.network)
+    try:
+        if fork is None:
+            run_test = scenario.load({"async_api": api})
+        else:
+            run_test = prefix.load(scenario, fork, {"async_api": api})
+        await asyncio.wait_for(run_test(), timeout)
+    except asyncio.TimeoutError:
+        status, error = FAILED, f"Timed out after {timeout:.0f}s"
+    except Exception as exc:
+        status = FAILED
+        error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+    finally:
+        await api.release()
+        await isolation.release(clone)
+    try:
+        violations = budgets.check(steps.steps, scenario.role)
+    except ValueError as exc:
+        violations, status = [], FAILED
+        error = "\n\n".join(filter(None, [error, f"{budgets.budgets_file()}: {exc}"]))
+    if violations:
+        status = FAILED
+        error = "\n\n".join(filter(None, [error, budgets.report(violations)]))
+    return ScenarioResult(
+        scenario=scenario,
+        status=status,
+        started_at=started_at,
+        duration=time.perf_counter() - start,
+        error=error,
+        waits=ledger,
+        network=api.network,
+        vitals=steps,
+    )
+
+
+async def run_suite(
+    scenarios: Iterable[Scenario],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    headless: bool | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    on_result: ResultCallback | None = None,
+    profile: str | None = None,
+    retry: RetryPolicy | None = None,
+    lane: str = MAIN,
+) -> list[ScenarioResult]:
+    """Run ``scenarios`` with at most ``concurrency`` of them in flight.
+
+    ``profile`` and ``headless`` select how Chromium is launched (see
+    :mod:`harness.launch`).  Unless ``TESTSPRITE_POOL`` is ``0``, contexts are
+    pre-warmed for the scenarios (see :mod:`harness.pool`), and unless
+    ``TESTSPRITE_PREFIX`` is ``off``, leading steps shared by several
+    scenarios run once and are forked into each (see :mod:`harness.prefix`).
+    A failed scenario runs again, in full, while ``retry`` allows it.
+    Results are returned in input order, the last attempt of each;
+    ``on_result`` is called as each attempt finishes.
+    """
+    scenarios = list(scenarios)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    trees, alone = prefix.plan(scenarios) if prefix.enabled() else ([], scenarios)
+    results: dict[Scenario, ScenarioResult] = {}
+
+    await auth.cache.warm(s.role for s in scenarios if s.role)
+
+    async with SharedBrowser(headless=headless, profile=profile) as shared:
+        if pool.size() > 0:
+            shared.pool = pool.ContextPool(shared, pool.size(), pool.uses())
+            # Forked scenarios start from a prefix's state, not a pooled context.
+            keys = [await _pool_key(s) for s in [*alone, *(tree.scenario for tree in trees)]]
+            shared.pool.plan(Counter(key for key in keys if key is not None))
+
+        async def bounded(scenario: Scenario, fork: prefix.Fork | None = None) -> None:
+            attempt = 0
+            while True:
+                async with semaphore:
+                    result = await run_scenario(shared, scenario, timeout, fork)
+                result.attempt, result.lane = attempt, lane
+                results[scenario] = result
+                if on_result:
+                    on_result(result)
+                if result.passed or retry is None or not retry.allow(result):
+                    return
+                attempt, fork = attempt + 1, None
+
+        async def branch(node: prefix.Node, parent: prefix.Fork | None = None) -> None:
+            try:
+                async with semaphore:
+                    fork = await run_prefix(shared, node, parent, timeout)
+            except prefix.PrefixError as exc:
+                members = list(node.scenarios())
+                print(
+                    f"Shared steps {node.start + 1}-{node.end} of {node.scenario.name} failed; "
+                    f"running its {len(members)} scenarios in full:\n{exc}",
+                    file=sys.stderr,
+                )
+                await asyncio.gather(*(bounded(s) for s in members))
+                return
+            try:
+                await asyncio.gather(
+                    *(bounded(s, fork) for s in node.leaves),
+                    *(branch(child, fork) for child in node.children),
+                )
+            finally:
+                await isolation.release(fork.clone)
+
+        await asyncio.gather(*(bounded(s) for s in alone), *(branch(tree) for tree in trees))
+        return [results[s] for s in scenarios]
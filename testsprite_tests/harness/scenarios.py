@@ -0,0 +1,162 @@
+"""Discovery and loading of the ``TC*.py`` scenario files."""
+
+from __future__ import annotations
+
+import ast
+import fnmatch
+import re
+import types
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Mapping
+
+SUITE_DIR = Path(__file__).resolve().parent.parent
+SCENARIO_GLOB = "TC*.py"
+
+_CASE_ID = re.compile(r"^(TC\d+)")
+
+RunTest = Callable[[], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    path: Path
+    # Role this run of a ``ROLES`` scenario signs in as; see :func:`discover`.
+    variant: str | None = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.path.stem}[{self.variant}]" if self.variant else self.path.stem
+
+    @property
+    def case_id(self) -> str:
+        match = _CASE_ID.match(self.name)
+        return match.group(1) if match else self.name
+
+    @property
+    def role(self) -> str | None:
+        """The variant's role, else the module-level ``ROLE`` if declared."""
+        return self.variant or _module_constant(self.path, "ROLE")
+
+    @property
+    def network(self) -> dict[str, Any] | None:
+        """The scenario's module-level ``NETWORK`` policy (see :mod:`harness.network`)."""
+        return _module_constant(self.path, "NETWORK")
+
+    @property
+    def entry(self) -> tuple[str, str | None] | None:
+        """Page object class and ``app=`` constant of the first ``XxxPage(page).open()``."""
+        return _first_open(self.path)
+
+    def load(
+        self,
+        overrides: Mapping[str, Any] | None = None,
+        transform: Callable[[ast.Module], None] | None = None,
+    ) -> RunTest:
+        """Return the scenario's ``run_test`` coroutine function.
+
+        ``overrides`` are injected into the module globals after execution,
+        which is how the runner swaps ``async_api`` for its shared browser
+        and how a variant replaces ``ROLE``.  ``transform`` may rewrite the
+        parsed module first (see :mod:`harness.prefix`).
+        """
+        if self.variant:
+            overrides = {**(overrides or {}), "ROLE": self.variant}
+        return load_run_test(self.path, overrides, transform)
+
+
+def discover(patterns: Iterable[str] = (), suite_dir: Path = SUITE_DIR) -> list[Scenario]:
+    """List scenarios in ``suite_dir``, optionally filtered.
+
+    A file declaring ``ROLES = [...]`` yields one scenario per role, named
+    ``TC003_...[coordinator]``.  A pattern matches a scenario if it is a
+    prefix of its name (``TC001``) or an ``fnmatch`` glob over it
+    (``*Offline*``).
+    """
+    patterns = list(patterns)
+    scenarios = [
+        Scenario(path, role)
+        for path in sorted(suite_dir.glob(SCENARIO_GLOB))
+        for role in _module_constant(path, "ROLES") or [None]
+    ]
+    if not patterns:
+        return scenarios
+    return [s for s in scenarios if any(_matches(s.name, p) for p in patterns)]
+
+
+def _matches(name: str, pattern: str) -> bool:
+    pattern = pattern.removesuffix(".py")
+    return name.startswith(pattern) or fnmatch.fnmatchcase(name, pattern)
+
+
+def load_run_test(
+    path: Path,
+    overrides: Mapping[str, Any] | None = None,
+    transform: Callable[[ast.Module], None] | None = None,
+) -> RunTest:
+    """Execute a scenario file without its module-level ``asyncio.run(...)``."""
+    source = path.read_text(encoding="utf-8")
+    tree = ast.parse(source, filename=str(path))
+    tree.body = [node for node in tree.body if not _is_entrypoint(node)]
+    if transform is not None:
+        transform(tree)
+
+    module = types.ModuleType(f"testsprite_scenario_{path.stem}")
+    module.__file__ = str(path)
+    exec(compile(tree, str(path), "exec"), module.__dict__)
+    if overrides:
+        module.__dict__.update(overrides)
+
+    run_test = module.__dict__.get("run_test")
+    if run_test is None:
+        raise LookupError(f"{path.name} does not define run_test()")
+    return run_test
+
+
+def _module_constant(path: Path, name: str) -> Any:
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == name
+        ):
+            return ast.literal_eval(node.value)
+    return None
+
+
+def _first_open(path: Path) -> tuple[str, str | None] | None:
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    opens = []
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "open"
+            and isinstance(node.func.value, ast.Call)
+            and isinstance(node.func.value.func, ast.Name)
+            and node.func.value.func.id.endswith("Page")
+        ):
+            page = node.func.value
+            app = next((k.value for k in page.keywords if k.arg == "app"), None)
+            if app is None and len(page.args) > 1:
+                app = page.args[1]
+            name = app.id if isinstance(app, ast.Name) else None
+            opens.append(((node.lineno, node.col_offset), page.func.id, name))
+    if not opens:
+        return None
+    _, page, app = min(opens)
+    return page, app
+
+
+def _is_entrypoint(node: ast.stmt) -> bool:
+    if not isinstance(node, ast.Expr) or not isinstance(node.value, ast.Call):
+        return False
+    func = node.value.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr == "run"
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "asyncio"
+    )
@@ -0,0 +1,212 @@
+"""One Playwright driver and one Chromium shared by every scenario in a run.
+
+Scenario files drive Playwright through ``async_api.async_playwright()`` and
+``pw.chromium.launch(...)``.  Rather than rewriting each of them, the runner
+injects a per-scenario stand-in for the ``async_api`` module whose
+``launch()`` hands back a view of the shared browser.  Every context the
+scenario opens is a fresh, isolated ``BrowserContext`` on that browser, and
+closing the "browser" or stopping the "driver" only tears those contexts down.
+The shared browser itself is attached to the :mod:`harness.daemon` browser
+when one is running with the run's profile, and contexts may come
+pre-warmed from a :mod:`harness.pool` or start from a :mod:`harness.prefix`
+fork's storage state.
+Contexts are routed through :mod:`harness.network` with the scenario's policy
+and, when the scenario has one, to its :mod:`harness.isolation` clone.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from playwright import async_api
+
+from harness import isolation, launch, network, vitals, waits
+from harness.pool import ContextPool, Key
+
+
+class SharedBrowser:
+    """Owns the single Playwright driver and Chromium process of a run.
+
+    ``profile`` names a :mod:`harness.launch` profile; ``headless`` overrides
+    the profile's own setting when given.
+    """
+
+    def __init__(self, headless: bool | None = None, profile: str | None = None) -> None:
+        self.headless = headless
+        self.profile = launch.profile(profile)
+        self.assets = network.AssetCache()
+        # Set by the runner when contexts are pre-warmed (see harness.pool).
+        self.pool: ContextPool | None = None
+        self._playwright: async_api.Playwright | None = None
+        self._browser: async_api.Browser | None = None
+
+    async def __aenter__(self) -> "SharedBrowser":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        self.assets.load_sizes()
+        self._playwright = await async_api.async_playwright().start()
+        self._browser = await launch.browser(self._playwright, self.profile.name, self.headless)
+
+    async def stop(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        self.assets.save_sizes()
+
+    @property
+    def browser(self) -> async_api.Browser:
+        if self._browser is None:
+            raise RuntimeError("SharedBrowser has not been started")
+        return self._browser
+
+    async def new_context(
+        self,
+        policy: network.Policy | None = None,
+        ledger: network.NetworkLedger | None = None,
+        clone: str | None = None,
+        **options: Any,
+    ) -> async_api.BrowserContext:
+        context = await self.browser.new_context(**options)
+        # Track pages from their first request so waits see every Supabase call.
+        context.on("page", waits.track)
+        await vitals.install(context)
+        await network.install(
+            context,
+            policy or network.Policy(),
+            self.assets,
+            ledger if ledger is not None else network.NetworkLedger(),
+        )
+        if clone:
+            await isolation.install(context, clone)
+        return context
+
+    def lease(
+        self,
+        policy: network.Policy | None = None,
+        clone: str | None = None,
+        entry: str | None = None,
+        state: dict[str, Any] | None = None,
+    ) -> "ScenarioApi":
+        """Return an ``async_api`` stand-in bound to this browser.
+
+        ``entry`` is the URL the scenario opens first, for :attr:`pool`.
+        ``state`` replaces the storage state of every context it opens.
+        """
+        return ScenarioApi(self, policy or network.Policy(), clone, entry, state)
+
+
+class ScenarioApi:
+    """Replaces ``playwright.async_api`` inside one scenario module.
+
+    Anything other than ``async_playwright`` (``Error``, ``expect``, types)
+    resolves to the real module.
+    """
+
+    def __init__(
+        self,
+        shared: SharedBrowser,
+        policy: network.Policy,
+        clone: str | None = None,
+        entry: str | None = None,
+        state: dict[str, Any] | None = None,
+    ) -> None:
+        self._browser = _ScenarioBrowser(shared, policy, clone, entry, state)
+
+    @property
+    def network(self) -> network.NetworkLedger:
+        return self._browser.ledger
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(async_api, name)
+
+    def async_playwright(self) -> "_ScenarioPlaywright":
+        return _ScenarioPlaywright(self._browser)
+
+    async def release(self) -> None:
+        """Close whatever contexts the scenario left open."""
+        await self._browser.close()
+
+
+class _ScenarioPlaywright:
+    def __init__(self, browser: "_ScenarioBrowser") -> None:
+        self.chromium = _ScenarioBrowserType(browser)
+
+    async def start(self) -> "_ScenarioPlaywright":
+        return self
+
+    async def stop(self) -> None:
+        pass
+
+
+class _ScenarioBrowserType:
+    def __init__(self, browser: "_ScenarioBrowser") -> None:
+        self._browser = browser
+
+    async def launch(self, **_options: Any) -> "_ScenarioBrowser":
+        # The shared browser is already running with the run's launch profile;
+        # the scenario's own launch options do not apply to it.
+        return self._browser
+
+    async def connect(self, *_args: Any, **_options: Any) -> "_ScenarioBrowser":
+        # Likewise for a scenario attaching to the browser daemon.
+        return self._browser
+
+
+class _ScenarioBrowser:
+    def __init__(
+        self,
+        shared: SharedBrowser,
+        policy: network.Policy,
+        clone: str | None = None,
+        entry: str | None = None,
+        state: dict[str, Any] | None = None,
+    ) -> None:
+        self._shared = shared
+        self._policy = policy
+        self._clone = clone
+        self._entry = entry
+        self._state = state
+        self.ledger = network.NetworkLedger()
+        self._contexts: list[async_api.BrowserContext] = []
+
+    @property
+    def contexts(self) -> list[async_api.BrowserContext]:
+        return list(self._contexts)
+
+    async def new_context(self, **options: Any) -> async_api.BrowserContext:
+        if self._state is not None:
+            options["storage_state"] = self._state
+        pool = self._shared.pool
+        if pool is not None and self._entry and set(options) <= {"storage_state"}:
+            state = options.get("storage_state")
+            key: Key = (str(state) if state else None, self._policy, self._entry)
+            leased = await pool.lease(key, self.ledger, self._clone)
+            if leased is not None:
+                self._contexts.append(leased)
+                return leased
+        context = await self._shared.new_context(self._policy, self.ledger, self._clone, **options)
+        self._contexts.append(context)
+        return context
+
+    async def new_page(self, **options: Any) -> async_api.Page:
+        context = await self.new_context(**options)
+        return await context.new_page()
+
+    async def close(self) -> None:
+        contexts, self._contexts = self._contexts, []
+        for context in contexts:
+            try:
+                await context.close()
+            except async_api.Error:
+                pass
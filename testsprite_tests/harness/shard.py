@@ -0,0 +1,305 @@
+"""Sharding of the suite across worker processes, one Chromium per worker.
+
+Scenarios are assigned longest-processing-time first (Graham's LPT): sorted
+by expected duration, each goes to the shard with the least expected work so
+far, so the slow scenarios land on different workers.  Expected durations
+are the median of each scenario's last runs in the result store
+(:mod:`harness.results`), or, before the first recorded run, the
+``created``/``modified`` timestamps of the last TestSprite run in
+``tmp/test_results.json``; scenarios without an exact title match use the
+mean of their case id, then the median of the whole history.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import json
+import multiprocessing
+import os
+import queue
+import re
+import statistics
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping, Sequence
+
+from harness import auth
+from harness.runner import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_TIMEOUT,
+    FAILED,
+    MAIN,
+    QUARANTINE,
+    ResultCallback,
+    RetryPolicy,
+    ScenarioResult,
+    run_suite,
+)
+from harness.scenarios import SUITE_DIR, Scenario
+
+HISTORY_FILE = SUITE_DIR / "tmp" / "test_results.json"
+
+# Used when there is no history at all, in seconds.
+FALLBACK_DURATION = 60.0
+
+# How often the parent checks for workers that died without reporting.
+_POLL_INTERVAL = 0.5
+
+
+def _key(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", title.lower().replace("'", "")).strip("_")
+
+
+def _timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@dataclass
+class History:
+    """Observed durations by normalised title and by case id."""
+
+    by_title: dict[str, float] = field(default_factory=dict)
+    by_case: dict[str, list[float]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path = HISTORY_FILE) -> "History":
+        history = cls()
+        try:
+            entries = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return history
+        for entry in entries:
+            try:
+                duration = (
+                    _timestamp(entry["modified"]) - _timestamp(entry["created"])
+                ).total_seconds()
+            except (KeyError, TypeError, ValueError):
+                continue
+            title = entry.get("title", "")
+            history.by_title[_key(title)] = duration
+            case = re.match(r"^(TC\d+)", title)
+            if case:
+                history.by_case.setdefault(case.group(1), []).append(duration)
+        return history
+
+    @classmethod
+    def recent(cls, runs: int = 5) -> "History":
+        """Median of each scenario's last ``runs`` executions in the result store.
+
+        Falls back to :meth:`load` when the store is disabled or empty.
+        """
+        # Imported here: ``python -m harness.results`` would otherwise find
+        # the module already loaded through ``harness/__init__``.
+        from harness import results
+
+        path = results.results_file()
+        if path is None or not path.exists():
+            return cls.load()
+        with results.ResultStore(path) as store:
+            durations = store.last_durations(runs)
+        if not durations:
+            return cls.load()
+        history = cls()
+        for scenario, values in durations.items():
+            history.by_title[_key(scenario)] = statistics.median(values)
+            case = re.match(r"^(TC\d+)", scenario)
+            if case:
+                history.by_case.setdefault(case.group(1), []).extend(values)
+        return history
+
+    def estimate(self, scenario: Scenario) -> float:
+        # Variants ("TC003_...[coordinator]") are recorded under their own name.
+        for title in (scenario.name, scenario.path.stem):
+            if (duration := self.by_title.get(_key(title))) is not None:
+                return duration
+        if durations := self.by_case.get(scenario.case_id):
+            return statistics.fmean(durations)
+        if self.by_title:
+            return statistics.median(self.by_title.values())
+        return FALLBACK_DURATION
+
+
+@dataclass
+class Shard:
+    index: int
+    scenarios: list[Scenario] = field(default_factory=list)
+    expected: float = 0.0
+    lane: str = MAIN
+
+
+def plan(scenarios: Iterable[Scenario], workers: int, history: History) -> list[Shard]:
+    """Split ``scenarios`` into at most ``workers`` shards by LPT.
+
+    Each shard lists its scenarios longest first, so a worker running several
+    at once starts the slow ones early too.
+    """
+    estimates = {s: history.estimate(s) for s in scenarios}
+    ordered = sorted(estimates, key=lambda s: (-estimates[s], s.name))
+    shards = [Shard(i) for i in range(max(1, min(workers, len(ordered))))]
+    heap = [(0.0, shard.index) for shard in shards]
+    for scenario in ordered:
+        load, index = heapq.heappop(heap)
+        shards[index].scenarios.append(scenario)
+        shards[index].expected = load + estimates[scenario]
+        heapq.heappush(heap, (shards[index].expected, index))
+    return shards
+
+
+def _work(
+    shard: Shard,
+    concurrency: int,
+    headless: bool | None,
+    timeout: float,
+    profile: str | None,
+    retry: RetryPolicy | None,
+    environ: Mapping[str, str],
+    results: "multiprocessing.Queue[tuple[int, ScenarioResult | None]]",
+) -> None:
+    """Worker process body: run one shard and stream its results back."""
+    os.environ.update(environ)
+    # One Chromium per worker, not every worker on the browser daemon's.
+    os.environ["TESTSPRITE_DAEMON"] = "off"
+    reported: set[Scenario] = set()
+
+    def forward(result: ScenarioResult) -> None:
+        reported.add(result.scenario)
+        results.put((shard.index, result))
+
+    try:
+        asyncio.run(
+            run_suite(
+                shard.scenarios,
+                concurrency,
+                headless,
+                timeout,
+                forward,
+                profile,
+                retry=retry,
+                lane=shard.lane,
+            )
+        )
+    except Exception as exc:
+        error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        for scenario in shard.scenarios:
+            if scenario not in reported:
+                forward(_failed(scenario, f"Worker {shard.index} failed: {error}", shard.lane))
+    finally:
+        results.put((shard.index, None))
+
+
+@contextlib.contextmanager
+def _environ(overrides: Mapping[str, str]) -> Iterator[None]:
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _failed(scenario: Scenario, error: str, lane: str = MAIN) -> ScenarioResult:
+    return ScenarioResult(scenario, FAILED, time.time(), 0.0, error, lane=lane)
+
+
+def run_sharded(
+    scenarios: Iterable[Scenario],
+    workers: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    headless: bool | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    on_result: ResultCallback | None = None,
+    profile: str | None = None,
+    history: History | None = None,
+    on_plan: Callable[[list[Shard]], None] | None = None,
+    retry: RetryPolicy | None = None,
+    quarantine: Iterable[Scenario] = (),
+    environs: Sequence[Mapping[str, str]] = (),
+) -> list[ScenarioResult]:
+    """Run ``scenarios`` over ``workers`` processes, ``concurrency`` at a time each.
+
+    Roles are signed in once here so workers start from cached storage
+    states, which hold the session for every shard's origins.  ``retry`` is
+    split evenly between the workers.  ``quarantine`` scenarios run one at a
+    time in an extra process, beside the others, with results in the
+    quarantine lane.  Shard ``i`` runs with ``environs[i]`` added to its
+    environment (its app origins, see :mod:`harness.apps`).  Results are
+    returned in input order (``scenarios``, then ``quarantine``);
+    ``on_result`` is called in this process as each scenario finishes.
+    """
+    scenarios, quarantine = list(scenarios), list(quarantine)
+    shards = plan(scenarios, workers, history or History.recent()) if scenarios else []
+    if quarantine:
+        shards.append(Shard(len(shards), quarantine, lane=QUARANTINE))
+    if on_plan:
+        on_plan(shards)
+
+    roles = {s.role for s in scenarios + quarantine if s.role}
+    for environ in environs or [{}]:
+        with _environ(environ):
+            asyncio.run(auth.cache.warm(roles))
+    share = retry.share(len(shards) - bool(quarantine)) if retry is not None else None
+
+    context = multiprocessing.get_context("spawn")
+    results: multiprocessing.Queue = context.Queue()
+    by_index = {shard.index: shard for shard in shards}
+    processes = {
+        shard.index: context.Process(
+            target=_work,
+            args=(
+                shard,
+                1 if shard.lane == QUARANTINE else concurrency,
+                headless,
+                timeout,
+                profile,
+                share if shard.lane == MAIN else None,
+                environs[shard.index] if shard.index < len(environs) else {},
+                results,
+            ),
+            name=f"testsprite-shard-{shard.index}",
+        )
+        for shard in shards
+    }
+    for process in processes.values():
+        process.start()
+
+    collected: dict[Scenario, ScenarioResult] = {}
+    running = set(processes)
+
+    def record(result: ScenarioResult) -> None:
+        collected[result.scenario] = result
+        if on_result:
+            on_result(result)
+
+    try:
+        while running:
+            try:
+                index, result = results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                for index in list(running):
+                    process = processes[index]
+                    if not process.is_alive() and results.empty():
+                        running.discard(index)
+                        for scenario in by_index[index].scenarios:
+                            if scenario not in collected:
+                                error = f"Worker {index} exited with code {process.exitcode}"
+                                record(_failed(scenario, error, by_index[index].lane))
+                continue
+            if result is None:
+                running.discard(index)
+            else:
+                record(result)
+    finally:
+        for process in processes.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    return [collected[s] for s in scenarios + quarantine]
@@ -0,0 +1,17 @@
+"""Local, in-memory stand-in for the project's Supabase API.
+
+Serves the GoTrue (``/auth/v1``), PostgREST (``/rest/v1``) and Realtime
+(``/realtime/v1/websocket``) endpoints the apps and the harness use, with
+tables recovered from ``supabase/migrations`` and seeded with one user per
+role, so scenarios can run without network access::
+
+    with StandIn(port=54321) as standin:
+        os.environ.update(standin.environ())
+        ...
+
+Row level security, storage and edge functions are not emulated.
+"""
+
+from harness.standin.server import DEFAULT_PORT, StandIn
+
+__all__ = ["DEFAULT_PORT", "StandIn"]
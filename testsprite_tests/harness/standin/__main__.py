@@ -0,0 +1,53 @@
+"""``python -m harness.standin``: serve the stand-in until interrupted."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from harness import synthetic
+from harness.standin.seed import TENANT_NAME, stable_id
+from harness.standin.server import DEFAULT_HOST, DEFAULT_PORT, StandIn
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.standin",
+        description="Serve a local, in-memory Supabase stand-in for the TestSprite scenarios.",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seed", type=Path, help="JSON file of extra rows, {table: [row, ...]}")
+    parser.add_argument(
+        "--synthetic",
+        choices=list(synthetic.SCALES),
+        help="also load generated networks; the first is the seeded tenant (harness.synthetic)",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    standin = StandIn(args.host, args.port, seed_file=args.seed, verbose=args.verbose)
+    if args.synthetic:
+        config = synthetic.config_for(
+            args.synthetic,
+            first_tenant=stable_id("tenant", TENANT_NAME),
+            author=stable_id("user", "superadmin"),
+        )
+        stats = synthetic.Generator(config).run(synthetic.StoreSink(standin.store))
+        print(f"Loaded {stats.total:,} synthetic rows in {stats.seconds:.1f}s")
+    standin.start()
+    print(f"Supabase stand-in listening on {standin.url}")
+    for name, value in standin.environ().items():
+        print(f"{name}={value}")
+    try:
+        standin.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""The subset of GoTrue that supabase-js and ``harness.auth`` use.
+
+Tokens are HS256 JWTs signed with :data:`JWT_SECRET` (the Supabase CLI's
+local default), so the stand-in's anon key has the same shape as a real
+project's.  Sign-up auto-confirms; no e-mail is ever sent.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+from harness.standin.store import now_iso
+
+JWT_SECRET = "super-secret-jwt-token-with-at-least-32-characters-long"
+ACCESS_TOKEN_TTL = 3600
+
+Response = tuple[int, dict[str, str], bytes]
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def encode_jwt(claims: Mapping[str, Any], secret: str = JWT_SECRET) -> str:
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    payload = _b64(json.dumps(dict(claims), separators=(",", ":")).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256)
+    return f"{header}.{payload}.{_b64(signature.digest())}"
+
+
+def decode_jwt(token: str, secret: str = JWT_SECRET) -> dict[str, Any] | None:
+    """Verified, unexpired claims of ``token``, or ``None``."""
+    try:
+        header, payload, signature = token.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256)
+        if not hmac.compare_digest(_b64(expected.digest()), signature):
+            return None
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError:
+        return None
+    if claims.get("exp") and claims["exp"] < time.time():
+        return None
+    return claims
+
+
+def anon_key(secret: str = JWT_SECRET) -> str:
+    return encode_jwt({"iss": "supabase-demo", "role": "anon", "exp": 1983812996}, secret)
+
+
+@dataclass
+class User:
+    id: str
+    email: str
+    password: str
+    user_metadata: dict[str, Any] = field(default_factory=dict)
+    created_at: str = field(default_factory=now_iso)
+    last_sign_in_at: str | None = None
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": self.email,
+            "email_confirmed_at": self.created_at,
+            "phone": "",
+            "confirmed_at": self.created_at,
+            "last_sign_in_at": self.last_sign_in_at,
+            "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": self.user_metadata,
+            "identities": [
+                {
+                    "id": self.id,
+                    "user_id": self.id,
+                    "identity_data": {"email": self.email, "sub": self.id},
+                    "provider": "email",
+                    "created_at": self.created_at,
+                }
+            ],
+            "created_at": self.created_at,
+            "updated_at": self.created_at,
+        }
+
+
+def _error(status: int, code: str, message: str) -> Response:
+    body = {"code": status, "error_code": code, "msg": message}
+    return status, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+def _ok(payload: Any, status: int = 200) -> Response:
+    return status, {"Content-Type": "application/json"}, json.dumps(payload).encode()
+
+
+class GoTrue:
+    def __init__(self, secret: str = JWT_SECRET) -> None:
+        self.secret = secret
+        self._users: dict[str, User] = {}
+        self._refresh_tokens: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add_user(
+        self,
+        email: str,
+        password: str,
+        user_id: str | None = None,
+        user_metadata: Mapping[str, Any] | None = None,
+    ) -> User:
+        metadata = dict(user_metadata or {})
+        user = User(user_id or str(uuid.uuid4()), email.lower(), password, metadata)
+        with self._lock:
+            self._users[user.id] = user
+        return user
+
+    def users(self) -> list[User]:
+        return list(self._users.values())
+
+    def by_email(self, email: str) -> User | None:
+        email = email.lower()
+        return next((u for u in self._users.values() if u.email == email), None)
+
+    def claims(self, authorization: str | None) -> dict[str, Any] | None:
+        if not authorization or not authorization.lower().startswith("bearer "):
+            return None
+        return decode_jwt(authorization[7:].strip(), self.secret)
+
+    def session(self, user: User) -> dict[str, Any]:
+        now = int(time.time())
+        user.last_sign_in_at = now_iso()
+        session_id = str(uuid.uuid4())
+        access_token = encode_jwt(
+            {
+                "aud": "authenticated",
+                "exp": now + ACCESS_TOKEN_TTL,
+                "iat": now,
+                "iss": "http://127.0.0.1/auth/v1",
+                "sub": user.id,
+                "email": user.email,
+                "role": "authenticated",
+                "aal": "aal1",
+                "session_id": session_id,
+                "app_metadata": {"provider": "email", "providers": ["email"]},
+                "user_metadata": user.user_metadata,
+            },
+            self.secret,
+        )
+        refresh_token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._refresh_tokens[refresh_token] = user.id
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_TTL,
+            "expires_at": now + ACCESS_TOKEN_TTL,
+            "refresh_token": refresh_token,
+            "user": user.to_json(),
+        }
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        params: Mapping[str, str],
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> Response:
+        """Serve ``/auth/v1/<path>``; ``headers`` keys are lower-case."""
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return _error(400, "bad_json", "Could not parse request body as JSON")
+        claims = self.claims(headers.get("authorization"))
+        user = self._users.get(claims["sub"]) if claims and claims.get("sub") else None
+
+        if path == "token" and method == "POST":
+            return self._token(params.get("grant_type", ""), payload)
+        if path == "signup" and method == "POST":
+            if self.by_email(payload.get("email", "")):
+                return _error(422, "user_already_exists", "User already registered")
+            created = self.add_user(
+                payload.get("email", ""),
+                payload.get("password", ""),
+                user_metadata=payload.get("data"),
+            )
+            return _ok(self.session(created))
+        if path == "user":
+            if user is None:
+                return _error(401, "no_authorization", "This endpoint requires a Bearer token")
+            if method == "PUT":
+                if payload.get("password"):
+                    user.password = payload["password"]
+                user.user_metadata.update(payload.get("data") or {})
+            return _ok(user.to_json())
+        if path == "logout" and method == "POST":
+            return 204, {}, b""
+        if path in ("recover", "otp", "magiclink") and method == "POST":
+            return _ok({})
+        if path == "settings":
+            return _ok(
+                {
+                    "external": {"email": True},
+                    "disable_signup": False,
+                    "mailer_autoconfirm": True,
+                    "phone_autoconfirm": False,
+                }
+            )
+        if path == "health":
+            return _ok({"version": "stand-in", "name": "GoTrue"})
+        if path == "admin/users" and method == "GET":
+            return _ok({"users": [u.to_json() for u in self.users()], "aud": "authenticated"})
+        if path == "admin/users" and method == "POST":
+            created = self.add_user(
+                payload.get("email", ""),
+                payload.get("password", ""),
+                user_metadata=payload.get("user_metadata"),
+            )
+            return _ok(created.to_json())
+        return _error(404, "not_found", f"Unsupported auth endpoint: {method} /auth/v1/{path}")
+
+    def _token(self, grant_type: str, payload: Mapping[str, Any]) -> Response:
+        if grant_type == "password":
+            user = self.by_email(payload.get("email", ""))
+            if user is None or user.password != payload.get("password"):
+                return _error(400, "invalid_credentials", "Invalid login credentials")
+            return _ok(self.session(user))
+        if grant_type == "refresh_token":
+            # Tokens are not rotated out: every browser context started from
+            # the same cached storage state may refresh with the same token.
+            user_id = self._refresh_tokens.get(payload.get("refresh_token", ""))
+            if user_id is None or user_id not in self._users:
+                return _error(400, "refresh_token_not_found", "Invalid Refresh Token: Not Found")
+            return _ok(self.session(self._users[user_id]))
+        return _error(400, "unsupported_grant_type", f"Unsupported grant type: {grant_type}")
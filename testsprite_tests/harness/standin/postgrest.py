@@ -0,0 +1,571 @@
+"""The subset of PostgREST that supabase-js issues against ``/rest/v1``.
+
+Supported: ``select`` with aliases, casts and resource embedding (to-one and
+to-many, ``!hint`` and ``!inner``), horizontal filters including ``not.``,
+``or=``/``and=`` and filters on embedded resources, ``order``, ``limit``,
+``offset`` and ``Range``, ``Prefer: return=``/``count=``/``resolution=``,
+single-object responses, CSV, and ``/rpc/<function>``.  Row level security
+is not emulated: every request sees every row.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+
+from harness.standin.schema import Table
+from harness.standin.store import Predicate, Row, Store, StoreError
+
+Response = tuple[int, dict[str, str], bytes]
+RpcHandler = Callable[[Store, Mapping[str, Any], "Mapping[str, Any] | None"], Any]
+
+SINGLE_OBJECT = "application/vnd.pgrst.object+json"
+_RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+_OPERATORS = set(
+    "eq neq gt gte lt lte like ilike match imatch is in cs cd ov fts plfts phfts wfts".split()
+)
+
+
+@dataclass
+class Embed:
+    alias: str
+    table: str
+    hint: str | None = None
+    inner: bool = False
+    fields: list["Field"] = field(default_factory=list)
+
+
+@dataclass
+class Field:
+    name: str
+    alias: str | None = None
+    embed: Embed | None = None
+
+
+# -- select ------------------------------------------------------------------
+
+
+def parse_select(text: str | None) -> list[Field]:
+    text = (text or "*").replace(" ", "").replace("\n", "")
+    return [_parse_field(item) for item in _split(text) if item]
+
+
+def _parse_field(item: str) -> Field:
+    alias = None
+    head = item.split("(", 1)[0]
+    if ":" in head and "::" not in head:
+        alias, item = item.split(":", 1)
+        head = item.split("(", 1)[0]
+    if "(" in item and item.endswith(")"):
+        target, _, rest = item.partition("(")
+        table, *modifiers = target.split("!")
+        embed = Embed(alias or table, table)
+        for modifier in modifiers:
+            if modifier == "inner":
+                embed.inner = True
+            elif modifier != "left":
+                embed.hint = modifier
+        embed.fields = parse_select(rest[:-1])
+        return Field(table, embed.alias, embed)
+    name = item.split("::", 1)[0]
+    if "->" in name:
+        name = re.split(r"->>?", name)[0]
+    return Field(name, alias)
+
+
+def _split(text: str, separator: str = ",") -> list[str]:
+    items, depth, current, quoted = [], 0, [], False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == separator and depth == 0:
+            items.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    items.append("".join(current))
+    return items
+
+
+# -- filters -----------------------------------------------------------------
+
+
+def _coerce(value: Any, literal: str) -> Any:
+    if isinstance(value, bool):
+        return literal.lower() in ("true", "t", "1")
+    if isinstance(value, (int, float)):
+        try:
+            return float(literal)
+        except ValueError:
+            return literal
+    return literal
+
+
+def _as_list(literal: str) -> list[str]:
+    literal = literal.strip()
+    if literal[:1] in "({" and literal[-1:] in ")}":
+        literal = literal[1:-1]
+    return [item.strip().strip('"') for item in _split(literal) if item.strip()]
+
+
+def _like(pattern: str, flags: int = 0) -> re.Pattern[str]:
+    body = re.escape(pattern).replace(r"\*", ".*").replace("%", ".*").replace("_", ".")
+    return re.compile(f"^{body}$", flags | re.S)
+
+
+def _compare(value: Any, operator: str, literal: str) -> bool:
+    if operator == "is":
+        lowered = literal.lower()
+        if lowered == "null":
+            return value is None
+        if lowered in ("true", "false"):
+            return value is (lowered == "true")
+        return value is None if lowered == "unknown" else False
+    if operator == "in":
+        candidates = _as_list(literal)
+        return value is not None and any(_coerce(value, c) == _as_value(value) for c in candidates)
+    if value is None:
+        return False
+    if operator in ("cs", "cd", "ov"):
+        if isinstance(value, dict):
+            try:
+                wanted = json.loads(literal)
+            except ValueError:
+                return False
+            if operator == "cs":
+                pairs, other = wanted, value
+            else:
+                pairs, other = value, wanted
+            return isinstance(other, dict) and all(other.get(k) == v for k, v in pairs.items())
+        have = {str(v) for v in (value if isinstance(value, list) else [value])}
+        wanted = set(_as_list(literal))
+        if operator == "cs":
+            return wanted <= have
+        if operator == "cd":
+            return have <= wanted
+        return bool(have & wanted)
+    if operator in ("like", "ilike"):
+        return bool(_like(literal, re.I if operator == "ilike" else 0).match(str(value)))
+    if operator in ("match", "imatch"):
+        return bool(re.search(literal, str(value), re.I if operator == "imatch" else 0))
+    if operator.endswith("fts"):
+        words = re.sub(r"[&|!():*']", " ", literal).split()
+        return all(word.lower() in str(value).lower() for word in words)
+    target = _coerce(value, literal)
+    current = _as_value(value)
+    try:
+        return {
+            "eq": current == target,
+            "neq": current != target,
+            "gt": current > target,
+            "gte": current >= target,
+            "lt": current < target,
+            "lte": current <= target,
+        }[operator]
+    except TypeError:
+        return False
+
+
+def _as_value(value: Any) -> Any:
+    if isinstance(value, bool) or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return json.dumps(value)
+
+
+def condition(column: str, expression: str) -> Predicate:
+    """Predicate for one ``column=op.value`` filter, ``not.`` included."""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    operator, _, literal = expression.partition(".")
+    if operator.startswith(("fts(", "plfts(", "phfts(", "wfts(")):
+        operator = operator.split("(", 1)[0]
+    if operator not in _OPERATORS:
+        raise StoreError(400, "PGRST100", f'"failed to parse filter ({expression})"')
+    path = column.split("->")[0].strip('"')
+
+    def predicate(row: Row) -> bool:
+        return _compare(row.get(path), operator, literal) != negate
+
+    return predicate
+
+
+def _logic(expression: str, conjunction: bool, negate: bool = False) -> Predicate:
+    """``or=(a.eq.1,b.gt.2)`` style trees, nested ``and(...)``/``or(...)`` included."""
+    body = expression.strip()
+    if body.startswith("(") and body.endswith(")"):
+        body = body[1:-1]
+    parts: list[Predicate] = []
+    for item in _split(body):
+        item = item.strip()
+        if not item:
+            continue
+        match = re.match(r"^(not\.)?(and|or)(\(.*\))$", item, re.S)
+        if match:
+            parts.append(_logic(match[3], match[2] == "and", bool(match[1])))
+            continue
+        column, _, rest = item.partition(".")
+        parts.append(condition(column, rest))
+    combine = all if conjunction else any
+
+    def predicate(row: Row) -> bool:
+        return combine(part(row) for part in parts) != negate
+
+    return predicate
+
+
+@dataclass
+class Query:
+    """Filters, ordering and paging for one resource, plus its embeds' queries."""
+
+    predicates: list[Predicate] = field(default_factory=list)
+    order: list[tuple[str, bool, bool]] = field(default_factory=list)
+    limit: int | None = None
+    offset: int = 0
+    nested: dict[str, "Query"] = field(default_factory=dict)
+
+    def at(self, path: list[str]) -> "Query":
+        query = self
+        for part in path:
+            query = query.nested.setdefault(part, Query())
+        return query
+
+    def matches(self, row: Row) -> bool:
+        return all(predicate(row) for predicate in self.predicates)
+
+    def arrange(self, rows: list[Row]) -> list[Row]:
+        for column, descending, nulls_first in reversed(self.order):
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: _sort_key(r.get(column)), reverse=descending)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def page(self, rows: list[Row]) -> list[Row]:
+        end = None if self.limit is None else self.offset + self.limit
+        return rows[self.offset : end]
+
+
+def _sort_key(value: Any) -> tuple[int, Any]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    return (1, json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else str(value))
+
+
+def parse_query(params: list[tuple[str, str]]) -> Query:
+    query = Query()
+    for key, value in params:
+        negate = key.startswith("not.")
+        *path, name = key.removeprefix("not.").split(".")
+        target = query.at(path)
+        if name in ("or", "and"):
+            target.predicates.append(_logic(value, name == "and", negate))
+        elif name == "order":
+            target.order = [_order_term(term) for term in _split(value) if term]
+        elif name == "limit":
+            target.limit = int(value)
+        elif name == "offset":
+            target.offset = int(value)
+        elif not path and key in _RESERVED:
+            continue
+        else:
+            target.predicates.append(condition(name, value))
+    return query
+
+
+def _order_term(term: str) -> tuple[str, bool, bool]:
+    column, *modifiers = term.split(".")
+    descending = "desc" in modifiers
+    nulls_first = "nullsfirst" in modifiers or (descending and "nullslast" not in modifiers)
+    return column.split("->")[0].strip('"'), descending, nulls_first
+
+
+# -- embedding -----------------------------------------------------------------
+
+
+def _singular(name: str) -> str:
+    for plural, single in (("ies", "y"), ("ses", "s"), ("s", "")):
+        if name.endswith(plural):
+            return name[: -len(plural)] + single
+    return name
+
+
+class _Relations:
+    """How rows of one table embed rows of another."""
+
+    def __init__(self, store: Store) -> None:
+        self.store = store
+
+    def resolve(self, parent: Table, embed: Embed) -> tuple[str, str, str]:
+        """``(kind, local column, remote column)``; kind is ``one`` or ``many``."""
+        child = self.store.table(embed.table)
+        hint = embed.hint
+        outgoing = [c for c, t in parent.foreign_keys().items() if t == child.name]
+        incoming = [c for c, t in child.foreign_keys().items() if t == parent.name]
+        if hint:
+            if hint in parent.columns:
+                reference = parent.columns[hint].references
+                return "one", hint, reference[1] if reference else "id"
+            if hint in child.columns:
+                return "many", "id", hint
+            outgoing = [c for c in outgoing if c in hint] or outgoing
+            incoming = [c for c in incoming if c in hint] or incoming
+        if outgoing:
+            return "one", outgoing[0], parent.columns[outgoing[0]].references[1]
+        if incoming:
+            return "many", child.columns[incoming[0]].references[1], incoming[0]
+        guess = f"{_singular(child.name)}_id"
+        if guess in parent.columns or (parent.view and not parent.columns):
+            return "one", guess, "id"
+        guess = f"{_singular(parent.name)}_id"
+        if guess in child.columns or (child.view and not child.columns):
+            return "many", "id", guess
+        raise StoreError(
+            400,
+            "PGRST200",
+            f"Could not find a relationship between '{parent.name}' and '{child.name}' "
+            "in the schema cache",
+        )
+
+
+def _project(
+    store: Store,
+    relations: _Relations,
+    table: Table,
+    fields: list[Field],
+    query: Query,
+    rows: list[Row],
+) -> list[Row]:
+    """Apply ``fields`` to ``rows``, resolving embeds; drops rows failing ``!inner``."""
+    embeds = [f for f in fields if f.embed]
+    plan = [(f, relations.resolve(table, f.embed)) for f in embeds]
+    indexes: dict[tuple[str, str], dict[Any, list[Row]]] = {}
+    for f, (_, _, remote) in plan:
+        key = (f.embed.table, remote)
+        if key not in indexes:
+            index: dict[Any, list[Row]] = {}
+            for candidate in store.rows(f.embed.table):
+                index.setdefault(candidate.get(remote), []).append(candidate)
+            indexes[key] = index
+    result = []
+    for row in rows:
+        out: Row = {}
+        keep = True
+        for f in fields:
+            if f.embed is None:
+                if f.name == "*":
+                    out.update(row)
+                elif f.name in row or not table.columns:
+                    out[f.alias or f.name] = row.get(f.name)
+                else:
+                    raise StoreError(
+                        400,
+                        "42703",
+                        f"column {table.name}.{f.name} does not exist",
+                    )
+        for f, (kind, local, remote) in plan:
+            embed = f.embed
+            nested = query.nested.get(embed.alias) or query.nested.get(embed.table) or Query()
+            child = store.table(embed.table)
+            candidates = indexes[(embed.table, remote)].get(row.get(local), [])
+            candidates = [c for c in candidates if nested.matches(c)]
+            candidates = _project(store, relations, child, embed.fields, nested, candidates)
+            if kind == "one":
+                value = candidates[0] if candidates else None
+                keep = keep and not (embed.inner and value is None)
+            else:
+                value = nested.page(nested.arrange(candidates))
+                keep = keep and not (embed.inner and not value)
+            out[embed.alias] = value
+        if keep:
+            result.append(out)
+    return result
+
+
+# -- request handling ----------------------------------------------------------
+
+
+def _prefer(headers: Mapping[str, str]) -> dict[str, str]:
+    prefer: dict[str, str] = {}
+    for token in headers.get("prefer", "").split(","):
+        key, _, value = token.strip().partition("=")
+        if key:
+            prefer[key] = value
+    return prefer
+
+
+def _range(headers: Mapping[str, str]) -> tuple[int, int | None] | None:
+    match = re.match(r"^\s*(\d+)-(\d*)\s*$", headers.get("range", ""))
+    if not match:
+        return None
+    return int(match[1]), int(match[2]) if match[2] else None
+
+
+def _json(status: int, payload: Any, extra: Mapping[str, str] | None = None) -> Response:
+    headers = {"Content-Type": "application/json; charset=utf-8", **(extra or {})}
+    return status, headers, json.dumps(payload, default=str).encode()
+
+
+def _csv(rows: list[Row]) -> bytes:
+    if not rows:
+        return b""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(
+            {k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in row.items()}
+        )
+    return buffer.getvalue().encode()
+
+
+class PostgREST:
+    def __init__(self, store: Store, rpc: Mapping[str, RpcHandler] | None = None) -> None:
+        self.store = store
+        self.rpc = dict(rpc or {})
+        self._relations = _Relations(store)
+
+    def handle(
+        self,
+        method: str,
+        resource: str,
+        params: list[tuple[str, str]],
+        headers: Mapping[str, str],
+        body: bytes,
+        claims: Mapping[str, Any] | None = None,
+    ) -> Response:
+        """Serve ``/rest/v1/<resource>``; ``headers`` keys are lower-case."""
+        try:
+            if resource.startswith("rpc/"):
+                return self._call(resource[4:], method, params, headers, body, claims)
+            return self._resource(method, resource, params, headers, body)
+        except StoreError as exc:
+            return _json(exc.status, exc.to_json())
+        except (ValueError, KeyError) as exc:
+            return _json(400, StoreError(400, "PGRST100", str(exc)).to_json())
+
+    def _resource(
+        self,
+        method: str,
+        name: str,
+        params: list[tuple[str, str]],
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> Response:
+        table = self.store.table(name)
+        query = parse_query(params)
+        fields = parse_select(dict(params).get("select"))
+        prefer = _prefer(headers)
+        if method in ("GET", "HEAD"):
+            rows = [row for row in self.store.rows(name) if query.matches(row)]
+            rows = _project(self.store, self._relations, table, fields, query, rows)
+            rows = query.arrange(rows)
+            total = len(rows)
+            if (window := _range(headers)) is not None:
+                start, end = window
+                query.offset = start
+                query.limit = None if end is None else end - start + 1
+            rows = query.page(rows)
+            return self._rows(rows, headers, prefer, total, query.offset, method == "HEAD")
+
+        payload = json.loads(body or b"null")
+        if method == "POST":
+            values = payload if isinstance(payload, list) else [payload]
+            on_conflict = dict(params).get("on_conflict")
+            resolution = prefer.get("resolution", "")
+            changed = self.store.insert(
+                name,
+                values,
+                upsert=resolution == "merge-duplicates",
+                ignore_duplicates=resolution == "ignore-duplicates",
+                on_conflict=on_conflict.split(",") if on_conflict else None,
+            )
+            status = 201
+        elif method == "PATCH":
+            changed = self.store.update(name, query.matches, payload or {})
+            status = 200
+        elif method == "DELETE":
+            changed = self.store.delete(name, query.matches)
+            status = 200
+        else:
+            error = StoreError(405, "PGRST117", f"Unsupported HTTP method: {method}")
+            return _json(405, error.to_json())
+        if prefer.get("return") != "representation":
+            extra = {"Content-Range": f"*/{len(changed)}"} if "count" in prefer else {}
+            return 201 if method == "POST" else 204, extra, b""
+        rows = _project(self.store, self._relations, table, fields, query, changed)
+        return self._rows(rows, headers, prefer, len(rows), 0, False, status)
+
+    def _rows(
+        self,
+        rows: list[Row],
+        headers: Mapping[str, str],
+        prefer: Mapping[str, str],
+        total: int,
+        offset: int,
+        head: bool,
+        status: int = 200,
+    ) -> Response:
+        counted = str(total) if prefer.get("count") else "*"
+        span = f"{offset}-{offset + len(rows) - 1}" if rows else "*"
+        extra = {"Content-Range": f"{span}/{counted}"}
+        accept = headers.get("accept", "")
+        if SINGLE_OBJECT in accept:
+            if len(rows) != 1:
+                return _json(
+                    406,
+                    {
+                        "code": "PGRST116",
+                        "message": "JSON object requested, multiple (or no) rows returned",
+                        "details": f"The result contains {len(rows)} rows",
+                        "hint": None,
+                    },
+                )
+            status, out, content = _json(status, rows[0], extra)
+        elif "text/csv" in accept:
+            status, out, content = status, {"Content-Type": "text/csv", **extra}, _csv(rows)
+        else:
+            status, out, content = _json(status, rows, extra)
+        return status, out, b"" if head else content
+
+    def _call(
+        self,
+        function: str,
+        method: str,
+        params: list[tuple[str, str]],
+        headers: Mapping[str, str],
+        body: bytes,
+        claims: Mapping[str, Any] | None,
+    ) -> Response:
+        if method in ("GET", "HEAD"):
+            args: dict[str, Any] = {k: v for k, v in params if k not in _RESERVED}
+            params = [(k, v) for k, v in params if k in _RESERVED]
+        else:
+            args = json.loads(body or b"{}") or {}
+        handler = self.rpc.get(function)
+        definition = self.store.schema.functions.get(function)
+        if handler is None and definition is None:
+            raise StoreError(
+                404,
+                "PGRST202",
+                f"Could not find the function public.{function} in the schema cache",
+            )
+        if handler is not None:
+            result = handler(self.store, args, claims)
+        else:
+            result = [] if definition.returns_set else None
+        if isinstance(result, list):
+            query = parse_query(params)
+            rows = query.page(query.arrange([r for r in result if query.matches(r)]))
+            return self._rows(rows, headers, _prefer(headers), len(result), query.offset, False)
+        return _json(200, result)
@@ -0,0 +1,284 @@
+"""Supabase Realtime over a stdlib WebSocket.
+
+Speaks the Phoenix channel protocol realtime-js uses (``vsn=1.0.0`` JSON
+objects and ``vsn=2.0.0`` JSON arrays): heartbeats, ``phx_join`` with
+``postgres_changes`` bindings, ``phx_leave``, broadcast relay and presence
+acknowledgements.  ``postgres_changes`` events are published from
+:class:`~harness.standin.store.Store` writes, with ``filter`` honoured for
+the ``column=op.value`` form.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO
+
+from harness.standin.postgrest import condition
+from harness.standin.store import Predicate, Row, Store, now_iso
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+_TEXT, _BINARY, _CLOSE, _PING, _PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+def accept_key(key: str) -> str:
+    """``Sec-WebSocket-Accept`` for a client's ``Sec-WebSocket-Key``."""
+    return base64.b64encode(hashlib.sha1((key + _GUID).encode()).digest()).decode()
+
+
+def read_frame(stream: BinaryIO) -> tuple[int, bytes] | None:
+    """Next ``(opcode, payload)``; continuation frames are joined."""
+    opcode, chunks = None, []
+    while True:
+        head = stream.read(2)
+        if len(head) < 2:
+            return None
+        fin, code = head[0] & 0x80, head[0] & 0x0F
+        masked, length = head[1] & 0x80, head[1] & 0x7F
+        if length == 126:
+            (length,) = struct.unpack("!H", stream.read(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", stream.read(8))
+        mask = stream.read(4) if masked else b""
+        data = stream.read(length)
+        if masked:
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+        if code >= 0x8:
+            return code, data
+        opcode = code if opcode is None else opcode
+        chunks.append(data)
+        if fin:
+            return opcode, b"".join(chunks)
+
+
+def encode_frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+@dataclass
+class _Binding:
+    id: int
+    event: str
+    schema: str
+    table: str | None
+    filter: str | None
+    predicate: Predicate | None
+
+    def wants(self, table: str, kind: str, row: Row) -> bool:
+        if self.schema not in ("public", "*") or self.table not in (None, "*", table):
+            return False
+        if self.event not in ("*", kind):
+            return False
+        return self.predicate is None or self.predicate(row)
+
+
+@dataclass
+class _Channel:
+    topic: str
+    join_ref: str | None
+    bindings: list[_Binding] = field(default_factory=list)
+    broadcast_self: bool = False
+
+
+class _Connection:
+    def __init__(self, hub: "Realtime", stream: BinaryIO, wfile: BinaryIO, vsn: str) -> None:
+        self.hub = hub
+        self.stream = stream
+        self.wfile = wfile
+        self.arrays = vsn.startswith("2")
+        self.channels: dict[str, _Channel] = {}
+        self._write = threading.Lock()
+
+    def send(
+        self,
+        topic: str,
+        event: str,
+        payload: Any,
+        ref: str | None = None,
+        join_ref: str | None = None,
+    ) -> None:
+        if self.arrays:
+            message: Any = [join_ref, ref, topic, event, payload]
+        else:
+            message = {"topic": topic, "event": event, "payload": payload, "ref": ref}
+            if join_ref is not None:
+                message["join_ref"] = join_ref
+        frame = encode_frame(_TEXT, json.dumps(message, default=str).encode())
+        with self._write:
+            self.wfile.write(frame)
+            self.wfile.flush()
+
+    def reply(self, message: dict[str, Any], response: Any = None) -> None:
+        self.send(
+            message["topic"],
+            "phx_reply",
+            {"status": "ok", "response": response or {}},
+            message.get("ref"),
+            message.get("join_ref"),
+        )
+
+    def serve(self) -> None:
+        while True:
+            frame = read_frame(self.stream)
+            if frame is None:
+                return
+            opcode, data = frame
+            if opcode == _CLOSE:
+                with self._write:
+                    self.wfile.write(encode_frame(_CLOSE, data[:2]))
+                    self.wfile.flush()
+                return
+            if opcode == _PING:
+                with self._write:
+                    self.wfile.write(encode_frame(_PONG, data))
+                    self.wfile.flush()
+                continue
+            if opcode != _TEXT:
+                continue
+            decoded = json.loads(data)
+            if isinstance(decoded, list):
+                join_ref, ref, topic, event, payload = decoded
+                decoded = {
+                    "join_ref": join_ref,
+                    "ref": ref,
+                    "topic": topic,
+                    "event": event,
+                    "payload": payload,
+                }
+            self.dispatch(decoded)
+
+    def dispatch(self, message: dict[str, Any]) -> None:
+        topic, event = message.get("topic"), message.get("event")
+        payload = message.get("payload") or {}
+        if event == "phx_join":
+            self.reply(message, {"postgres_changes": self.join(message, payload)})
+            status = {
+                "channel": topic.removeprefix("realtime:"),
+                "extension": "postgres_changes",
+                "message": "Subscribed to PostgreSQL",
+                "status": "ok",
+            }
+            self.send(topic, "system", status, None, message.get("join_ref"))
+        elif event == "phx_leave":
+            self.channels.pop(topic, None)
+            self.reply(message)
+        elif event == "broadcast":
+            self.hub.broadcast(self, topic, payload)
+            self.reply(message)
+        else:
+            # heartbeat, access_token, presence and anything unknown.
+            self.reply(message)
+
+    def join(self, message: dict[str, Any], payload: dict[str, Any]) -> list[dict[str, Any]]:
+        config = payload.get("config") or {}
+        channel = _Channel(
+            message["topic"],
+            message.get("join_ref") or message.get("ref"),
+            broadcast_self=bool((config.get("broadcast") or {}).get("self")),
+        )
+        response = []
+        for spec in config.get("postgres_changes") or []:
+            binding_id = self.hub.next_id()
+            predicate = None
+            if spec.get("filter"):
+                column, _, expression = spec["filter"].partition("=")
+                predicate = condition(column, expression)
+            channel.bindings.append(
+                _Binding(
+                    binding_id,
+                    spec.get("event", "*"),
+                    spec.get("schema", "public"),
+                    spec.get("table"),
+                    spec.get("filter"),
+                    predicate,
+                )
+            )
+            response.append({**spec, "id": binding_id})
+        self.channels[channel.topic] = channel
+        return response
+
+
+class Realtime:
+    def __init__(self, store: Store) -> None:
+        self.store = store
+        self._connections: list[_Connection] = []
+        self._lock = threading.Lock()
+        self._ids = 0
+        store.subscribe(self._changed)
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._ids += 1
+            return self._ids
+
+    def serve(self, rfile: BinaryIO, wfile: BinaryIO, vsn: str = "1.0.0") -> None:
+        """Run one upgraded connection until the client goes away."""
+        connection = _Connection(self, rfile, wfile, vsn)
+        with self._lock:
+            self._connections.append(connection)
+        try:
+            connection.serve()
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self._connections.remove(connection)
+
+    def broadcast(self, sender: _Connection, topic: str, payload: dict[str, Any]) -> None:
+        for connection in list(self._connections):
+            channel = connection.channels.get(topic)
+            if channel is None or (connection is sender and not channel.broadcast_self):
+                continue
+            self._send(connection, topic, "broadcast", payload, channel.join_ref)
+
+    def _changed(self, table: str, kind: str, record: Row | None, old: Row | None) -> None:
+        row = record if record is not None else old or {}
+        columns = [
+            {"name": name, "type": column.type}
+            for name, column in self.store.schema.tables[table].columns.items()
+        ]
+        data = {
+            "schema": "public",
+            "table": table,
+            "commit_timestamp": now_iso(),
+            "type": kind,
+            "record": record or {},
+            "old_record": old if kind != "INSERT" else None,
+            "columns": columns,
+            "errors": None,
+        }
+        if data["old_record"] is None:
+            del data["old_record"]
+        for connection in list(self._connections):
+            for channel in list(connection.channels.values()):
+                ids = [b.id for b in channel.bindings if b.wants(table, kind, row)]
+                if ids:
+                    payload = {"ids": ids, "data": data}
+                    self._send(
+                        connection, channel.topic, "postgres_changes", payload, channel.join_ref
+                    )
+
+    def _send(
+        self,
+        connection: _Connection,
+        topic: str,
+        event: str,
+        payload: Any,
+        join_ref: str | None,
+    ) -> None:
+        try:
+            connection.send(topic, event, payload, None, join_ref)
+        except OSError:
+            pass
@@ -0,0 +1,124 @@
+"""Python versions of the RPCs the apps call during sign-in and navigation.
+
+They answer from the stand-in's own tables, ignoring the permission checks
+the SQL versions make (row level security is not emulated either).
+Functions defined by the migrations without a handler here return ``[]``
+when set-returning and ``null`` otherwise.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+from harness.standin.postgrest import RpcHandler
+from harness.standin.store import Row, Store
+
+# Highest privilege first, as get_user_primary_role orders them.
+ROLE_PRIORITY = (
+    "superadmin",
+    "education_secretary",
+    "school_director",
+    "school_manager",
+    "coordinator",
+    "aee_teacher",
+    "teacher",
+    "specialist",
+    "support_professional",
+    "family",
+)
+
+
+def _user_id(args: Mapping[str, Any], claims: Mapping[str, Any] | None) -> str | None:
+    for key in ("_user_id", "p_user_id", "user_id", "_uid"):
+        if args.get(key):
+            return args[key]
+    return (claims or {}).get("sub")
+
+
+def _profile(store: Store, user_id: str | None) -> Row | None:
+    return next((r for r in store.rows("profiles") if r.get("id") == user_id), None)
+
+
+def roles(store: Store, user_id: str | None) -> list[str]:
+    found = [r["role"] for r in store.rows("user_roles") if r.get("user_id") == user_id]
+    profile = _profile(store, user_id)
+    if not found and profile and profile.get("role"):
+        found = [profile["role"]]
+    return sorted(found, key=lambda r: ROLE_PRIORITY.index(r) if r in ROLE_PRIORITY else 99)
+
+
+def get_user_primary_role(store: Store, args: Mapping[str, Any], claims: Any) -> str | None:
+    found = roles(store, _user_id(args, claims))
+    return found[0] if found else None
+
+
+def has_role(store: Store, args: Mapping[str, Any], claims: Any) -> bool:
+    return args.get("_role") in roles(store, _user_id(args, claims))
+
+
+def get_user_tenant_safe(store: Store, args: Mapping[str, Any], claims: Any) -> str | None:
+    user_id = _user_id(args, claims)
+    profile = _profile(store, user_id)
+    if profile and profile.get("tenant_id"):
+        return profile["tenant_id"]
+    links = [r for r in store.rows("user_tenants") if r.get("user_id") == user_id]
+    return links[0]["tenant_id"] if links else None
+
+
+def get_user_school_id(store: Store, args: Mapping[str, Any], claims: Any) -> str | None:
+    user_id = _user_id(args, claims)
+    profile = _profile(store, user_id)
+    if profile and profile.get("school_id"):
+        return profile["school_id"]
+    links = [r for r in store.rows("user_schools") if r.get("user_id") == user_id]
+    return links[0]["school_id"] if links else None
+
+
+def can_manage_network(store: Store, args: Mapping[str, Any], claims: Any) -> bool:
+    granted = set(roles(store, _user_id(args, claims)))
+    return bool(granted & {"superadmin", "education_secretary"})
+
+
+def allow(store: Store, args: Mapping[str, Any], claims: Any) -> bool:
+    return True
+
+
+def get_audit_trail(store: Store, args: Mapping[str, Any], claims: Any) -> list[Row]:
+    rows = store.rows("audit_events")
+    for arg, column in (
+        ("p_tenant_id", "tenant_id"),
+        ("p_entity_type", "entity_type"),
+        ("p_entity_id", "entity_id"),
+        ("p_action", "action"),
+        ("p_actor_id", "actor_id"),
+    ):
+        if args.get(arg):
+            rows = [r for r in rows if r.get(column) == args[arg]]
+    if args.get("p_start_date"):
+        rows = [r for r in rows if (r.get("created_at") or "") >= args["p_start_date"]]
+    if args.get("p_end_date"):
+        rows = [r for r in rows if (r.get("created_at") or "") <= args["p_end_date"]]
+    rows.sort(key=lambda r: r.get("created_at") or "", reverse=True)
+    return rows[: int(args.get("p_limit") or 100)]
+
+
+def log_audit_event(store: Store, args: Mapping[str, Any], claims: Any) -> str:
+    values = {k.removeprefix("p_"): v for k, v in args.items()}
+    values.setdefault("actor_id", (claims or {}).get("sub"))
+    table = store.table("audit_events")
+    (row,) = store.insert("audit_events", [{k: v for k, v in values.items() if k in table.columns}])
+    return row["id"]
+
+
+HANDLERS: dict[str, RpcHandler] = {
+    "get_user_primary_role": get_user_primary_role,
+    "has_role": has_role,
+    "get_user_tenant_safe": get_user_tenant_safe,
+    "get_user_school_id": get_user_school_id,
+    "can_manage_network": can_manage_network,
+    "user_can_access_pei": allow,
+    "user_has_school_access": allow,
+    "has_permission": allow,
+    "get_audit_trail": get_audit_trail,
+    "log_audit_event": log_audit_event,
+}
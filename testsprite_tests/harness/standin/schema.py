@@ -0,0 +1,316 @@
+"""Tables, views and functions recovered from ``supabase/migrations``.
+
+Only what the stand-in needs is extracted: column names, types, defaults,
+primary and foreign keys of ``public`` tables, the names of views and the
+return shape of functions.  Migrations are replayed in file-name order, so
+``ALTER TABLE ... ADD/DROP/RENAME COLUMN`` and ``DROP TABLE`` are honoured.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from harness.scenarios import SUITE_DIR
+
+MIGRATIONS_DIR = SUITE_DIR.parent / "supabase" / "migrations"
+
+_NAME = r'(?:"[^"]+"|[\w]+)(?:\s*\.\s*(?:"[^"]+"|[\w]+))?'
+_CREATE_TABLE = re.compile(
+    r"^CREATE\s+(?:UNLOGGED\s+)?TABLE\s+(?P<ine>IF\s+NOT\s+EXISTS\s+)?"
+    rf"(?P<name>{_NAME})\s*\(",
+    re.I,
+)
+_CREATE_VIEW = re.compile(
+    r"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:MATERIALIZED\s+)?VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+    rf"(?P<name>{_NAME})",
+    re.I,
+)
+_CREATE_FUNCTION = re.compile(
+    rf"^CREATE\s+(?:OR\s+REPLACE\s+)?FUNCTION\s+(?P<name>{_NAME})\s*\(.*?\)\s*"
+    r"RETURNS\s+(?P<returns>SETOF\s+|TABLE\b)?\s*(?P<type>[\w\".]+)?",
+    re.I | re.S,
+)
+_ALTER_TABLE = re.compile(
+    rf"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(?P<name>{_NAME})\s+(?P<actions>.*)$",
+    re.I | re.S,
+)
+_DROP = re.compile(
+    r"^DROP\s+(?:MATERIALIZED\s+)?(?:TABLE|VIEW)\s+(?:IF\s+EXISTS\s+)?(?P<names>.*?)"
+    r"(?:\s+CASCADE|\s+RESTRICT)?$",
+    re.I | re.S,
+)
+
+# ALTER TABLE statements inside ``DO $$ ... $$`` blocks, usually guarded by an
+# existence check; replayed as if unconditional.
+_DO_ALTER = re.compile(r"\bALTER\s+TABLE\b[^;]*", re.I)
+
+_CONSTRAINT_START = re.compile(
+    r"^(CONSTRAINT|PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CHECK|EXCLUDE)\b", re.I
+)
+_COLUMN_KEYWORDS = (
+    r"NOT\s+NULL|NULL|DEFAULT|PRIMARY\s+KEY|REFERENCES|UNIQUE|CHECK|CONSTRAINT|GENERATED|COLLATE"
+)
+_TYPE_END = re.compile(rf"\s+(?:{_COLUMN_KEYWORDS})\b", re.I)
+_DEFAULT = re.compile(rf"\bDEFAULT\s+(?P<expr>.+?)(?=\s+(?:{_COLUMN_KEYWORDS})\b|$)", re.I | re.S)
+_REFERENCES = re.compile(
+    rf"\bREFERENCES\s+(?P<table>{_NAME})\s*(?:\(\s*(?P<column>[\"\w]+)\s*\))?", re.I
+)
+_TABLE_PK = re.compile(r"PRIMARY\s+KEY\s*\((?P<columns>[^)]*)\)", re.I)
+_TABLE_FK = re.compile(
+    rf"FOREIGN\s+KEY\s*\((?P<column>[^)]*)\)\s*REFERENCES\s+(?P<table>{_NAME})"
+    r"\s*(?:\(\s*(?P<ref>[\"\w]+)\s*\))?",
+    re.I,
+)
+
+
+@dataclass
+class Column:
+    name: str
+    type: str
+    default: str | None = None
+    nullable: bool = True
+    primary_key: bool = False
+    references: tuple[str, str] | None = None
+
+
+@dataclass
+class Table:
+    name: str
+    columns: dict[str, Column] = field(default_factory=dict)
+    view: bool = False
+
+    @property
+    def primary_key(self) -> list[str]:
+        keys = [c.name for c in self.columns.values() if c.primary_key]
+        if keys:
+            return keys
+        return ["id"] if "id" in self.columns or not self.columns else []
+
+    def foreign_keys(self) -> dict[str, str]:
+        """Column name -> referenced ``public`` table."""
+        return {c.name: c.references[0] for c in self.columns.values() if c.references}
+
+
+@dataclass
+class Function:
+    name: str
+    returns_set: bool
+    return_type: str
+
+
+@dataclass
+class Schema:
+    tables: dict[str, Table] = field(default_factory=dict)
+    functions: dict[str, Function] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, directory: Path = MIGRATIONS_DIR) -> "Schema":
+        schema = cls()
+        for path in sorted(directory.glob("*.sql")):
+            schema.apply(path.read_text(encoding="utf-8", errors="replace"))
+        return schema
+
+    def apply(self, sql: str) -> None:
+        for statement in split_statements(sql):
+            self._apply_statement(statement)
+
+    def _apply_statement(self, statement: str) -> None:
+        if match := _CREATE_TABLE.match(statement):
+            schema, name = _qualified(match["name"])
+            if schema != "public" or (match["ine"] and name in self.tables):
+                return
+            body = _parenthesised(statement, match.end() - 1)
+            self.tables[name] = _parse_table(name, body)
+        elif match := _CREATE_VIEW.match(statement):
+            schema, name = _qualified(match["name"])
+            if schema == "public":
+                self.tables[name] = Table(name, view=True)
+        elif match := _CREATE_FUNCTION.match(statement):
+            schema, name = _qualified(match["name"])
+            if schema == "public":
+                return_type = _unquote((match["type"] or "void").split(".")[-1]).lower()
+                self.functions[name] = Function(name, bool(match["returns"]), return_type)
+        elif match := _ALTER_TABLE.match(statement):
+            schema, name = _qualified(match["name"])
+            table = self.tables.get(name)
+            if schema == "public" and table is not None:
+                self._alter(table, match["actions"])
+        elif re.match(r"^DO\b", statement, re.I):
+            for nested in _DO_ALTER.finditer(statement):
+                self._apply_statement(nested.group().strip())
+        elif match := _DROP.match(statement):
+            for qualified in _split_top_level(match["names"]):
+                schema, name = _qualified(qualified)
+                if schema == "public":
+                    self.tables.pop(name, None)
+
+    def _alter(self, table: Table, actions: str) -> None:
+        for action in _split_top_level(actions):
+            m = re.match(r"^ADD\s+COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?(.*)$", action, re.I | re.S)
+            if m:
+                column = _parse_column(m[1])
+                if column and column.name not in table.columns:
+                    table.columns[column.name] = column
+            elif m := re.match(r"^DROP\s+COLUMN\s+(?:IF\s+EXISTS\s+)?([\"\w]+)", action, re.I):
+                table.columns.pop(_unquote(m[1]), None)
+            elif m := re.match(r"^RENAME\s+COLUMN\s+([\"\w]+)\s+TO\s+([\"\w]+)", action, re.I):
+                column = table.columns.pop(_unquote(m[1]), None)
+                if column:
+                    column.name = _unquote(m[2])
+                    table.columns[column.name] = column
+            elif m := re.match(r"^RENAME\s+TO\s+([\"\w]+)", action, re.I):
+                self.tables.pop(table.name, None)
+                table.name = _unquote(m[1])
+                self.tables[table.name] = table
+            elif m := _TABLE_FK.search(action):
+                _apply_foreign_key(table, m)
+            elif m := re.match(r"^ADD\s+(?!CONSTRAINT\b)(.*)$", action, re.I | re.S):
+                column = _parse_column(m[1])
+                if column and column.name not in table.columns:
+                    table.columns[column.name] = column
+
+
+def _parse_table(name: str, body: str) -> Table:
+    table = Table(name)
+    for item in _split_top_level(body):
+        if _CONSTRAINT_START.match(item) or re.match(r"^LIKE\s", item, re.I):
+            if m := _TABLE_PK.search(item):
+                for key in m["columns"].split(","):
+                    if column := table.columns.get(_unquote(key.strip())):
+                        column.primary_key = True
+            if m := _TABLE_FK.search(item):
+                _apply_foreign_key(table, m)
+            continue
+        column = _parse_column(item)
+        if column:
+            table.columns[column.name] = column
+    return table
+
+
+def _apply_foreign_key(table: Table, match: re.Match[str]) -> None:
+    columns = [_unquote(c.strip()) for c in match["column"].split(",")]
+    schema, target = _qualified(match["table"])
+    if len(columns) == 1 and columns[0] in table.columns and schema == "public":
+        table.columns[columns[0]].references = (target, _unquote(match["ref"] or "id"))
+
+
+def _parse_column(definition: str) -> Column | None:
+    definition = definition.strip()
+    m = re.match(r'^("[^"]+"|\w+)\s*(.*)$', definition, re.S)
+    if not m:
+        return None
+    name, rest = _unquote(m[1]), m[2]
+    end = _TYPE_END.search(rest)
+    column_type = (rest[: end.start()] if end else rest).strip()
+    column = Column(name=name, type=_unquote(column_type.split(".")[-1]).lower() or "text")
+    if default := _DEFAULT.search(rest):
+        column.default = default["expr"].strip()
+    column.nullable = not re.search(r"\bNOT\s+NULL\b", rest, re.I)
+    column.primary_key = bool(re.search(r"\bPRIMARY\s+KEY\b", rest, re.I))
+    if reference := _REFERENCES.search(rest):
+        schema, target = _qualified(reference["table"])
+        if schema == "public":
+            column.references = (target, _unquote(reference["column"] or "id"))
+    return column
+
+
+def _qualified(name: str) -> tuple[str, str]:
+    parts = [_unquote(p.strip()) for p in name.split(".")]
+    return ("public", parts[0]) if len(parts) == 1 else (parts[0], parts[1])
+
+
+def _unquote(name: str) -> str:
+    return name.strip().strip('"')
+
+
+def _parenthesised(text: str, start: int) -> str:
+    """Contents of the parenthesis opening at ``text[start]``."""
+    depth = 0
+    for index in range(start, len(text)):
+        char = text[index]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1 : index]
+    return text[start + 1 :]
+
+
+def _split_top_level(text: str) -> list[str]:
+    items, depth, current, quote = [], 0, [], None
+    for char in text:
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+            continue
+        if char in "'\"":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if "".join(current).strip():
+        items.append("".join(current).strip())
+    return items
+
+
+_DOLLAR_TAG = re.compile(r"\$[A-Za-z_]*\$")
+
+
+def split_statements(sql: str) -> Iterator[str]:
+    """Yield SQL statements with comments removed.
+
+    Semicolons inside quotes, ``/* */`` comments and dollar-quoted bodies do
+    not end a statement.
+    """
+    current: list[str] = []
+    i, length = 0, len(sql)
+    while i < length:
+        char = sql[i]
+        if sql.startswith("--", i):
+            newline = sql.find("\n", i)
+            i = length if newline < 0 else newline
+            continue
+        if sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = length if end < 0 else end + 2
+            continue
+        if char in "'\"":
+            end = i + 1
+            while end < length:
+                if sql[end] == char:
+                    if end + 1 < length and sql[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i : end + 1])
+            i = end + 1
+            continue
+        if char == "$" and (tag := _DOLLAR_TAG.match(sql, i)):
+            end = sql.find(tag.group(), tag.end())
+            end = length if end < 0 else end + len(tag.group())
+            current.append(sql[i:end])
+            i = end
+            continue
+        if char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                yield statement
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statement = "".join(current).strip()
+    if statement:
+        yield statement
@@ -0,0 +1,138 @@
+"""Baseline rows for the stand-in: one network, one school, a user per role.
+
+Users are created from :data:`harness.auth.ROLES` (with the same
+``TESTSPRITE_<ROLE>_EMAIL``/``_PASSWORD`` overrides), so cached storage
+states and the scenarios' role declarations line up with the stand-in.
+Ids are ``uuid5`` values derived from names, identical on every start.
+Extra rows can be loaded from a JSON file mapping table names to row lists.
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from pathlib import Path
+from typing import Any
+
+from harness import auth
+from harness.standin.gotrue import GoTrue
+from harness.standin.store import Store
+
+NAMESPACE = uuid.UUID("6f1c1d7e-3b8a-4d0e-9a55-7c3e2b1f0a42")
+
+TENANT_NAME = "Rede Municipal de Teste"
+SCHOOL_NAME = "Escola Municipal de Teste"
+
+FULL_NAMES = {
+    "superadmin": "Super Admin",
+    "education_secretary": "Secretária de Educação",
+    "school_director": "Diretor da Escola",
+    "coordinator": "Coordenadora Pedagógica",
+    "teacher": "Professora Regente",
+    "family": "Responsável Familiar",
+    "specialist": "Especialista",
+    "aee_teacher": "Professora AEE",
+}
+
+STUDENTS = ("Ana Beatriz Souza", "Carlos Eduardo Lima", "Maria Clara Oliveira")
+
+
+def stable_id(*parts: str) -> str:
+    return str(uuid.uuid5(NAMESPACE, "/".join(parts)))
+
+
+def _insert(store: Store, table: str, rows: list[dict[str, Any]]) -> None:
+    if table not in store.schema.tables:
+        return
+    columns = store.schema.tables[table].columns
+    store.insert(
+        table,
+        [{k: v for k, v in row.items() if not columns or k in columns} for row in rows],
+        upsert=True,
+    )
+
+
+def seed(store: Store, gotrue: GoTrue) -> None:
+    tenant_id = stable_id("tenant", TENANT_NAME)
+    school_id = stable_id("school", SCHOOL_NAME)
+    _insert(store, "tenants", [{"id": tenant_id, "network_name": TENANT_NAME}])
+    _insert(
+        store,
+        "schools",
+        [{"id": school_id, "tenant_id": tenant_id, "school_name": SCHOOL_NAME}],
+    )
+
+    user_ids: dict[str, str] = {}
+    for role in auth.ROLES:
+        creds = auth.credentials(role)
+        user_id = stable_id("user", role)
+        user_ids[role] = user_id
+        name = FULL_NAMES.get(role, role)
+        gotrue.add_user(creds.email, creds.password, user_id, {"full_name": name, "role": role})
+        network_wide = role in ("superadmin", "education_secretary")
+        _insert(
+            store,
+            "profiles",
+            [
+                {
+                    "id": user_id,
+                    "full_name": name,
+                    "role": role,
+                    "tenant_id": None if role == "superadmin" else tenant_id,
+                    "school_id": None if network_wide else school_id,
+                    "is_active": True,
+                }
+            ],
+        )
+        _insert(
+            store,
+            "user_roles",
+            [{"id": stable_id("role", role), "user_id": user_id, "role": role}],
+        )
+        if role != "superadmin":
+            _insert(
+                store,
+                "user_tenants",
+                [{"id": stable_id("tenant", role), "user_id": user_id, "tenant_id": tenant_id}],
+            )
+        if not network_wide:
+            _insert(
+                store,
+                "user_schools",
+                [{"id": stable_id("school", role), "user_id": user_id, "school_id": school_id}],
+            )
+
+    students = [
+        {
+            "id": stable_id("student", name),
+            "name": name,
+            "school_id": school_id,
+            "tenant_id": tenant_id,
+            "is_active": True,
+        }
+        for name in STUDENTS
+    ]
+    _insert(store, "students", students)
+    _insert(
+        store,
+        "peis",
+        [
+            {
+                "id": stable_id("pei", student["name"]),
+                "student_id": student["id"],
+                "school_id": school_id,
+                "tenant_id": tenant_id,
+                "assigned_teacher_id": user_ids["teacher"],
+                "created_by": user_ids["coordinator"],
+                "status": "draft",
+            }
+            for student in students
+        ],
+    )
+
+
+def load(store: Store, path: Path) -> None:
+    """Upsert the rows of a ``{"table": [row, ...]}`` JSON file."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for table, rows in data.items():
+        store.insert(table, rows, upsert=True)
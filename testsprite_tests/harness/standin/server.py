@@ -0,0 +1,255 @@
+"""HTTP front of the stand-in: routes Supabase URLs to the emulated services.
+
+Requests carrying a ``X-Testsprite-Clone: <name>`` header are served from
+that clone of the baseline instead of the shared store.  Clones are managed
+under ``/_testsprite/``:
+
+``PUT /_testsprite/clones/<name>``
+    Create (or reset) a clone from the baseline, or with ``?from=<clone>``
+    from the current data of another clone.
+``DELETE /_testsprite/clones/<name>``
+    Drop it.
+``PUT /_testsprite/baseline``
+    Take the current shared store as the new baseline.  The baseline is
+    otherwise taken when the server starts, after seeding.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, parse_qsl, urlsplit
+
+from harness.standin import seed as seeding
+from harness.standin.gotrue import JWT_SECRET, GoTrue, anon_key
+from harness.standin.postgrest import PostgREST
+from harness.standin.realtime import Realtime, accept_key
+from harness.standin.rpc import HANDLERS
+from harness.standin.schema import MIGRATIONS_DIR, Schema
+from harness.standin.store import Snapshot, Store
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 54321
+
+CLONE_HEADER = "x-testsprite-clone"
+CONTROL_PREFIX = "/_testsprite/"
+
+_CORS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, PATCH, DELETE, HEAD, OPTIONS",
+    "Access-Control-Allow-Headers": (
+        "authorization, apikey, content-type, prefer, range, accept, accept-profile, "
+        "content-profile, x-client-info, x-supabase-api-version, x-testsprite-clone"
+    ),
+    "Access-Control-Expose-Headers": "Content-Range, Content-Location, Location",
+    "Access-Control-Max-Age": "86400",
+}
+
+
+def _not_found(message: str) -> tuple[int, dict[str, str], bytes]:
+    body = {"statusCode": "404", "error": "not_found", "message": message}
+    return 404, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.standin.verbose:
+            super().log_message(format, *args)
+
+    def _respond(self, status: int, headers: dict[str, str], body: bytes) -> None:
+        self.send_response(status)
+        for name, value in {**_CORS, **headers}.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD" and body:
+            self.wfile.write(body)
+
+    def _dispatch(self) -> None:
+        standin = self.server.standin
+        url = urlsplit(self.path)
+        headers = {k.lower(): v for k, v in self.headers.items()}
+        length = int(headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length else b""
+        method = self.command
+
+        if url.path.startswith(CONTROL_PREFIX):
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            response = standin.control(method, url.path[len(CONTROL_PREFIX) :], params)
+        elif url.path.startswith("/rest/v1/"):
+            rest = standin.rest_for(headers.get(CLONE_HEADER))
+            if rest is None:
+                response = _not_found(f"No clone named {headers[CLONE_HEADER]!r}")
+            else:
+                claims = standin.gotrue.claims(headers.get("authorization"))
+                params = parse_qsl(url.query, keep_blank_values=True)
+                response = rest.handle(
+                    method, url.path[len("/rest/v1/") :], params, headers, body, claims
+                )
+        elif url.path.startswith("/auth/v1/"):
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            response = standin.gotrue.handle(
+                method, url.path[len("/auth/v1/") :].rstrip("/"), params, headers, body
+            )
+        elif url.path.startswith("/realtime/v1/websocket"):
+            self._upgrade(headers, parse_qs(url.query).get("vsn", ["1.0.0"])[-1])
+            return
+        elif url.path.startswith("/storage/v1/"):
+            response = _not_found("Storage is not emulated")
+        elif url.path.startswith("/functions/v1/"):
+            response = _not_found("Edge functions are not emulated")
+        else:
+            response = _not_found(f"No stand-in route for {url.path}")
+        self._respond(*response)
+
+    def _upgrade(self, headers: dict[str, str], vsn: str) -> None:
+        if headers.get("upgrade", "").lower() != "websocket":
+            self._respond(400, {}, b"Expected a WebSocket upgrade")
+            return
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept_key(headers["sec-websocket-key"]))
+        self.end_headers()
+        self.wfile.flush()
+        self.server.standin.realtime.serve(self.rfile, self.wfile, vsn)
+        self.close_connection = True
+
+    def do_OPTIONS(self) -> None:
+        self._respond(204, {}, b"")
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _dispatch
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], standin: "StandIn") -> None:
+        self.standin = standin
+        super().__init__(address, _Handler)
+
+
+class StandIn:
+    """A local, in-memory Supabase API serving ``/auth``, ``/rest`` and ``/realtime``.
+
+    Usable as a context manager; ``port=0`` picks a free port.
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        migrations: Path = MIGRATIONS_DIR,
+        seed_file: Path | None = None,
+        secret: str = JWT_SECRET,
+        verbose: bool = False,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+        self.store = Store(Schema.load(migrations))
+        self.gotrue = GoTrue(secret)
+        self.rest = PostgREST(self.store, HANDLERS)
+        self.realtime = Realtime(self.store)
+        self.anon_key = anon_key(secret)
+        seeding.seed(self.store, self.gotrue)
+        if seed_file is not None:
+            seeding.load(self.store, seed_file)
+        self.baseline: Snapshot | None = None
+        self._clones: dict[str, PostgREST] = {}
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def environ(self) -> dict[str, str]:
+        """Variables pointing both the harness and a Vite dev server here."""
+        return {
+            "TESTSPRITE_SUPABASE_URL": self.url,
+            "TESTSPRITE_SUPABASE_ANON_KEY": self.anon_key,
+            "VITE_SUPABASE_URL": self.url,
+            "VITE_SUPABASE_ANON_KEY": self.anon_key,
+            "VITE_SUPABASE_PUBLISHABLE_KEY": self.anon_key,
+        }
+
+    def clone(self, name: str, source: str | None = None) -> Store:
+        """Create or reset clone ``name`` from the baseline, or from clone ``source``."""
+        if source is not None:
+            snapshot = self._clones[source].store.snapshot()
+        else:
+            if self.baseline is None:
+                self.baseline = self.store.snapshot()
+            snapshot = self.baseline
+        store = Store.from_snapshot(self.store.schema, snapshot)
+        self._clones[name] = PostgREST(store, HANDLERS)
+        return store
+
+    def drop(self, name: str) -> bool:
+        return self._clones.pop(name, None) is not None
+
+    def rest_for(self, clone: str | None) -> PostgREST | None:
+        """PostgREST front of ``clone``, the shared one without a clone name."""
+        return self._clones.get(clone) if clone else self.rest
+
+    def control(
+        self, method: str, path: str, params: dict[str, str] | None = None
+    ) -> tuple[int, dict[str, str], bytes]:
+        params = params or {}
+        kind, _, name = path.partition("/")
+        if kind == "baseline" and method == "PUT":
+            self.baseline = self.store.snapshot()
+            rows = sum(map(len, self.baseline.values()))
+            return 200, {"Content-Type": "application/json"}, json.dumps({"rows": rows}).encode()
+        if kind == "clones" and name and method == "PUT":
+            source = params.get("from")
+            if source is not None and source not in self._clones:
+                return _not_found(f"No clone named {source!r}")
+            store = self.clone(name, source)
+            rows = sum(store.count(t) for t in store.schema.tables)
+            body = json.dumps({"name": name, "rows": rows}).encode()
+            return 201, {"Content-Type": "application/json"}, body
+        if kind == "clones" and name and method == "DELETE":
+            if self.drop(name):
+                return 204, {}, b""
+            return _not_found(f"No clone named {name!r}")
+        return _not_found(f"No stand-in control route for {method} {path}")
+
+    def start(self) -> "StandIn":
+        if self.baseline is None:
+            self.baseline = self.store.snapshot()
+        self._server = _Server((self.host, self.port), self)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="supabase-standin", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wait(self) -> None:
+        """Block until :meth:`stop` is called from another thread."""
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
@@ -0,0 +1,264 @@
+"""In-memory rows for the stand-in's tables.
+
+Rows are plain dicts holding JSON-compatible values.  Column defaults from
+the migrations are evaluated for the common cases (``gen_random_uuid()``,
+``now()``, literals and ``'...'::jsonb``); anything else defaults to
+``NULL``.  ``date`` columns reject values that are not ISO dates, as
+Postgres would reject ``15/05/2010``; other types are not checked.  Every
+write is published to the registered change listeners,
+which is what the realtime endpoint subscribes to.
+
+Writes replace row dicts rather than modifying them, so a :meth:`Store.snapshot`
+only copies each table's list of references and a :meth:`Store.from_snapshot`
+clone costs milliseconds even at hundreds of thousands of rows.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
+
+from harness.standin.schema import Schema, Table
+
+Row = dict[str, Any]
+Snapshot = dict[str, tuple[Row, ...]]
+Predicate = Callable[[Row], bool]
+ChangeListener = Callable[[str, str, "Row | None", "Row | None"], None]
+
+_UUID_DEFAULTS = ("gen_random_uuid()", "uuid_generate_v4()", "extensions.uuid_generate_v4()")
+_NOW_DEFAULTS = (
+    "now()",
+    "current_timestamp",
+    "timezone('utc'::text, now())",
+    "timezone('utc', now())",
+)
+_INTERVAL = re.compile(r"^now\(\)\s*([+-])\s*interval\s+'(\d+)\s*(\w+?)s?'$", re.I)
+_LITERAL = re.compile(r"^'(?P<value>(?:[^']|'')*)'(?:::(?P<cast>[\w\s\[\]]+))?$")
+
+
+class StoreError(Exception):
+    """A PostgREST-style error: HTTP status, SQLSTATE/PGRST code, message."""
+
+    def __init__(self, status: int, code: str, message: str, details: str | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+        self.details = details
+
+    def to_json(self) -> dict[str, Any]:
+        return {"code": self.code, "message": self.message, "details": self.details, "hint": None}
+
+
+def now_iso(offset: timedelta = timedelta()) -> str:
+    return (datetime.now(timezone.utc) + offset).isoformat()
+
+
+def default_value(expression: str | None) -> Any:
+    if expression is None:
+        return None
+    expr = expression.strip()
+    lowered = expr.lower()
+    if lowered in _UUID_DEFAULTS:
+        return str(uuid.uuid4())
+    if lowered in _NOW_DEFAULTS:
+        return now_iso()
+    if match := _INTERVAL.match(expr):
+        sign, amount, unit = match.groups()
+        unit = {"year": "day", "month": "day"}.get(unit.lower(), unit.lower())
+        scale = {"year": 365, "month": 30}.get(match[3].lower(), 1)
+        offset = timedelta(**{f"{unit}s": int(amount) * scale})
+        return now_iso(-offset if sign == "-" else offset)
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered == "null":
+        return None
+    if re.fullmatch(r"-?\d+", expr):
+        return int(expr)
+    if re.fullmatch(r"-?\d+\.\d+", expr):
+        return float(expr)
+    if match := _LITERAL.match(expr):
+        value = match["value"].replace("''", "'")
+        cast = (match["cast"] or "").strip().lower()
+        if cast in ("jsonb", "json"):
+            try:
+                return json.loads(value)
+            except ValueError:
+                return None
+        if cast.endswith("[]"):
+            return [] if value in ("{}", "") else value.strip("{}").split(",")
+        return value
+    if lowered.startswith("array[]") or lowered == "'{}'":
+        return []
+    return None
+
+
+class Store:
+    """Thread-safe table storage shared by the REST and realtime endpoints."""
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self._rows: dict[str, list[Row]] = {name: [] for name in schema.tables}
+        self._lock = threading.RLock()
+        self._listeners: list[ChangeListener] = []
+
+    @classmethod
+    def from_snapshot(cls, schema: Schema, snapshot: Snapshot) -> "Store":
+        """A new store holding ``snapshot``'s rows, without change listeners."""
+        store = cls(schema)
+        store._rows.update((name, list(rows)) for name, rows in snapshot.items())
+        return store
+
+    def snapshot(self) -> Snapshot:
+        with self._lock:
+            return {name: tuple(rows) for name, rows in self._rows.items()}
+
+    def table(self, name: str) -> Table:
+        table = self.schema.tables.get(name)
+        if table is None:
+            raise StoreError(
+                404,
+                "PGRST205",
+                f"Could not find the table 'public.{name}' in the schema cache",
+            )
+        return table
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: ChangeListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _publish(self, table: str, kind: str, record: Row | None, old: Row | None) -> None:
+        for listener in list(self._listeners):
+            listener(table, kind, record, old)
+
+    def rows(self, name: str) -> list[Row]:
+        """Snapshot of a table's rows."""
+        self.table(name)
+        with self._lock:
+            return list(self._rows.get(name, []))
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return len(self._rows.get(name, []))
+
+    def _complete(self, table: Table, values: Row) -> Row:
+        unknown = [key for key in values if table.columns and key not in table.columns]
+        if unknown:
+            raise StoreError(
+                400,
+                "PGRST204",
+                f"Could not find the '{unknown[0]}' column of '{table.name}' in the schema cache",
+            )
+        for key, value in values.items():
+            column = table.columns.get(key)
+            if column is not None and column.type == "date" and isinstance(value, str):
+                try:
+                    date.fromisoformat(value[:10])
+                except ValueError:
+                    raise StoreError(
+                        400, "22007", f'invalid input syntax for type date: "{value}"'
+                    ) from None
+        row = {name: default_value(column.default) for name, column in table.columns.items()}
+        row.update(values)
+        if "id" in row and row["id"] is None and (not table.columns or "id" in table.columns):
+            row["id"] = str(uuid.uuid4())
+        return row
+
+    def _key(self, table: Table, row: Row, columns: list[str] | None = None) -> tuple:
+        return tuple(row.get(c) for c in (columns or table.primary_key))
+
+    def insert(
+        self,
+        name: str,
+        values: Iterable[Row],
+        upsert: bool = False,
+        ignore_duplicates: bool = False,
+        on_conflict: list[str] | None = None,
+    ) -> list[Row]:
+        table = self.table(name)
+        inserted: list[Row] = []
+        changes: list[tuple[str, Row, Row | None]] = []
+        with self._lock:
+            rows = self._rows.setdefault(name, [])
+            key_columns = on_conflict or table.primary_key
+            # Built on the first row that could collide: an ``id`` generated
+            # here cannot, and row-at-a-time inserts into large tables would
+            # otherwise index the whole table per request.
+            index: dict[tuple, int] | None = None
+            for value in values:
+                row = self._complete(table, value)
+                key = self._key(table, row, key_columns)
+                position = None
+                if key_columns != ["id"] or value.get("id") is not None:
+                    if index is None:
+                        index = {self._key(table, r, key_columns): i for i, r in enumerate(rows)}
+                    if any(k is not None for k in key):
+                        position = index.get(key)
+                if position is None:
+                    if index is not None:
+                        index[key] = len(rows)
+                    rows.append(row)
+                    inserted.append(row)
+                    changes.append(("INSERT", row, None))
+                elif ignore_duplicates:
+                    continue
+                elif upsert:
+                    old = rows[position]
+                    merged = {**old, **value}
+                    rows[position] = merged
+                    inserted.append(merged)
+                    changes.append(("UPDATE", merged, old))
+                else:
+                    raise StoreError(
+                        409,
+                        "23505",
+                        f'duplicate key value violates unique constraint "{name}_pkey"',
+                        f"Key ({', '.join(key_columns)})=({', '.join(map(str, key))}) "
+                        "already exists.",
+                    )
+        for kind, row, old in changes:
+            self._publish(name, kind, row, old)
+        return inserted
+
+    def update(self, name: str, predicate: Predicate, patch: Row) -> list[Row]:
+        table = self.table(name)
+        unknown = [key for key in patch if table.columns and key not in table.columns]
+        if unknown:
+            raise StoreError(
+                400,
+                "PGRST204",
+                f"Could not find the '{unknown[0]}' column of '{name}' in the schema cache",
+            )
+        updated: list[tuple[Row, Row]] = []
+        with self._lock:
+            rows = self._rows.setdefault(name, [])
+            for i, row in enumerate(rows):
+                if predicate(row):
+                    new = {**row, **patch}
+                    rows[i] = new
+                    updated.append((new, row))
+        for new, old in updated:
+            self._publish(name, "UPDATE", new, old)
+        return [new for new, _ in updated]
+
+    def delete(self, name: str, predicate: Predicate) -> list[Row]:
+        self.table(name)
+        with self._lock:
+            rows = self._rows.setdefault(name, [])
+            deleted = [row for row in rows if predicate(row)]
+            self._rows[name] = [row for row in rows if not predicate(row)]
+        for row in deleted:
+            self._publish(name, "DELETE", None, row)
+        return deleted
+
+    def truncate(self, name: str | None = None) -> None:
+        with self._lock:
+            for table in [name] if name else list(self._rows):
+                self._rows[table] = []
@@ -0,0 +1,650 @@
+"""``python -m harness.synthetic``: seed multi-tenant data at production volume.
+
+Generates education networks (``tenants``) with their schools, students,
+enrollment history (``student_enrollments``), PEIs with older versions and
+``pei_history`` entries, PEI meetings (``pei_meetings``,
+``pei_meeting_peis``) and ``audit_events``.  Output is deterministic for a
+given ``--seed``, and rows are produced one network at a time, so memory
+stays flat however many networks are generated.
+
+Rows go to one of three sinks:
+
+``--database-url``
+    Postgres, one ``COPY ... FROM STDIN`` per table and network, streamed
+    as CSV through ``psql``.  ``--no-triggers`` sets
+    ``session_replication_role = replica`` (superuser only) to skip the
+    audit and versioning triggers.  With triggers on, ``pei_history`` is
+    left to the versioning trigger.  Rows are signed by the oldest
+    ``auth.users`` row unless ``--author`` is given.
+``--rest``
+    PostgREST bulk inserts of ``BATCH_SIZE`` rows, signed in as
+    ``superadmin``: a running stand-in (``python -m harness.standin``), which
+    has no triggers, or any project whose policies allow it.
+:class:`StoreSink`
+    The stand-in's in-memory store, used by
+    ``python -m harness.standin --synthetic``.
+
+Scales: ``small`` (1 network, 10k students), ``medium`` (10, 100k) and
+``large`` (100, 1M).  ``--networks`` and ``--students`` override them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Iterator, Protocol, Sequence
+
+from harness import auth, rest
+
+SCALES: dict[str, tuple[int, int]] = {
+    "small": (1, 10_000),
+    "medium": (10, 100_000),
+    "large": (100, 1_000_000),
+}
+
+BATCH_SIZE = 1000
+
+AUTHOR_QUERY = "SELECT id FROM auth.users ORDER BY created_at LIMIT 1"
+
+# Tables in foreign key order, with the columns generated for each.
+COLUMNS: dict[str, tuple[str, ...]] = {
+    "tenants": ("id", "network_name", "network_email", "is_active", "created_at", "updated_at"),
+    "schools": (
+        "id",
+        "tenant_id",
+        "school_name",
+        "codigo_inep",
+        "uf",
+        "zona",
+        "tipo_escola",
+        "oferece_aee",
+        "is_active",
+        "created_at",
+        "updated_at",
+    ),
+    "students": (
+        "id",
+        "tenant_id",
+        "school_id",
+        "name",
+        "date_of_birth",
+        "sexo",
+        "mother_name",
+        "class_name",
+        "grade",
+        "shift",
+        "enrollment_number",
+        "necessidades_especiais",
+        "status_matricula",
+        "is_active",
+        "created_at",
+        "updated_at",
+    ),
+    "student_enrollments": (
+        "id",
+        "student_id",
+        "school_id",
+        "academic_year",
+        "grade",
+        "class_name",
+        "shift",
+        "enrollment_number",
+        "enrollment_date",
+        "status",
+        "start_date",
+        "end_date",
+        "created_at",
+        "updated_at",
+    ),
+    "peis": (
+        "id",
+        "student_id",
+        "school_id",
+        "tenant_id",
+        "created_by",
+        "status",
+        "version_number",
+        "is_active_version",
+        "diagnosis_data",
+        "planning_data",
+        "evaluation_data",
+        "created_at",
+        "updated_at",
+    ),
+    "pei_history": (
+        "id",
+        "pei_id",
+        "version_number",
+        "changed_by",
+        "changed_at",
+        "change_type",
+        "change_summary",
+        "status",
+        "is_snapshot",
+    ),
+    "pei_meetings": (
+        "id",
+        "tenant_id",
+        "school_id",
+        "meeting_date",
+        "meeting_type",
+        "title",
+        "status",
+        "location",
+        "created_by",
+        "created_at",
+        "updated_at",
+    ),
+    "pei_meeting_peis": ("id", "meeting_id", "pei_id", "order", "created_at"),
+    "audit_events": (
+        "id",
+        "tenant_id",
+        "entity_type",
+        "entity_id",
+        "action",
+        "metadata",
+        "created_at",
+    ),
+}
+
+FIRST_NAMES = tuple(
+    (
+        "Ana Beatriz Carlos Daniel Eduarda Felipe Gabriela Heitor Isabela João Júlia Kauã "
+        "Larissa Lucas Manuela Miguel Natália Otávio Pedro Rafaela Samuel Sofia Thiago "
+        "Valentina Vitor Yasmin"
+    ).split()
+)
+SURNAMES = tuple(
+    (
+        "Almeida Barbosa Cardoso Costa Ferreira Gomes Lima Martins Melo Nascimento Oliveira "
+        "Pereira Ribeiro Rodrigues Santos Silva Souza Teixeira"
+    ).split()
+)
+CITIES = (
+    ("São Gonçalo", "RJ"),
+    ("Niterói", "RJ"),
+    ("Campinas", "SP"),
+    ("Santos", "SP"),
+    ("Contagem", "MG"),
+    ("Uberlândia", "MG"),
+    ("Feira de Santana", "BA"),
+    ("Caruaru", "PE"),
+    ("Londrina", "PR"),
+    ("Joinville", "SC"),
+    ("Canoas", "RS"),
+    ("Anápolis", "GO"),
+)
+GRADES = tuple(f"{n}º ano" for n in range(1, 10))
+SHIFTS = ("Manhã", "Tarde", "Integral")
+NEEDS = ("TEA", "TDAH", "Deficiência intelectual", "Deficiência visual", "Dislexia")
+ACTIVE_STATUSES = ("draft", "pending", "approved", "approved", "returned")
+MEETING_TYPES = ("inicial", "acompanhamento", "final", "extraordinaria")
+
+DAY = timedelta(days=1)
+
+
+class Sink(Protocol):
+    def write(self, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int: ...
+
+
+@dataclass
+class Config:
+    networks: int = 1
+    students: int = 10_000
+    schools_per_network: int = 20
+    pei_ratio: float = 0.12
+    max_versions: int = 3
+    years_of_history: int = 3
+    seed: int = 1
+    # Reuse an existing tenant (the stand-in's seeded one) for the first network.
+    first_tenant: str | None = None
+    # ``auth.users`` id recorded as ``created_by`` of PEIs and meetings and
+    # ``changed_by`` of their history.
+    author: str | None = None
+    # Off where the database's versioning trigger writes ``pei_history`` itself.
+    history: bool = True
+
+
+@dataclass
+class Stats:
+    rows: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def add(self, table: str, count: int) -> None:
+        self.rows[table] = self.rows.get(table, 0) + count
+
+    @property
+    def total(self) -> int:
+        return sum(self.rows.values())
+
+
+def _stamp(moment: datetime) -> str:
+    return moment.isoformat(timespec="seconds")
+
+
+class Generator:
+    """Rows of one network at a time, from a seeded ``random.Random``."""
+
+    def __init__(self, config: Config, today: date | None = None) -> None:
+        self.config = config
+        self.today = today or date.today()
+        self.now = datetime.combine(self.today, datetime.min.time(), timezone.utc)
+
+    def _uuid(self, rng: random.Random) -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def _name(self, rng: random.Random) -> str:
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)} {rng.choice(SURNAMES)}"
+
+    def _moment(self, rng: random.Random, days_back: int) -> datetime:
+        return self.now - timedelta(seconds=rng.randrange(max(1, days_back) * 86_400))
+
+    def network(self, index: int) -> Iterator[tuple[str, list[tuple]]]:
+        """``(table, rows)`` for network ``index``, in foreign key order."""
+        cfg = self.config
+        rng = random.Random(f"{cfg.seed}/{index}")
+        history_days = 365 * cfg.years_of_history
+        city, uf = CITIES[index % len(CITIES)]
+        suffix = f" {index // len(CITIES) + 1}" if index >= len(CITIES) else ""
+
+        tenant = cfg.first_tenant if index == 0 and cfg.first_tenant else self._uuid(rng)
+        created = _stamp(self._moment(rng, history_days))
+        if not (index == 0 and cfg.first_tenant):
+            slug = city.lower().replace(" ", "")
+            yield "tenants", [
+                (
+                    tenant,
+                    f"Rede Municipal de Educação de {city}{suffix}",
+                    f"educacao@{slug}.gov.br",
+                    True,
+                    created,
+                    created,
+                )
+            ]
+
+        schools = []
+        for n in range(cfg.schools_per_network):
+            stamp = _stamp(self._moment(rng, history_days))
+            schools.append(
+                (
+                    self._uuid(rng),
+                    tenant,
+                    f"Escola Municipal {self._name(rng)}",
+                    f"{rng.randrange(10**7, 10**8)}",
+                    uf,
+                    rng.choice(("Urbana", "Rural")),
+                    "Ensino Fundamental",
+                    n % 3 == 0,
+                    True,
+                    stamp,
+                    stamp,
+                )
+            )
+        yield "schools", schools
+
+        # Students spread over networks, then schools; the remainder goes to
+        # the first ones.
+        count = cfg.students // cfg.networks + (index < cfg.students % cfg.networks)
+        students, enrollments, pei_students = [], [], []
+        for n in range(count):
+            school = schools[n % len(schools)][0]
+            student = self._uuid(rng)
+            grade_index = rng.randrange(len(GRADES))
+            shift = rng.choice(SHIFTS)
+            class_name = f"{grade_index + 1}{'ABCD'[rng.randrange(4)]}"
+            number = f"{self.today.year}{index:03d}{n:07d}"
+            born = self.today - timedelta(days=365 * (6 + grade_index) + rng.randrange(365))
+            has_pei = rng.random() < cfg.pei_ratio
+            stamp = _stamp(self._moment(rng, history_days))
+            students.append(
+                (
+                    student,
+                    tenant,
+                    school,
+                    self._name(rng),
+                    born.isoformat(),
+                    rng.choice(("M", "F")),
+                    self._name(rng),
+                    class_name,
+                    GRADES[grade_index],
+                    shift,
+                    number,
+                    has_pei,
+                    "Ativo",
+                    True,
+                    stamp,
+                    stamp,
+                )
+            )
+            years = 1 + min(grade_index, rng.randrange(cfg.years_of_history))
+            for back in range(years - 1, -1, -1):
+                year = self.today.year - back
+                start = date(year, 2, 1)
+                end = None if back == 0 else date(year, 12, 15).isoformat()
+                enrollments.append(
+                    (
+                        self._uuid(rng),
+                        student,
+                        school,
+                        year,
+                        GRADES[grade_index - back],
+                        class_name,
+                        shift,
+                        f"{number}-{year}",
+                        start.isoformat(),
+                        "active" if back == 0 else "completed",
+                        start.isoformat(),
+                        end,
+                        stamp,
+                        stamp,
+                    )
+                )
+            if has_pei:
+                pei_students.append((student, school))
+        yield "students", students
+        yield "student_enrollments", enrollments
+        del students, enrollments
+
+        peis, history, audit, active_by_school = [], [], [], {}
+        for student, school in pei_students:
+            versions = rng.randint(1, cfg.max_versions)
+            first = self._moment(rng, history_days)
+            need = rng.choice(NEEDS)
+            for version in range(1, versions + 1):
+                pei = self._uuid(rng)
+                active = version == versions
+                changed = first + timedelta(days=120 * (version - 1))
+                status = rng.choice(ACTIVE_STATUSES) if active else "obsolete"
+                stamp = _stamp(min(changed, self.now))
+                peis.append(
+                    (
+                        pei,
+                        student,
+                        school,
+                        tenant,
+                        cfg.author,
+                        status,
+                        version,
+                        active,
+                        json.dumps({"necessidade": need, "historico": f"Versão {version}"}),
+                        json.dumps({"metas": [f"Meta {g + 1}" for g in range(rng.randint(2, 6))]}),
+                        json.dumps({}) if active else json.dumps({"parecer": "Revisado"}),
+                        stamp,
+                        stamp,
+                    )
+                )
+                history.append(
+                    (
+                        self._uuid(rng),
+                        pei,
+                        version,
+                        cfg.author,
+                        stamp,
+                        "created" if version == 1 else "new_version",
+                        f"Versão {version} do PEI",
+                        status,
+                        not active,
+                    )
+                )
+                audit.append(
+                    (
+                        self._uuid(rng),
+                        tenant,
+                        "pei",
+                        pei,
+                        "INSERT" if version == 1 else "UPDATE",
+                        json.dumps({"version": version, "status": status}),
+                        stamp,
+                    )
+                )
+                if active:
+                    active_by_school.setdefault(school, []).append(pei)
+        yield "peis", peis
+        if cfg.history:
+            yield "pei_history", history
+        del peis, history
+
+        meetings, links = [], []
+        for school, school_peis in active_by_school.items():
+            for start in range(0, len(school_peis), 8):
+                meeting = self._uuid(rng)
+                when = self._moment(rng, 365)
+                stamp = _stamp(when)
+                meetings.append(
+                    (
+                        meeting,
+                        tenant,
+                        school,
+                        stamp,
+                        rng.choice(MEETING_TYPES),
+                        "Reunião de acompanhamento de PEIs",
+                        "completed" if when < self.now - 7 * DAY else "scheduled",
+                        "Sala de recursos multifuncionais",
+                        cfg.author,
+                        stamp,
+                        stamp,
+                    )
+                )
+                for order, pei in enumerate(school_peis[start : start + 8]):
+                    links.append((self._uuid(rng), meeting, pei, order, stamp))
+                audit.append(
+                    (
+                        self._uuid(rng),
+                        tenant,
+                        "pei_meeting",
+                        meeting,
+                        "INSERT",
+                        json.dumps({"peis": len(school_peis[start : start + 8])}),
+                        stamp,
+                    )
+                )
+        yield "pei_meetings", meetings
+        yield "pei_meeting_peis", links
+        yield "audit_events", audit
+
+    def run(self, sink: Sink, progress: bool = False) -> Stats:
+        stats = Stats()
+        started = time.perf_counter()
+        for index in range(self.config.networks):
+            for table, rows in self.network(index):
+                stats.add(table, sink.write(table, COLUMNS[table], rows))
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(
+                    f"network {index + 1}/{self.config.networks}: {stats.total} rows, "
+                    f"{stats.total / elapsed:,.0f} rows/s",
+                    flush=True,
+                )
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+
+class CopySink:
+    """``COPY ... FROM STDIN`` through ``psql``, rows streamed as CSV."""
+
+    def __init__(self, database_url: str, triggers: bool = True, psql: str = "psql") -> None:
+        self.database_url = database_url
+        self.triggers = triggers
+        self.psql = psql
+
+    def author(self) -> str:
+        """Id of the oldest ``auth.users`` row, to sign the generated rows."""
+        done = subprocess.run(
+            [self.psql, self.database_url, "-v", "ON_ERROR_STOP=1", "-At", "-c", AUTHOR_QUERY],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+        if done.returncode != 0:
+            raise RuntimeError(f"Looking up a user failed: {done.stderr.strip()}")
+        if not done.stdout.strip():
+            raise RuntimeError("auth.users is empty: sign a user up or pass --author")
+        return done.stdout.strip()
+
+    def write(self, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        command = [self.psql, self.database_url, "-v", "ON_ERROR_STOP=1", "-q"]
+        if not self.triggers:
+            command += ["-c", "SET session_replication_role = replica"]
+        command += ["-c", f'COPY public."{table}" ({quoted}) FROM STDIN WITH (FORMAT csv)']
+        # stderr goes to a file: a pipe read only after the COPY could fill up
+        # and block psql while we block writing its stdin.
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as stderr:
+            process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stderr=stderr, text=True, encoding="utf-8"
+            )
+            assert process.stdin is not None
+            writer = csv.writer(process.stdin, lineterminator="\n")
+            count = 0
+            try:
+                for row in rows:
+                    writer.writerow([_csv_value(v) for v in row])
+                    count += 1
+            except BrokenPipeError:
+                # psql exited early; its stderr says why.
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+            if process.wait() != 0:
+                stderr.seek(0)
+                raise RuntimeError(f"COPY into {table} failed: {stderr.read().strip()}")
+        return count
+
+
+class RestSink:
+    """PostgREST bulk inserts of ``batch`` rows."""
+
+    def __init__(self, session: dict[str, Any], batch: int = BATCH_SIZE) -> None:
+        self.session = session
+        self.batch = batch
+
+    def write(self, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        count, chunk = 0, []
+        for row in rows:
+            chunk.append(dict(zip(columns, row)))
+            if len(chunk) == self.batch:
+                count += self._post(table, columns, chunk)
+                chunk = []
+        if chunk:
+            count += self._post(table, columns, chunk)
+        return count
+
+    def _post(self, table: str, columns: Sequence[str], chunk: list[dict[str, Any]]) -> int:
+        for row in chunk:
+            for column in ("diagnosis_data", "planning_data", "evaluation_data", "metadata"):
+                if isinstance(row.get(column), str):
+                    row[column] = json.loads(row[column])
+        rest.request(self.session, "POST", table, chunk, prefer="return=minimal")
+        return len(chunk)
+
+
+class StoreSink:
+    """The stand-in's in-memory :class:`~harness.standin.store.Store`."""
+
+    def __init__(self, store: Any) -> None:
+        self.store = store
+
+    def write(self, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        if table not in self.store.schema.tables:
+            return 0
+        records = []
+        for row in rows:
+            record = dict(zip(columns, row))
+            for column in ("diagnosis_data", "planning_data", "evaluation_data", "metadata"):
+                if isinstance(record.get(column), str):
+                    record[column] = json.loads(record[column])
+            records.append(record)
+        self.store.insert(table, records, upsert=True)
+        return len(records)
+
+
+def config_for(scale: str, **overrides: Any) -> Config:
+    networks, students = SCALES[scale]
+    values = {"networks": networks, "students": students}
+    values.update({k: v for k, v in overrides.items() if v is not None})
+    return Config(**values)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.synthetic",
+        description="Generate multi-tenant school data at scale into Postgres or PostgREST.",
+    )
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--networks", type=int)
+    parser.add_argument("--students", type=int, help="total over all networks")
+    parser.add_argument("--schools-per-network", type=int)
+    parser.add_argument("--pei-ratio", type=float, help="share of students with a PEI")
+    parser.add_argument("--seed", type=int)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument(
+        "--database-url",
+        default=os.environ.get("TESTSPRITE_DATABASE_URL"),
+        help="Postgres URL, loaded with COPY through psql (env: TESTSPRITE_DATABASE_URL)",
+    )
+    target.add_argument(
+        "--rest",
+        action="store_true",
+        help="insert through PostgREST at TESTSPRITE_SUPABASE_URL as superadmin",
+    )
+    parser.add_argument("--no-triggers", action="store_true", help="COPY with triggers disabled")
+    parser.add_argument(
+        "--author",
+        help="auth.users id for created_by and changed_by (default: the signed-in superadmin "
+        "with --rest, the oldest user with --database-url)",
+    )
+    args = parser.parse_args(argv)
+    if not args.rest and not args.database_url:
+        parser.error("one of --database-url (or TESTSPRITE_DATABASE_URL) and --rest is required")
+
+    sink: Sink
+    try:
+        if args.rest:
+            session = auth.sign_in("superadmin")
+            sink, author = RestSink(session), args.author or session["user"]["id"]
+        else:
+            sink = CopySink(args.database_url, triggers=not args.no_triggers)
+            author = args.author or sink.author()
+        config = config_for(
+            args.scale,
+            networks=args.networks,
+            students=args.students,
+            schools_per_network=args.schools_per_network,
+            pei_ratio=args.pei_ratio,
+            seed=args.seed,
+            author=author,
+            # With triggers on, save_pei_history writes version 1 of every PEI
+            # and generated rows would collide on (pei_id, version_number).
+            history=args.rest or args.no_triggers,
+        )
+        stats = Generator(config).run(sink, progress=True)
+    except (RuntimeError, OSError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    for table, count in stats.rows.items():
+        print(f"{table:<20} {count:>10,}")
+    print(f"{stats.total:,} rows in {stats.seconds:.1f}s ({stats.total / stats.seconds:,.0f}/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""Web Vitals and navigation timing for every navigate and click step.
+
+:data:`OBSERVER_SCRIPT` is added to every context the runner opens.  It
+keeps ``PerformanceObserver``s on the page for largest contentful paint,
+layout shifts, event timing and long tasks.  After each
+:meth:`PageObject.open <harness.pages.base.PageObject.open>` and
+:meth:`PageObject.click <harness.pages.base.PageObject.click>`,
+:func:`capture` reads one :class:`StepVitals` through ``page.evaluate``:
+
+``lcp``, ``ttfb``
+    Of the current document, in ms (``ttfb`` is ``responseStart`` of the
+    navigation entry; client-side route changes keep the document's values).
+``cls``
+    Layout-shift score summed over the document, excluding shifts right after
+    input.
+``inp``
+    Longest interaction (event duration) on the document so far, in ms.
+``long_tasks``, ``blocking_time``
+    Long tasks since the previous step and their blocking time (the part of
+    each beyond 50 ms), in ms.
+``heap``
+    ``performance.memory.usedJSHeapSize``, in bytes.
+``duration``
+    From the start of the step (``goto`` or click) to the sample, in ms.  A
+    navigation the :mod:`harness.pool` made ahead of time is ``warm``, and
+    its load time is added.
+``requests``, ``rest_calls``, ``transfer_bytes``
+    Resource timing entries since the previous step: how many, how many to
+    Supabase ``/rest/v1/``, and their ``transferSize`` (plus the document's
+    own on its first step).  Assets served from the runner's cache or blocked
+    by :mod:`harness.network` transfer nothing.
+
+Steps are kept per scenario in a :class:`VitalsLedger`; :func:`write_run`
+stores a run's steps in ``tmp/vitals/<start time>.json`` next to
+``tmp/test_results.json``, with medians per route and role.  Scenarios run on
+their own install the observers on first capture, so values buffered by the
+browser (LCP, layout shifts, interactions) are still reported.
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+from harness.scenarios import SUITE_DIR
+
+if TYPE_CHECKING:
+    from harness.runner import ScenarioResult
+
+VITALS_DIR = SUITE_DIR / "tmp" / "vitals"
+
+METRICS = (
+    "duration",
+    "lcp",
+    "cls",
+    "inp",
+    "ttfb",
+    "long_tasks",
+    "blocking_time",
+    "heap",
+    "requests",
+    "rest_calls",
+    "transfer_bytes",
+)
+
+OBSERVER_SCRIPT = """
+(() => {
+  if (window.__testspriteVitals) return;
+  const state = {lcp: null, cls: 0, inp: null, longTasks: 0, blocking: 0, seen: 0, nav: false};
+  performance.setResourceTimingBufferSize(100000);
+  const observe = (type, callback, options = {}) => {
+    try {
+      new PerformanceObserver((list) => list.getEntries().forEach(callback))
+        .observe({type, buffered: true, ...options});
+    } catch (error) {}
+  };
+  observe("largest-contentful-paint", (e) => {
+    state.lcp = e.renderTime || e.loadTime || e.startTime;
+  });
+  observe("layout-shift", (e) => { if (!e.hadRecentInput) state.cls += e.value; });
+  observe("event", (e) => {
+    if (e.interactionId) state.inp = Math.max(state.inp || 0, e.duration);
+  }, {durationThreshold: 16});
+  observe("longtask", (e) => {
+    state.longTasks += 1;
+    state.blocking += Math.max(0, e.duration - 50);
+  });
+  window.__testspriteVitals = {
+    take() {
+      const nav = performance.getEntriesByType("navigation")[0];
+      const resources = performance.getEntriesByType("resource").slice(state.seen);
+      state.seen += resources.length;
+      let transfer = resources.reduce((sum, e) => sum + (e.transferSize || 0), 0);
+      if (nav && !state.nav) {
+        transfer += nav.transferSize || 0;
+        state.nav = true;
+      }
+      const sample = {
+        url: location.href,
+        lcp: state.lcp,
+        cls: state.cls,
+        inp: state.inp,
+        ttfb: nav ? nav.responseStart - (nav.activationStart || 0) : null,
+        long_tasks: state.longTasks,
+        blocking_time: state.blocking,
+        heap: performance.memory ? performance.memory.usedJSHeapSize : null,
+        requests: resources.length,
+        rest_calls: resources.filter((e) => e.name.includes("/rest/v1/")).length,
+        transfer_bytes: transfer,
+      };
+      state.longTasks = 0;
+      state.blocking = 0;
+      return sample;
+    },
+  };
+})();
+"""
+
+# Installs the observers if needed, lets pending entries be delivered (they
+# are queued until after the next frame) and takes a sample.
+_CAPTURE = (
+    "async () => {"
+    + OBSERVER_SCRIPT
+    + "await new Promise((r) => requestAnimationFrame(() => requestAnimationFrame(r)));"
+    + "return window.__testspriteVitals.take(); }"
+)
+
+
+@dataclass
+class StepVitals:
+    kind: str
+    target: str
+    url: str
+    at: float
+    lcp: float | None = None
+    cls: float | None = None
+    inp: float | None = None
+    ttfb: float | None = None
+    duration: float | None = None
+    long_tasks: int | None = None
+    blocking_time: float | None = None
+    heap: int | None = None
+    requests: int | None = None
+    rest_calls: int | None = None
+    transfer_bytes: int | None = None
+    # The page was already loaded by harness.pool; see capture().
+    warm: bool = False
+
+    @property
+    def route(self) -> str:
+        return urlsplit(self.url).path or "/"
+
+
+@dataclass
+class VitalsLedger:
+    """Steps captured on behalf of one scenario."""
+
+    started: float = field(default_factory=time.perf_counter)
+    steps: list[StepVitals] = field(default_factory=list)
+
+
+_ledger: ContextVar[VitalsLedger | None] = ContextVar("vitals_ledger", default=None)
+
+
+def ledger() -> VitalsLedger:
+    current = _ledger.get()
+    if current is None:
+        current = begin()
+    return current
+
+
+def begin() -> VitalsLedger:
+    """Start a fresh ledger for the current task (called by the runner)."""
+    current = VitalsLedger()
+    _ledger.set(current)
+    return current
+
+
+async def install(context: async_api.BrowserContext) -> None:
+    await context.add_init_script(script=OBSERVER_SCRIPT)
+
+
+async def capture(
+    page: async_api.Page,
+    kind: str,
+    target: str,
+    started: float | None = None,
+    warm: float | None = None,
+) -> StepVitals | None:
+    """Record the page's vitals after a ``kind`` step on ``target``.
+
+    ``started`` is the ``time.perf_counter()`` at which the step began.
+    ``warm`` is the load time, in ms, of a navigation made ahead of time for
+    this step, counted in its duration.  A page that is navigating away or
+    closed yields no sample.
+    """
+    current = ledger()
+    try:
+        sample: dict[str, Any] = await page.evaluate(_CAPTURE)
+    except async_api.Error:
+        return None
+    now = time.perf_counter()
+    sample["duration"] = None if started is None else (now - started) * 1000 + (warm or 0)
+    step = StepVitals(
+        kind=kind,
+        target=target,
+        at=now - current.started,
+        warm=warm is not None,
+        **{k: sample.get(k) for k in ("url", *METRICS)},
+    )
+    current.steps.append(step)
+    return step
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarise(results: Iterable["ScenarioResult"]) -> list[dict[str, Any]]:
+    """Median and p75 of each metric per navigated route and role."""
+    groups: dict[tuple[str, str], list[StepVitals]] = {}
+    for result in results:
+        for step in result.vitals.steps:
+            if step.kind == "navigate":
+                key = (step.route, result.scenario.role or "anonymous")
+                groups.setdefault(key, []).append(step)
+    rows = []
+    for (route, role), steps in sorted(groups.items()):
+        row: dict[str, Any] = {"route": route, "role": role, "samples": len(steps)}
+        for metric in METRICS:
+            values = [getattr(s, metric) for s in steps if getattr(s, metric) is not None]
+            row[metric] = (
+                {"median": statistics.median(values), "p75": _percentile(values, 0.75)}
+                if values
+                else None
+            )
+        rows.append(row)
+    return rows
+
+
+def write_run(
+    results: list["ScenarioResult"],
+    started: float,
+    directory: Path = VITALS_DIR,
+    **run: Any,
+) -> Path:
+    """Write the run's steps and summary; ``run`` adds metadata (profile, ...)."""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started))
+    path = directory / f"{stamp}.json"
+    directory.mkdir(parents=True, exist_ok=True)
+    document = {
+        "run": {"started": started, **run},
+        "scenarios": [
+            {
+                "scenario": r.scenario.name,
+                "role": r.scenario.role,
+                "status": r.status,
+                "steps": [asdict(step) for step in r.vitals.steps],
+            }
+            for r in results
+        ],
+        "summary": summarise(results),
+    }
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    return path
@@ -0,0 +1,242 @@
+"""Event-driven waits that replace the generated fixed sleeps.
+
+The generated scenarios paused 3 s before every ``fill``/``click``
+(``page.wait_for_timeout(3000)``) and after every ``page.goto``
+(``asyncio.sleep(3)``).  The helpers here return as soon as the page is
+actually ready instead:
+
+* :func:`actionable` waits for the locator to be visible, for any client-side
+  route change to reach ``domcontentloaded`` and for in-flight Supabase
+  ``/rest/v1`` and ``/auth/v1`` calls to drain;
+* :func:`settle` does the same after a full navigation, without a locator.
+
+Each kind of wait is bounded by an :class:`AdaptiveCeiling` learnt from the
+durations observed so far in the process.  Every call is recorded in the
+current :class:`WaitLedger`, which the runner reports per scenario as idle
+time removed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from playwright import async_api
+
+SUPABASE_PATHS = ("/rest/v1/", "/auth/v1/")
+
+# Fixed wait each helper stands in for, in seconds.
+REPLACED_WAIT = 3.0
+
+# How long the Supabase queue must stay empty to count as idle.
+QUIET_WINDOW = 0.1
+
+
+class AdaptiveCeiling:
+    """Upper bound for one kind of wait, derived from observed durations.
+
+    Until ``min_samples`` waits have been observed the ceiling is
+    ``initial``; afterwards it is ``factor`` times the recent 95th
+    percentile, clamped to ``[floor, cap]``.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        floor: float,
+        cap: float,
+        factor: float = 3.0,
+        window: int = 100,
+        min_samples: int = 5,
+    ) -> None:
+        self.initial = initial
+        self.floor = floor
+        self.cap = cap
+        self.factor = factor
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    @property
+    def value(self) -> float:
+        if len(self._samples) < self.min_samples:
+            return self.initial
+        ordered = sorted(self._samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return min(self.cap, max(self.floor, p95 * self.factor))
+
+    @property
+    def millis(self) -> float:
+        return self.value * 1000
+
+
+CEILINGS = {
+    "locator": AdaptiveCeiling(initial=5.0, floor=1.0, cap=10.0),
+    "route": AdaptiveCeiling(initial=5.0, floor=1.0, cap=10.0),
+    "network": AdaptiveCeiling(initial=5.0, floor=0.5, cap=10.0),
+}
+
+
+@dataclass
+class WaitRecord:
+    kind: str
+    replaced: float
+    waited: float
+
+
+@dataclass
+class WaitLedger:
+    """Waits performed on behalf of one scenario."""
+
+    records: list[WaitRecord] = field(default_factory=list)
+
+    def add(self, kind: str, replaced: float, waited: float) -> None:
+        self.records.append(WaitRecord(kind, replaced, waited))
+
+    @property
+    def replaced(self) -> float:
+        return sum(r.replaced for r in self.records)
+
+    @property
+    def waited(self) -> float:
+        return sum(r.waited for r in self.records)
+
+    @property
+    def removed(self) -> float:
+        """Idle seconds saved compared with the fixed sleeps."""
+        return self.replaced - self.waited
+
+
+_ledger: ContextVar[WaitLedger | None] = ContextVar("wait_ledger", default=None)
+
+
+def ledger() -> WaitLedger:
+    """Ledger of the scenario running in the current task."""
+    current = _ledger.get()
+    if current is None:
+        current = begin()
+    return current
+
+
+def begin() -> WaitLedger:
+    """Start a fresh ledger for the current task (called by the runner)."""
+    current = WaitLedger()
+    _ledger.set(current)
+    return current
+
+
+class _PageTracker:
+    """Follows Supabase requests and main-frame navigations of one page."""
+
+    def __init__(self, page: async_api.Page) -> None:
+        self.page = page
+        self.in_flight = 0
+        self.started = 0
+        self.navigated = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+        page.on("framenavigated", self._on_navigated)
+
+    @staticmethod
+    def _tracked(request: async_api.Request) -> bool:
+        return any(path in request.url for path in SUPABASE_PATHS)
+
+    def _on_request(self, request: async_api.Request) -> None:
+        if self._tracked(request):
+            self.in_flight += 1
+            self.started += 1
+            self._idle.clear()
+
+    def _on_done(self, request: async_api.Request) -> None:
+        if self._tracked(request) and self.in_flight:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    def _on_navigated(self, frame: async_api.Frame) -> None:
+        if frame == self.page.main_frame:
+            self.navigated = True
+
+    async def route_settled(self, timeout: float) -> None:
+        if not self.navigated:
+            return
+        self.navigated = False
+        try:
+            await self.page.wait_for_load_state("domcontentloaded", timeout=timeout * 1000)
+        except async_api.Error:
+            pass
+
+    async def network_idle(self, timeout: float) -> None:
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._idle.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+            started = self.started
+            await asyncio.sleep(min(QUIET_WINDOW, max(0.0, deadline - time.perf_counter())))
+            if self._idle.is_set() and self.started == started:
+                return
+
+
+_trackers: "weakref.WeakKeyDictionary[async_api.Page, _PageTracker]" = weakref.WeakKeyDictionary()
+
+
+def track(page: async_api.Page) -> _PageTracker:
+    tracker = _trackers.get(page)
+    if tracker is None:
+        tracker = _trackers[page] = _PageTracker(page)
+    return tracker
+
+
+async def _timed(kind: str, awaitable) -> float:
+    start = time.perf_counter()
+    await awaitable
+    elapsed = time.perf_counter() - start
+    CEILINGS[kind].observe(elapsed)
+    return elapsed
+
+
+async def settle(page: async_api.Page, replaced: float = REPLACED_WAIT) -> None:
+    """Wait for a navigation to finish and Supabase traffic to drain."""
+    tracker = track(page)
+    tracker.navigated = True
+    waited = await _timed("route", tracker.route_settled(CEILINGS["route"].value))
+    waited += await _timed("network", tracker.network_idle(CEILINGS["network"].value))
+    ledger().add("settle", replaced, waited)
+
+
+async def actionable(
+    page: async_api.Page,
+    locator: async_api.Locator,
+    replaced: float = REPLACED_WAIT,
+) -> None:
+    """Wait until ``locator`` can be acted on.
+
+    Time-outs are swallowed: the action that follows reports the failure
+    with its own, more specific, error.
+    """
+    tracker = track(page)
+    waited = await _timed("route", tracker.route_settled(CEILINGS["route"].value))
+    waited += await _timed("network", tracker.network_idle(CEILINGS["network"].value))
+    waited += await _timed("locator", _visible(locator, CEILINGS["locator"].millis))
+    ledger().add("actionable", replaced, waited)
+
+
+async def _visible(locator: async_api.Locator, timeout: float) -> None:
+    try:
+        await locator.wait_for(state="visible", timeout=timeout)
+    except async_api.Error:
+        pass